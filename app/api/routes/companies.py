@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.api.dependencies import get_db
@@ -21,10 +21,17 @@ async def list_companies(
     limit: int = 50,
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_db),
 ):
     service = CompanyService(db)
-    return await service.list_companies(skip=skip, limit=limit, status=status, search=search)
+    try:
+        return await service.list_companies(
+            skip=skip, limit=limit, status=status, search=search, cursor=cursor, include_total=include_total
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/upload", response_model=Dict[str, Any])
@@ -48,9 +55,13 @@ async def get_company_search_history(company_id: str, limit: int = 20, db: Async
 
 
 @router.get("/{company_id}", response_model=Dict[str, Any])
-async def get_company_profile(company_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def get_company_profile(
+    company_id: str,
+    include_embedding: bool = Query(False, description="Include summary_embedding"),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     service = CompanyService(db)
-    profile = await service.get_profile(company_id)
+    profile = await service.get_profile(company_id, include_embedding=include_embedding)
     if not profile:
         raise HTTPException(status_code=404, detail="Company profile not found")
     return profile
@@ -21,6 +21,12 @@ async def get_dashboard_stats(db: AsyncIOMotorDatabase = Depends(get_db)):
     return await service.get_stats()
 
 
+@router.get("/metrics", response_model=Dict[str, Any])
+async def get_runtime_metrics(db: AsyncIOMotorDatabase = Depends(get_db)):
+    service = DashboardService(db)
+    return service.get_runtime_metrics()
+
+
 @router.get("/activity", response_model=List[Dict[str, Any]])
 async def get_recent_activity(limit: int = 10, db: AsyncIOMotorDatabase = Depends(get_db)):
     service = DashboardService(db)
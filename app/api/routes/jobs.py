@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.api.dependencies import get_db
@@ -21,10 +21,17 @@ async def list_jobs(
     limit: int = 20,
     job_type: str | None = None,
     status: str | None = None,
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_db),
 ):
     service = JobService(db)
-    return await service.list_jobs(skip=skip, limit=limit, job_type=job_type, status=status)
+    try:
+        return await service.list_jobs(
+            skip=skip, limit=limit, job_type=job_type, status=status, cursor=cursor, include_total=include_total
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/{job_id}", response_model=Dict[str, Any])
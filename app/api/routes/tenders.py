@@ -26,20 +26,27 @@ async def list_tenders(
     expired: Optional[bool] = None,
     sort_by: str = "created_at",
     sort_dir: str = "desc",
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = True,
     db: AsyncIOMotorDatabase = Depends(get_db),
 ):
     service = TenderService(db)
     domain_list = [item.strip() for item in domains.split(",") if item.strip()] if domains else None
-    return await service.list_tenders(
-        skip=skip,
-        limit=limit,
-        status=status,
-        domains=domain_list,
-        search=search,
-        expired=expired,
-        sort_by=sort_by,
-        sort_dir=sort_dir,
-    )
+    try:
+        return await service.list_tenders(
+            skip=skip,
+            limit=limit,
+            status=status,
+            domains=domain_list,
+            search=search,
+            expired=expired,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/stats/summary", response_model=Dict[str, Any])
@@ -49,9 +56,13 @@ async def tender_stats(db: AsyncIOMotorDatabase = Depends(get_db)):
 
 
 @router.get("/{tender_id}", response_model=Dict[str, Any])
-async def get_tender(tender_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def get_tender(
+    tender_id: str,
+    include_embedding: bool = Query(False, description="Include summary_embedding"),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     service = TenderService(db)
-    tender = await service.get_tender(tender_id)
+    tender = await service.get_tender(tender_id, include_embedding=include_embedding)
     if not tender:
         raise HTTPException(status_code=404, detail="Tender not found")
     return tender
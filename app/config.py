@@ -37,6 +37,23 @@ class Settings(BaseSettings):
     SCRAPE_MIN_DELAY: int = 2
     SCRAPE_MAX_DELAY: int = 5
     SCRAPER_HEADLESS: bool = True
+    SCRAPER_BACKEND: str = "http"  # "http" (falls back to Playwright when it fails) or "playwright"
+    SCRAPER_PARSER: str = "lxml"  # Listing card parser: "lxml" (single-pass) or "bs4" (reference implementation)
+    SCRAPER_CONTEXTS: int = 1  # Browser contexts walking disjoint listing pages in parallel
+    SCRAPE_PAGES_PER_MINUTE: float = 0  # Across all contexts; 0 = one page per SCRAPE_MIN..MAX_DELAY on average
+    SCRAPER_BLOCK_RESOURCES: bool = True  # Abort image, font, stylesheet, media and analytics requests
+    SCRAPE_INCREMENTAL: bool = True  # Skip known, unchanged bids (and stop at the first fully known page of a newest-first listing)
+    SCRAPE_BLOOM_ERROR_RATE: float = 0.001  # False-positive rate of the known bid_id filter
+    SCRAPE_UPSERT_BATCH_SIZE: int = 50  # Bids stored per bulk write (batches never span listing pages)
+    SCRAPE_UPSERT_CHANGED_ONLY: bool = False  # Rescraped bids keep their processing status instead of being reprocessed
+
+    # PDF downloads (one pooled session shared by all downloads)
+    DOWNLOAD_MAX_CONNECTIONS: int = 32
+    DOWNLOAD_MAX_CONNECTIONS_PER_HOST: int = 8  # Kept-alive connections to one host, e.g. bidplus.gem.gov.in
+    DOWNLOAD_CONCURRENCY: int = 8  # Files fetched at once by download_many
+    DOWNLOAD_TIMEOUT_SECONDS: int = 120
+    DOWNLOAD_RETRIES: int = 3
+    DOWNLOAD_RETRY_BASE_DELAY: float = 1.0  # Backoff before retry n is uniform in [0, base * 2**n] seconds
 
     # LLM
     LLM_PROVIDER: str = "ollama"
@@ -47,21 +64,60 @@ class Settings(BaseSettings):
     LLM_GEMINI_MAX_CHARS: int = 500000  # Gemini supports large context
     LLM_CHUNK_SIZE: int = 30000  # Chunk size for very large docs
     LLM_CHUNK_OVERLAP: int = 1000  # Overlap between chunks
+    LLM_CHUNK_CONCURRENCY: int = 4  # Chunks of one document extracted in parallel
+    LLM_CHUNK_MERGE: str = "schema"  # "schema" (deterministic) or "llm" (extra merge round trip)
+    LLM_CACHE_BACKEND: str = "disk"  # "disk", "mongo" or "none"
+    LLM_CACHE_DIR: str = "data/llm_cache"
+    LLM_CACHE_MAX_ENTRIES: int = 50000
+    LLM_CACHE_MAX_AGE_DAYS: float = 90
     GEMINI_MODEL: str = "gemini-1.5-flash"
+    LLM_MAX_CONCURRENCY: int = 4  # In-flight async LLM requests across the process
 
     # Embedding
     EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
+    EMBEDDING_CACHE_SIZE: int = 10000  # Embeddings kept in the in-process LRU cache
+    EMBEDDING_BATCH_SIZE: int = 32  # Max texts per micro-batched model.encode call
+    EMBEDDING_BATCH_WAIT_MS: int = 5  # How long embed_async waits to fill a batch
+
+    # Vector index (first-stage retrieval before reranking)
+    ANN_BACKEND: str = "ivf"  # "ivf" or "exact"
+    ANN_INDEX_DIR: str = "data/ann"
+    ANN_TOP_K: int = 500  # Shortlist size passed to the reranker
+    ANN_NLIST: int = 0  # IVF buckets; 0 = sqrt(rows)
+    ANN_NPROBE: int = 16  # IVF buckets scanned per query
+    ANN_MIN_ROWS: int = 2000  # Below this, search exactly
+
+    # Matching
+    MATCH_FEATURES_CACHE_SIZE: int = 5000  # Compiled per-document match features kept in memory
+    MATCH_TABLE_MIN_SCORE: float = 0.1  # Pairs scoring below this are not stored in tender_matches
+
+    # Worker pools for blocking work (embedding, PDF and document parsing)
+    EXECUTOR_THREAD_WORKERS: int = 4
+    EXECUTOR_PROCESS_WORKERS: int = 2
+    EXECUTOR_MAX_QUEUE: int = 64  # Calls allowed to wait for a worker before callers are held back
 
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
+    LIST_COUNT_CACHE_SECONDS: int = 30  # Filtered list totals are recounted at most this often
 
     # Scheduler
     ENABLE_SCHEDULER: bool = True
     SCRAPE_INTERVAL_HOURS: int = 6
     PROCESS_INTERVAL_MINUTES: int = 30
     PROCESS_BATCH_LIMIT: int = 50
+    EXPIRY_SWEEP_INTERVAL_MINUTES: int = 15  # Flags tenders past their end date and drops their matches
+    PROCESS_CONCURRENCY: int = 4  # Tenders processed at once by process_pending_tenders
+
+    # Scrape job ingest pipeline (workers per stage)
+    PIPELINE_QUEUE_SIZE: int = 16  # Items buffered between two stages before the upstream stage waits
+    PIPELINE_UPSERT_CONCURRENCY: int = 4
+    PIPELINE_DOWNLOAD_CONCURRENCY: int = 8
+    PIPELINE_EXTRACT_CONCURRENCY: int = 4
+    PIPELINE_LLM_CONCURRENCY: int = 4
+    PIPELINE_EMBED_CONCURRENCY: int = 4
+    PIPELINE_PERSIST_CONCURRENCY: int = 2
 
     class Config:
         env_file = ".env"
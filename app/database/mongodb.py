@@ -35,6 +35,23 @@ async def close_client() -> None:
         _client = None
 
 
+async def ensure_ttl_index(database: AsyncIOMotorDatabase, name: str, field: str, seconds: int) -> None:
+    """
+    TTL index on `field`. An existing one with another expiry is changed in place with
+    collMod, since create_index with different options fails with IndexOptionsConflict.
+    """
+    collection = database.get_collection(name)
+    for index in (await collection.index_information()).values():
+        if index.get("key") == [(field, ASCENDING)] and "expireAfterSeconds" in index:
+            if index["expireAfterSeconds"] != seconds:
+                await database.command(
+                    "collMod", name, index={"keyPattern": {field: ASCENDING}, "expireAfterSeconds": seconds}
+                )
+                logger.info("mongodb.ttl_updated", collection=name, field=field, seconds=seconds)
+            return
+    await collection.create_index([(field, ASCENDING)], expireAfterSeconds=seconds)
+
+
 async def create_indexes(db: Optional[AsyncIOMotorDatabase] = None) -> None:
     """Create required indexes for collections."""
     database = db or get_database()
@@ -47,7 +64,18 @@ async def create_indexes(db: Optional[AsyncIOMotorDatabase] = None) -> None:
     await tender_coll.create_index([("metadata.domains", ASCENDING)])
     await tender_coll.create_index([("metadata.required_certifications", ASCENDING)])
     await tender_coll.create_index([("is_active", ASCENDING), ("expired", ASCENDING)])
-    await tender_coll.create_index([("created_at", DESCENDING)])
+    # Keyset pagination: (sort field, _id), also scanned backwards for the opposite direction
+    for sort_field in ("created_at", "updated_at", "scraped_at", "scraped_info.end_date"):
+        await tender_coll.create_index([(sort_field, DESCENDING), ("_id", DESCENDING)])
+    # Only tenders not yet flagged expired, for the expiry sweeper
+    await tender_coll.create_index(
+        [("scraped_info.end_date", ASCENDING), ("_id", ASCENDING)],
+        partialFilterExpression={"expired": False},
+    )
+    await tender_coll.create_index(
+        [("status.llm_processed", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+    )
+    await tender_coll.create_index([("pdf_hash", ASCENDING)])
 
     company_coll = database.get_collection("company_profiles")
     await company_coll.create_index([("company_id", ASCENDING)], unique=True)
@@ -55,15 +83,28 @@ async def create_indexes(db: Optional[AsyncIOMotorDatabase] = None) -> None:
     await company_coll.create_index([("metadata.certifications", ASCENDING)])
     await company_coll.create_index([("metadata.technologies", ASCENDING)])
     await company_coll.create_index([("metadata.domains", ASCENDING)])
-    await company_coll.create_index([("created_at", DESCENDING)])
+    await company_coll.create_index([("created_at", DESCENDING), ("_id", DESCENDING)])
+    await company_coll.create_index(
+        [("status.processing_status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+    )
+
+    match_coll = database.get_collection("tender_matches")
+    await match_coll.create_index([("tender_id", ASCENDING), ("company_id", ASCENDING)], unique=True)
+    await match_coll.create_index(
+        [("company_id", ASCENDING), ("is_active", ASCENDING), ("expired", ASCENDING), ("score", DESCENDING)]
+    )
+    await match_coll.create_index([("tender_id", ASCENDING), ("score", DESCENDING)])
+
+    if settings.LLM_CACHE_BACKEND.lower() == "mongo":
+        await ensure_ttl_index(database, "llm_cache", "last_used_at", int(settings.LLM_CACHE_MAX_AGE_DAYS * 86400))
 
     await database.get_collection("search_history").create_index(
         [("company_id", ASCENDING), ("searched_at", DESCENDING)]
     )
     scrape_logs = database.get_collection("scrape_logs")
     await scrape_logs.create_index([("job_id", ASCENDING)], unique=True)
-    await scrape_logs.create_index([("started_at", DESCENDING)])
-    await scrape_logs.create_index([("status", ASCENDING)])
-    await scrape_logs.create_index([("job_type", ASCENDING)])
+    await scrape_logs.create_index([("started_at", DESCENDING), ("_id", DESCENDING)])
+    await scrape_logs.create_index([("status", ASCENDING), ("started_at", DESCENDING), ("_id", DESCENDING)])
+    await scrape_logs.create_index([("job_type", ASCENDING), ("started_at", DESCENDING), ("_id", DESCENDING)])
 
     logger.info("mongodb.indexes.created")
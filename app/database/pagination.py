@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read as "the next `limit` documents after the last one returned",
+sorted on `(sort_field, _id)` and served by a compound index on the same keys,
+so page 100 costs the same as page one. The cursor handed to clients is an
+opaque token holding the sort value and `_id` of the last document.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+from app.config import settings
+
+# (collection name, filters) -> (expires_at, count)
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def encode_cursor(sort_field: str, document: Dict[str, Any]) -> str:
+    payload = json_util.dumps({"f": sort_field, "v": _field_value(document, sort_field), "id": document["_id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[Any, Any]:
+    """(sort value, _id) of the last document of the previous page. Raises ValueError for foreign or stale cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(payload, dict) or "id" not in payload:
+        raise ValueError("Invalid cursor")
+    if payload.get("f") != sort_field:
+        raise ValueError("Cursor was issued for a different sort order")
+    return payload.get("v"), payload["id"]
+
+
+def keyset_filter(sort_field: str, sort_order: int, value: Any, last_id: Any) -> Dict[str, Any]:
+    """Documents after (value, last_id) in `(sort_field, _id)` order. Missing/null sort values sort lowest, as in Mongo."""
+    op = "$lt" if sort_order == -1 else "$gt"
+    if value is None:
+        if sort_order == -1:
+            # Nulls come last when descending: only the remaining nulls are left
+            return {sort_field: None, "_id": {op: last_id}}
+        return {"$or": [{sort_field: None, "_id": {op: last_id}}, {sort_field: {"$ne": None}}]}
+    clauses: List[Dict[str, Any]] = [{sort_field: {op: value}}, {sort_field: value, "_id": {op: last_id}}]
+    if sort_order == -1:
+        clauses.append({sort_field: None})
+    return {"$or": clauses}
+
+
+async def keyset_page(
+    collection,
+    filters: Dict[str, Any],
+    sort_field: str,
+    sort_order: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    skip: int = 0,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of `collection` and the cursor of the page after it (None on the last page).
+    `skip` is honoured only without a cursor, for clients still paging by offset.
+    """
+    query = filters
+    if cursor:
+        after = keyset_filter(sort_field, sort_order, *decode_cursor(cursor, sort_field))
+        query = {"$and": [filters, after]} if filters else after
+    found = collection.find(query, projection).sort([(sort_field, sort_order), ("_id", sort_order)])
+    if skip and not cursor:
+        found = found.skip(skip)
+    found = found.limit(limit + 1)
+    documents = await found.to_list(length=limit + 1)
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_cursor(sort_field, documents[-1])
+
+
+async def list_total(collection, filters: Dict[str, Any]) -> int:
+    """
+    Total for a list view: the collection's metadata count when unfiltered, else an
+    exact count cached for LIST_COUNT_CACHE_SECONDS per filter.
+    """
+    if not filters:
+        return await collection.estimated_document_count()
+    key = (collection.name, json_util.dumps(filters, sort_keys=True))
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    total = await collection.count_documents(filters)
+    if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+        for stale in [entry for entry, (expires_at, _) in _count_cache.items() if expires_at <= now]:
+            del _count_cache[stale]
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+    _count_cache[key] = (now + settings.LIST_COUNT_CACHE_SECONDS, total)
+    return total
+
+
+def _field_value(document: Dict[str, Any], field: str) -> Any:
+    value: Any = document
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
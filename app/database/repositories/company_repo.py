@@ -12,6 +12,35 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 
 class CompanyRepository:
+    # Named read projections. Reads without a view load whole documents.
+    VIEWS: Dict[str, Dict[str, int]] = {
+        # Company lists, pickers and dashboard widgets
+        "list": {
+            "company_id": 1,
+            "name": 1,
+            "status": 1,
+            "metadata.company_name": 1,
+            "metadata.domains": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        },
+        # One profile in the API: everything but the embedding
+        "detail": {"summary_embedding": 0},
+        # Inputs of the matchers (ProfileFeatures and match rows)
+        "scoring": {
+            "company_id": 1,
+            "name": 1,
+            "status.processing_status": 1,
+            "updated_at": 1,
+            "metadata.company_name": 1,
+            "metadata.domains": 1,
+            "metadata.technologies": 1,
+            "metadata.certifications": 1,
+            "metadata.capabilities": 1,
+            "metadata.government_experience": 1,
+        },
+    }
+
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self.collection = db.get_collection("company_profiles")
 
@@ -22,14 +51,22 @@ class CompanyRepository:
         result = await self.collection.insert_one(profile)
         return str(result.inserted_id)
 
-    async def get_by_id(self, company_id: str) -> Optional[Dict[str, Any]]:
-        return await self.collection.find_one({"company_id": company_id})
+    async def get_by_id(self, company_id: str, view: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"company_id": company_id}, self.VIEWS.get(view))
 
     async def get_by_object_id(self, profile_id: str) -> Optional[Dict[str, Any]]:
         return await self.collection.find_one({"_id": ObjectId(profile_id)})
 
-    async def list(self, skip: int = 0, limit: int = 50, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        cursor = self.collection.find(filters or {}).skip(skip).limit(limit).sort("created_at", -1)
+    async def list(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        filters: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        view: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        projection = projection or self.VIEWS.get(view)
+        cursor = self.collection.find(filters or {}, projection).skip(skip).limit(limit).sort("created_at", -1)
         return await cursor.to_list(length=limit)
 
     async def update(self, company_id: str, data: Dict[str, Any]) -> bool:
@@ -0,0 +1,72 @@
+"""
+Tender match repository for the materialized tender -> company scores.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.database.repositories.tender_repo import open_end_date
+
+
+class MatchRepository:
+    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+        self.collection = db.get_collection("tender_matches")
+
+    async def replace_for_tender(self, tender_id: str, matches: List[Dict[str, Any]], computed_at: datetime) -> int:
+        count = await self.upsert(matches)
+        await self.delete_stale({"tender_id": tender_id}, computed_at)
+        return count
+
+    async def upsert(self, matches: List[Dict[str, Any]]) -> int:
+        """
+        Write rows keyed by (tender_id, company_id). A tender refresh and a company
+        refresh may score the same pair at once; the later write wins.
+        """
+        if matches:
+            operations = [
+                UpdateOne(
+                    {"tender_id": match["tender_id"], "company_id": match["company_id"]}, {"$set": match}, upsert=True
+                )
+                for match in matches
+            ]
+            await self.collection.bulk_write(operations, ordered=False)
+        return len(matches)
+
+    async def delete_stale(self, query: Dict[str, Any], computed_at: datetime) -> None:
+        """Delete rows matching `query` that the refresh started at `computed_at` did not rewrite."""
+        # Mongo keeps milliseconds, so rows written by this refresh compare equal, not lower
+        cutoff = computed_at.replace(microsecond=computed_at.microsecond // 1000 * 1000)
+        await self.collection.delete_many({**query, "computed_at": {"$lt": cutoff}})
+
+    async def top_for_company(
+        self,
+        company_id: str,
+        limit: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        # The end date check covers tenders the expiry sweep has not flagged yet
+        query = {"company_id": company_id, "is_active": True, "expired": False, **open_end_date("end_date")}
+        query.update(filters or {})
+        cursor = self.collection.find(query).sort([("score", -1), ("end_date", 1)]).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def top_for_tender(self, tender_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"tender_id": tender_id}).sort("score", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def mark_expired(self, tender_ids: List[str]) -> None:
+        if tender_ids:
+            await self.collection.update_many({"tender_id": {"$in": tender_ids}}, {"$set": {"expired": True}})
+
+    async def delete_for_tender(self, tender_id: str) -> bool:
+        result = await self.collection.delete_many({"tender_id": tender_id})
+        return result.deleted_count > 0
+
+    async def delete_for_company(self, company_id: str) -> bool:
+        result = await self.collection.delete_many({"company_id": company_id})
+        return result.deleted_count > 0
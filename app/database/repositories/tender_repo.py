@@ -5,13 +5,66 @@ Tender repository for CRUD operations.
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Set only when bulk_upsert(changed_only=True) inserts a tender; kept as-is on existing ones
+_INSERT_ONLY_FIELDS = ("status",)
+
+
+def expiry_cutoff() -> datetime:
+    """Tenders whose end date is before this have expired. Minute precision keeps filters stable (and cacheable)."""
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+def open_end_date(field: str = "scraped_info.end_date") -> Dict[str, Any]:
+    """Filter for an end date that has not passed yet; a missing end date counts as open."""
+    return {field: {"$not": {"$lt": expiry_cutoff()}}}
 
 
 class TenderRepository:
+    # Named read projections. Reads without a view load whole documents (processing needs them).
+    VIEWS: Dict[str, Dict[str, int]] = {
+        # Tender lists and dashboard widgets
+        "list": {
+            "bid_id": 1,
+            "ra_no": 1,
+            "gem_url": 1,
+            "pdf_url": 1,
+            "scraped_info": 1,
+            "status": 1,
+            "is_active": 1,
+            "expired": 1,
+            "metadata.title": 1,
+            "metadata.domains": 1,
+            "metadata.department": 1,
+            "scraped_at": 1,
+            "processed_at": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        },
+        # One tender in the API: everything but the embedding
+        "detail": {"summary_embedding": 0},
+        # Inputs of the matchers (TenderFeatures, match rows, result ordering)
+        "scoring": {
+            "bid_id": 1,
+            "is_active": 1,
+            "expired": 1,
+            "updated_at": 1,
+            "scraped_info.end_date": 1,
+            "metadata.title": 1,
+            "metadata.summary": 1,
+            "metadata.domains": 1,
+            "metadata.required_technologies": 1,
+            "metadata.required_certifications": 1,
+            "metadata.sector": 1,
+        },
+    }
+
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self.collection = db.get_collection("tenders")
 
@@ -27,26 +80,100 @@ class TenderRepository:
         data = dict(data)
         data.pop("created_at", None)
         data["updated_at"] = now
-        result = await self.collection.update_one(
+        tender = await self.collection.find_one_and_update(
             {"bid_id": bid_id},
             {"$setOnInsert": {"created_at": now}, "$set": data},
+            projection={"_id": 1},
             upsert=True,
+            return_document=ReturnDocument.AFTER,
         )
-        if result.upserted_id:
-            return str(result.upserted_id)
-        existing = await self.collection.find_one({"bid_id": bid_id}, {"_id": 1})
-        return str(existing["_id"]) if existing else ""
+        return str(tender["_id"]) if tender else ""
+
+    async def bulk_upsert(self, tenders: List[Dict[str, Any]], changed_only: bool = False) -> Dict[str, Any]:
+        """
+        Upsert tenders by bid_id in one unordered bulk_write.
+
+        With `changed_only`, existing tenders get only the given fields rewritten
+        (`scraped_info` field by field) and keep their `status`, so a rescrape
+        does not queue processed bids again.
 
-    async def get_by_id(self, tender_id: str) -> Optional[Dict[str, Any]]:
-        return await self.collection.find_one({"_id": ObjectId(tender_id)})
+        Returns {"inserted": {bid_id: id}, "matched": [bid_id], "errors": {bid_id: message}}.
+        A failed bid does not stop the rest of the batch.
+        """
+        now = datetime.now(timezone.utc)
+        operations = []
+        bid_ids = []
+        for tender in tenders:
+            data = dict(tender)
+            data.pop("created_at", None)
+            data["updated_at"] = now
+            on_insert: Dict[str, Any] = {"created_at": now}
+            if changed_only:
+                for field in _INSERT_ONLY_FIELDS:
+                    if field in data:
+                        on_insert[field] = data.pop(field)
+                for field, value in (data.pop("scraped_info", None) or {}).items():
+                    data[f"scraped_info.{field}"] = value
+            bid_ids.append(tender["bid_id"])
+            operations.append(UpdateOne({"bid_id": tender["bid_id"]}, {"$setOnInsert": on_insert, "$set": data}, upsert=True))
+
+        result = {"inserted": {}, "matched": [], "errors": {}}
+        if not operations:
+            return result
+        try:
+            outcome = await self.collection.bulk_write(operations, ordered=False)
+            upserted = {index: str(_id) for index, _id in outcome.upserted_ids.items()}
+            failed: Dict[int, str] = {}
+        except BulkWriteError as exc:
+            upserted = {item["index"]: str(item["_id"]) for item in exc.details.get("upserted", [])}
+            failed = {item["index"]: item.get("errmsg", "") for item in exc.details.get("writeErrors", [])}
+
+        for index, bid_id in enumerate(bid_ids):
+            if index in failed:
+                result["errors"][bid_id] = failed[index]
+            elif index in upserted:
+                result["inserted"][bid_id] = upserted[index]
+            else:
+                result["matched"].append(bid_id)
+        return result
+
+    async def get_by_id(self, tender_id: str, view: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": ObjectId(tender_id)}, self.VIEWS.get(view))
 
     async def get_by_bid_id(self, bid_id: str) -> Optional[Dict[str, Any]]:
         return await self.collection.find_one({"bid_id": bid_id})
 
-    async def list(self, skip: int = 0, limit: int = 50, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        cursor = self.collection.find(filters or {}).skip(skip).limit(limit).sort("created_at", -1)
+    async def get_many_by_bid_ids(self, bid_ids: List[str]) -> List[Dict[str, Any]]:
+        """Tenders for `bid_ids` in the same order, in one query; missing ids are left out."""
+        by_bid_id = {tender["bid_id"]: tender async for tender in self.collection.find({"bid_id": {"$in": bid_ids}})}
+        return [by_bid_id[bid_id] for bid_id in bid_ids if bid_id in by_bid_id]
+
+    async def iter_bid_ids(self) -> AsyncIterator[str]:
+        async for tender in self.collection.find({}, {"bid_id": 1, "_id": 0}):
+            if tender.get("bid_id"):
+                yield tender["bid_id"]
+
+    async def scrape_hashes(self, bid_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Stored listing fingerprint per bid_id, for the ids that exist."""
+        cursor = self.collection.find({"bid_id": {"$in": bid_ids}}, {"bid_id": 1, "scrape_hash": 1, "_id": 0})
+        return {tender["bid_id"]: tender.get("scrape_hash") async for tender in cursor}
+
+    async def list(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        filters: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        view: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        projection = projection or self.VIEWS.get(view)
+        cursor = self.collection.find(filters or {}, projection).skip(skip).limit(limit).sort("created_at", -1)
         return await cursor.to_list(length=limit)
 
+    async def list_ids(self, filters: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Ids of every tender matching `filters`, without loading the documents."""
+        return [str(tender["_id"]) async for tender in self.collection.find(filters or {}, {"_id": 1})]
+
     async def update(self, tender_id: str, data: Dict[str, Any]) -> bool:
         data["updated_at"] = datetime.now(timezone.utc)
         result = await self.collection.update_one({"_id": ObjectId(tender_id)}, {"$set": data})
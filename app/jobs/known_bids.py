@@ -0,0 +1,47 @@
+"""
+Known-bid index for incremental scraping.
+
+A Bloom filter of every stored bid_id answers "definitely new" without touching
+Mongo; only ids it reports as possibly known are checked against the stored
+listing fingerprint, one query per page.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.database.repositories.tender_repo import TenderRepository
+from app.services.tender_service import scrape_fingerprint
+from app.utils.bloom import BloomFilter
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class KnownBids:
+    def __init__(self, repo: TenderRepository, bloom: BloomFilter) -> None:
+        self.repo = repo
+        self.bloom = bloom
+
+    @classmethod
+    async def load(cls, repo: TenderRepository) -> "KnownBids":
+        bid_ids = [bid_id async for bid_id in repo.iter_bid_ids()]
+        # Headroom so the false-positive rate holds as this run adds new bids
+        bloom = BloomFilter(max(len(bid_ids) * 2, 10000), settings.SCRAPE_BLOOM_ERROR_RATE)
+        for bid_id in bid_ids:
+            bloom.add(bid_id)
+        logger.info("scrape.known_bids_loaded", count=len(bid_ids), bits=bloom.size)
+        return cls(repo, bloom)
+
+    async def new_or_changed(self, bids: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The bids of one page that are not stored yet or whose listing fields changed."""
+        maybe_known = [bid["bid_id"] for bid in bids if bid.get("bid_id") in self.bloom]
+        stored = await self.repo.scrape_hashes(maybe_known) if maybe_known else {}
+        fresh = []
+        for bid in bids:
+            bid_id = bid.get("bid_id")
+            if bid_id not in stored or stored[bid_id] != scrape_fingerprint(bid):
+                fresh.append(bid)
+                self.bloom.add(bid_id)
+        return fresh
@@ -0,0 +1,133 @@
+"""
+Streaming stage pipeline connected by bounded asyncio queues.
+
+Each stage runs its own pool of workers. When a stage's inbox is full the stage
+feeding it waits, so a slow stage (the LLM) holds back the cheap ones instead of
+the whole scrape piling up in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Pushed through a queue once its producer is done
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step. `handler(item)` returns the item to pass downstream, or
+    None to drop it (already handled, e.g. a download that failed cleanly).
+    A `fan_out` stage returns a list instead, and each entry is passed on as
+    its own item (a batch in, the batch's items out).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Optional[Any]]],
+        concurrency: int,
+        fan_out: bool = False,
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(concurrency, 1)
+        self.fan_out = fan_out
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_sec": round(self.processed / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+
+class Pipeline:
+    """Runs items from an async source through `stages`, overlapping all of them."""
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int,
+        on_error: Optional[Callable[[str, Any, Exception], Awaitable[None]]] = None,
+    ) -> None:
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+        self.on_error = on_error
+
+    async def run(self, source: AsyncIterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Feed `source` into the first stage and wait until every stage has drained."""
+        queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        tasks = [
+            asyncio.create_task(self._run_stage(stage, queues[i], queues[i + 1] if i + 1 < len(queues) else None))
+            for i, stage in enumerate(self.stages)
+        ]
+        try:
+            async for item in source:
+                await queues[0].put(item)
+            await queues[0].put(_DONE)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self.stats()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]) -> None:
+        await asyncio.gather(*(self._worker(stage, inbox, outbox) for _ in range(stage.concurrency)))
+        stage.finished_at = time.perf_counter()
+        logger.info("pipeline.stage_done", stage=stage.name, **stage.stats())
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Leave the marker for this stage's other workers; taking it freed the slot
+                inbox.put_nowait(_DONE)
+                return
+            if stage.started_at is None:
+                stage.started_at = time.perf_counter()
+
+            started = time.perf_counter()
+            try:
+                result = await stage.handler(item)
+            except Exception as exc:
+                stage.failed += 1
+                if self.on_error is not None:
+                    await self.on_error(stage.name, item, exc)
+                continue
+            finally:
+                stage.busy_seconds += time.perf_counter() - started
+
+            if result is None or (stage.fan_out and not result):
+                stage.dropped += 1
+                continue
+            stage.processed += 1
+            if outbox is not None:
+                for output in result if stage.fan_out else (result,):
+                    await outbox.put(output)
@@ -9,7 +9,7 @@ import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.config import settings
-from app.jobs.scrape_job import run_process_job, run_scrape_job
+from app.jobs.scrape_job import run_expiry_job, run_process_job, run_scrape_job
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,6 +36,13 @@ def start_scheduler() -> None:
         id="process_job",
         replace_existing=True,
     )
+    scheduler.add_job(
+        run_expiry_job,
+        "interval",
+        minutes=settings.EXPIRY_SWEEP_INTERVAL_MINUTES,
+        id="expiry_job",
+        replace_existing=True,
+    )
     scheduler.start()
     logger.info("scheduler.started")
 
@@ -7,11 +7,13 @@ from __future__ import annotations
 import asyncio
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.config import settings
 from app.database.mongodb import get_database
-from app.scraper.gem_scraper import GemScraper
+from app.jobs.known_bids import KnownBids
+from app.jobs.pipeline import Pipeline, Stage
+from app.scraper.gem_http_scraper import create_scraper
 from app.services.tender_service import TenderService
 from app.utils.logger import get_logger
 
@@ -33,8 +35,10 @@ async def run_scrape_job() -> None:
             "pages_scraped": 0,
             "tenders_found": 0,
             "new_tenders": 0,
+            "updated_tenders": 0,
             "pdfs_downloaded": 0,
             "llm_processed": 0,
+            "known_skipped": 0,
             "errors": 0,
         },
         "errors": [],
@@ -45,27 +49,35 @@ async def run_scrape_job() -> None:
     stats = log_entry["stats"]
     errors: List[Dict[str, Any]] = []
 
+    async def record_error(stage: str, item: Any, exc: Exception) -> None:
+        if isinstance(item, list):
+            # A whole upsert batch failed
+            for bid in item:
+                await record_error(stage, bid, exc)
+            return
+        stats["errors"] += 1
+        errors.append(
+            {
+                "bid_id": item.get("bid_id"),
+                "stage": stage,
+                "error": str(exc),
+                "timestamp": datetime.now(timezone.utc),
+            }
+        )
+        logger.info("scrape.stage_failed", stage=stage, bid_id=item.get("bid_id"), error=str(exc))
+        if "tender" in item:
+            try:
+                await service.mark_failed(item["tender"], str(exc))
+            except Exception as status_exc:
+                logger.info("scrape.status_update_failed", bid_id=item.get("bid_id"), error=str(status_exc))
+
     try:
-        async with GemScraper() as scraper:
-            bids = await scraper.scrape_bids()
-            stats["tenders_found"] = len(bids)
-
-            for bid in bids:
-                try:
-                    await service.create_or_update_from_scrape(bid)
-                    stats["new_tenders"] += 1
-                    if await service.process_tender(bid.get("bid_id")):
-                        stats["pdfs_downloaded"] += 1
-                        stats["llm_processed"] += 1
-                except Exception as exc:
-                    stats["errors"] += 1
-                    errors.append(
-                        {
-                            "bid_id": bid.get("bid_id"),
-                            "error": str(exc),
-                            "timestamp": datetime.now(timezone.utc),
-                        }
-                    )
+        known = await KnownBids.load(service.repo) if settings.SCRAPE_INCREMENTAL else None
+        async with create_scraper() as scraper:
+            pipeline = Pipeline(_ingest_stages(service, stats), settings.PIPELINE_QUEUE_SIZE, on_error=record_error)
+            batches = _scraped_batches(scraper, stats, known, settings.SCRAPE_UPSERT_BATCH_SIZE)
+            stats["stages"] = await pipeline.run(batches)
+            stats["scraper"] = scraper.stats()
 
         await scrape_logs.update_one(
             {"job_id": job_id},
@@ -101,6 +113,85 @@ async def run_scrape_job() -> None:
         logger.info("scrape.job_failed", error=str(exc))
 
 
+async def _scraped_batches(
+    scraper: Any, stats: Dict[str, Any], known: Optional[KnownBids] = None, batch_size: int = 50
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Bids in scrape order, in batches of up to `batch_size` that never wait for the
+    next page, so processing starts with the first page.
+    With `known`, unchanged bids are skipped. Paging stops at the first fully known page
+    only when the scraper reports a newest-first listing (`newest_first`); in any other
+    order new bids can sit behind known ones, so every page is read.
+    """
+    batch_size = max(batch_size, 1)
+    pages = scraper.iter_bid_pages()
+    try:
+        async for bids in pages:
+            stats["pages_scraped"] += 1
+            stats["tenders_found"] += len(bids)
+            if known is not None:
+                fresh = await known.new_or_changed(bids)
+                stats["known_skipped"] += len(bids) - len(fresh)
+                if bids and not fresh and getattr(scraper, "newest_first", False):
+                    logger.info("scrape.caught_up", page=stats["pages_scraped"])
+                    break
+                bids = fresh
+            for start in range(0, len(bids), batch_size):
+                yield bids[start : start + batch_size]
+    finally:
+        await pages.aclose()
+
+
+def _ingest_stages(service: TenderService, stats: Dict[str, Any]) -> List[Stage]:
+    """upsert (one bulk write per batch) -> download -> extract -> LLM -> embed -> persist, one TenderService step each."""
+
+    async def upsert(bids: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = await service.upsert_scraped(bids)
+        stats["new_tenders"] += len(result["inserted"])
+        stats["updated_tenders"] += len(result["matched"])
+        for bid_id, error in result["errors"].items():
+            stats["errors"] += 1
+            logger.info("scrape.upsert_failed", bid_id=bid_id, error=error)
+        return [{"bid_id": tender["bid_id"], "tender": tender} for tender in result["tenders"]]
+
+    async def download(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not await service.download_pdf(item["tender"]):
+            return None
+        stats["pdfs_downloaded"] += 1
+        return item
+
+    async def extract(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        duplicate = await service.find_processed_duplicate(item["tender"])
+        if duplicate:
+            # Same PDF as an already processed bid: no extraction, LLM or embedding needed
+            await service.reuse_processed(item["tender"], duplicate)
+            return None
+        item["text"] = await service.extract_text(item["tender"])
+        return item if item["text"] else None
+
+    async def llm(item: Dict[str, Any]) -> Dict[str, Any]:
+        item["metadata"] = await service.extract_metadata(item["tender"], item.pop("text"))
+        stats["llm_processed"] += 1
+        return item
+
+    async def embed(item: Dict[str, Any]) -> Dict[str, Any]:
+        item["summary_embedding"] = await service.embed_summary(item["tender"], item["metadata"])
+        return item
+
+    async def persist(item: Dict[str, Any]) -> Dict[str, Any]:
+        await service.save_processed(item["tender"], item["metadata"], item["summary_embedding"])
+        return item
+
+    return [
+        Stage("upsert", upsert, settings.PIPELINE_UPSERT_CONCURRENCY, fan_out=True),
+        Stage("download", download, settings.PIPELINE_DOWNLOAD_CONCURRENCY),
+        Stage("extract", extract, settings.PIPELINE_EXTRACT_CONCURRENCY),
+        Stage("llm", llm, settings.PIPELINE_LLM_CONCURRENCY),
+        Stage("embed", embed, settings.PIPELINE_EMBED_CONCURRENCY),
+        Stage("persist", persist, settings.PIPELINE_PERSIST_CONCURRENCY),
+    ]
+
+
 def run_scrape_job_sync() -> None:
     asyncio.run(run_scrape_job())
 
@@ -159,6 +250,15 @@ async def run_process_job() -> None:
         logger.info("process.job_failed", error=str(exc))
 
 
+async def run_expiry_job() -> None:
+    db = get_database()
+    try:
+        expired = await TenderService(db).expire_tenders()
+        logger.info("expiry.sweep_completed", expired=expired)
+    except Exception as exc:
+        logger.info("expiry.sweep_failed", error=str(exc))
+
+
 def run_process_job_sync() -> None:
     asyncio.run(run_process_job())
 
@@ -14,6 +14,10 @@ from app.api.routes import dashboard, jobs, websocket
 from app.config import settings
 from app.database.mongodb import create_indexes, close_client
 from app.jobs.scheduler import shutdown_scheduler, start_scheduler
+from app.jobs.scrape_job import run_expiry_job
+from app.processors.llm_extractor import close_async_client
+from app.scraper.pdf_downloader import close_downloader
+from app.utils.executors import shutdown_executors
 from app.utils.logger import configure_logging
 from app.utils.exceptions import AppError
 
@@ -72,6 +76,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def on_startup() -> None:
     configure_logging(settings.LOG_LEVEL)
     await create_indexes()
+    # Also without the scheduler, so expired flags never stay stale from one run to the next
+    await run_expiry_job()
     if settings.ENABLE_SCHEDULER:
         start_scheduler()
 
@@ -81,6 +87,9 @@ async def on_shutdown() -> None:
     if settings.ENABLE_SCHEDULER:
         shutdown_scheduler()
     await close_client()
+    await close_async_client()
+    await close_downloader()
+    shutdown_executors()
 
 
 @app.get("/health")
@@ -51,12 +51,23 @@ class TenderStatus(BaseModel):
     last_error: Optional[str] = None
 
 
+class TenderPDFValidators(BaseModel):
+    url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    checked_at: Optional[datetime] = None
+
+
 class TenderBase(BaseModel):
     bid_id: str
     ra_no: Optional[str] = None
+    scrape_hash: Optional[str] = None
     gem_url: Optional[str] = None
     pdf_url: Optional[str] = None
     pdf_local_path: Optional[str] = None
+    pdf_hash: Optional[str] = None
+    pdf_http: Optional[TenderPDFValidators] = None
     scraped_info: Optional[TenderScrapedInfo] = None
     metadata: Optional[TenderMetadata] = None
     summary_embedding: Optional[List[float]] = None
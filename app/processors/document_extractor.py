@@ -10,6 +10,7 @@ from typing import Optional
 
 import fitz
 
+from app.utils.executors import process_pool, thread_pool
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,6 +32,10 @@ def is_supported_file(filename: str) -> bool:
     return ext in SUPPORTED_EXTENSIONS
 
 
+def _extract_in_worker(path: str) -> Optional[str]:
+    return DocumentExtractor().extract_text(path)
+
+
 class DocumentExtractor:
     """Extract text from various document formats."""
 
@@ -66,6 +71,15 @@ class DocumentExtractor:
             logger.info("document.extraction_failed", path=path, error=str(exc))
             return None
 
+    async def extract_text_async(self, path: str) -> Optional[str]:
+        """
+        `extract_text` off the event loop: PDFs on the thread pool (PyMuPDF releases the GIL),
+        Word and PowerPoint files on the process pool since their parsers are pure Python.
+        """
+        ext = os.path.splitext((path or "").lower())[1]
+        pool = process_pool if ext in {".docx", ".doc", ".ppt", ".pptx"} else thread_pool
+        return await pool.run(_extract_in_worker, path)
+
     def _extract_pdf(self, path: str) -> Optional[str]:
         """Extract text from PDF using PyMuPDF."""
         try:
@@ -4,35 +4,189 @@ Text embedding generation using sentence-transformers.
 
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from app.config import settings
+from app.utils.executors import thread_pool
+
+# Models shared by every embedder in the process, keyed by model name
+_models: Dict[str, SentenceTransformer] = {}
+_models_lock = threading.Lock()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of embeddings keyed by (model name, text hash)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> Tuple[str, str]:
+        return model_name, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return vector.astype(float).tolist()
+
+    def set(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            # Kept in the model's own dtype (float32 for sentence-transformers)
+            self._entries[key] = np.array(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_SIZE)
 
 
 class TextEmbedder:
-    def __init__(self) -> None:
+    def __init__(self, model_name: Optional[str] = None) -> None:
+        self.model_name = model_name or settings.EMBEDDING_MODEL
         self._model: Optional[SentenceTransformer] = None
         self._dim: int = 384
+        self._batcher: Optional[_MicroBatcher] = None
 
     def _load_model(self) -> SentenceTransformer:
         if self._model is None:
-            self._model = SentenceTransformer(settings.EMBEDDING_MODEL)
+            with _models_lock:
+                model = _models.get(self.model_name)
+                if model is None:
+                    model = SentenceTransformer(self.model_name)
+                    _models[self.model_name] = model
+            self._model = model
             self._dim = int(self._model.get_sentence_embedding_dimension())
         return self._model
 
     def embed(self, text: str) -> List[float]:
         if not text:
             return [0.0] * self._dim
+        key = embedding_cache.key(self.model_name, text)
+        cached = embedding_cache.get(key)
+        if cached is not None:
+            return cached
         model = self._load_model()
-        vector = np.asarray(model.encode(text, normalize_embeddings=True), dtype=float)
-        return vector.tolist()
+        vector = np.asarray(model.encode(text, normalize_embeddings=True))
+        embedding_cache.set(key, vector)
+        return vector.astype(float).tolist()
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts with one `model.encode` call for the ones not already cached."""
         if not texts:
             return []
-        model = self._load_model()
-        embeddings = np.atleast_2d(model.encode(texts, normalize_embeddings=True))
-        return embeddings.astype(float).tolist()
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if not text:
+                results[i] = [0.0] * self._dim
+                continue
+            cached = embedding_cache.get(embedding_cache.key(self.model_name, text))
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            model = self._load_model()
+            unique_texts = list(pending)
+            embeddings = np.atleast_2d(model.encode(unique_texts, normalize_embeddings=True))
+            for text, vector in zip(unique_texts, embeddings):
+                embedding_cache.set(embedding_cache.key(self.model_name, text), vector)
+                values = vector.astype(float).tolist()
+                for i in pending[text]:
+                    results[i] = list(values)
+        return results
+
+    async def embed_async(self, text: str) -> List[float]:
+        """
+        Embed from async code. Cache hits return immediately; misses from concurrent
+        callers are grouped into one batch and encoded on the worker thread pool.
+        """
+        if not text:
+            return [0.0] * self._dim
+        cached = embedding_cache.get(embedding_cache.key(self.model_name, text))
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.loop is not loop:
+            self._batcher = _MicroBatcher(self, loop)
+        return await self._batcher.submit(text)
+
+
+class _MicroBatcher:
+    """Collects concurrent embed requests for up to EMBEDDING_BATCH_WAIT_MS and encodes them together."""
+
+    def __init__(self, embedder: TextEmbedder, loop: asyncio.AbstractEventLoop) -> None:
+        self.embedder = embedder
+        self.loop = loop
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, text: str) -> asyncio.Future:
+        future = self.loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= settings.EMBEDDING_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(settings.EMBEDDING_BATCH_WAIT_MS / 1000, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self.loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            embeddings = await thread_pool.run(self.embedder.embed_batch, [text for text, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+_shared_embedder: Optional[TextEmbedder] = None
+
+
+def get_embedder() -> TextEmbedder:
+    """Process-wide embedder, so services share one model and one batching queue."""
+    global _shared_embedder
+    if _shared_embedder is None:
+        _shared_embedder = TextEmbedder()
+    return _shared_embedder
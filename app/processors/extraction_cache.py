@@ -0,0 +1,308 @@
+"""
+Content-addressed cache of LLM extraction results.
+
+Entries are keyed by a hash of the whitespace-normalized input text, the prompt
+template, provider and model, so reprocessing an unchanged document (or the
+unchanged chunks of a partly changed one) does not call the LLM again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import MongoClient
+
+from app.config import settings
+from app.database.mongodb import get_database
+from app.utils.helpers import ensure_dir
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Run eviction after this many stores instead of on every write
+_EVICT_EVERY = 100
+
+
+def _prompt_version(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def extraction_key(template: str, content: str, provider: str, model: str) -> str:
+    """Cache key for one extraction: cleaned text + prompt version + provider + model."""
+    cleaned = " ".join((content or "").split())
+    payload = json.dumps([provider, model, _prompt_version(template), cleaned], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extraction_version(template: str, provider: str, model: str) -> str:
+    """What produced an extraction (prompt version + provider + model), stored with its results."""
+    payload = json.dumps([provider, model, _prompt_version(template)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ExtractionCache(ABC):
+    """
+    Base cache with hit/miss counters; subclasses implement storage.
+
+    `get`/`set` block and serve synchronous callers. The event loop uses `get_async`/`set_async`,
+    which run the blocking hooks in a worker thread unless a backend overrides the `_async` hooks.
+    """
+
+    def __init__(self, max_entries: int, max_age_days: float) -> None:
+        # Entries unused for `max_age_days` expire; beyond `max_entries` the least recently used go first
+        self.max_entries = max_entries
+        self.max_age = timedelta(days=max_age_days)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self._load(key)
+        except Exception as exc:
+            logger.info("llm_cache.read_failed", error=str(exc))
+            value = None
+        return self._count_lookup(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self._store(key, value)
+        except Exception as exc:
+            logger.info("llm_cache.write_failed", error=str(exc))
+            return
+        if self._count_store():
+            self.evict()
+
+    def evict(self) -> int:
+        try:
+            removed = self._evict()
+        except Exception as exc:
+            logger.info("llm_cache.evict_failed", error=str(exc))
+            return 0
+        return self._count_evictions(removed)
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self._load_async(key)
+        except Exception as exc:
+            logger.info("llm_cache.read_failed", error=str(exc))
+            value = None
+        return self._count_lookup(value)
+
+    async def set_async(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            await self._store_async(key, value)
+        except Exception as exc:
+            logger.info("llm_cache.write_failed", error=str(exc))
+            return
+        if self._count_store():
+            await self.evict_async()
+
+    async def evict_async(self) -> int:
+        try:
+            removed = await self._evict_async()
+        except Exception as exc:
+            logger.info("llm_cache.evict_failed", error=str(exc))
+            return 0
+        return self._count_evictions(removed)
+
+    def _count_lookup(self, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _count_store(self) -> bool:
+        """Record a store; True when it is time to evict."""
+        with self._lock:
+            self.stores += 1
+            return self.stores % _EVICT_EVERY == 0
+
+    def _count_evictions(self, removed: int) -> int:
+        with self._lock:
+            self.evictions += removed
+        if removed:
+            logger.info("llm_cache.evicted", removed=removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached value for `key`, or None."""
+
+    @abstractmethod
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        """Write `value` under `key`."""
+
+    @abstractmethod
+    def _evict(self) -> int:
+        """Drop expired and least recently used entries; returns how many were removed."""
+
+    async def _load_async(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._load, key)
+
+    async def _store_async(self, key: str, value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._store, key, value)
+
+    async def _evict_async(self) -> int:
+        return await asyncio.to_thread(self._evict)
+
+
+class DiskExtractionCache(ExtractionCache):
+    """JSON files sharded by key prefix; file mtime tracks last use for age and LRU eviction."""
+
+    def __init__(self, directory: str, max_entries: int, max_age_days: float) -> None:
+        super().__init__(max_entries, max_age_days)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age.total_seconds():
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return entry.get("value")
+
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        ensure_dir(os.path.dirname(path))
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"created_at": time.time(), "value": value}, handle, default=str)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - self.max_age.total_seconds()
+        entries = []
+        removed = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                mtime = item.stat().st_mtime
+                if mtime < cutoff:
+                    os.remove(item.path)
+                    removed += 1
+                else:
+                    entries.append((mtime, item.path))
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[: len(entries) - self.max_entries]:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+class MongoExtractionCache(ExtractionCache):
+    """
+    `llm_cache` collection; a TTL index on last_used_at handles age-based expiry.
+
+    The async hooks go through the app's Motor database. Synchronous callers (scripts,
+    the blocking extractor API) get a pymongo client, opened on first use.
+    """
+
+    COLLECTION = "llm_cache"
+
+    def __init__(self, max_entries: int, max_age_days: float) -> None:
+        super().__init__(max_entries, max_age_days)
+        self._sync_collection = None
+
+    @property
+    def collection(self):
+        return get_database().get_collection(self.COLLECTION)
+
+    @property
+    def sync_collection(self):
+        if self._sync_collection is None:
+            self._sync_collection = MongoClient(settings.MONGO_URI)[settings.DB_NAME].get_collection(self.COLLECTION)
+        return self._sync_collection
+
+    def _lookup(self, key: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        return {"_id": key, "last_used_at": {"$gte": now - self.max_age}}, {"$set": {"last_used_at": now}}
+
+    def _entry(self, key: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        return {"_id": key, "value": value, "created_at": now, "last_used_at": now}
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.sync_collection.find_one_and_update(*self._lookup(key), projection={"value": 1})
+        return entry.get("value") if entry else None
+
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        self.sync_collection.replace_one({"_id": key}, self._entry(key, value), upsert=True)
+
+    def _evict(self) -> int:
+        excess = self.sync_collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest = self.sync_collection.find({}, {"_id": 1}).sort("last_used_at", 1).limit(excess)
+        ids = [entry["_id"] for entry in oldest]
+        return self.sync_collection.delete_many({"_id": {"$in": ids}}).deleted_count
+
+    async def _load_async(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = await self.collection.find_one_and_update(*self._lookup(key), projection={"value": 1})
+        return entry.get("value") if entry else None
+
+    async def _store_async(self, key: str, value: Dict[str, Any]) -> None:
+        await self.collection.replace_one({"_id": key}, self._entry(key, value), upsert=True)
+
+    async def _evict_async(self) -> int:
+        excess = await self.collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest = self.collection.find({}, {"_id": 1}).sort("last_used_at", 1).limit(excess)
+        ids = [entry["_id"] async for entry in oldest]
+        result = await self.collection.delete_many({"_id": {"$in": ids}})
+        return result.deleted_count
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_loaded = False
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Process-wide extraction cache for the configured backend, or None when disabled."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        backend = settings.LLM_CACHE_BACKEND.lower()
+        if backend == "disk":
+            _cache = DiskExtractionCache(
+                settings.LLM_CACHE_DIR, settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_MAX_AGE_DAYS
+            )
+        elif backend == "mongo":
+            _cache = MongoExtractionCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_MAX_AGE_DAYS)
+        _cache_loaded = True
+    return _cache
@@ -5,14 +5,17 @@ Supports full document processing with intelligent chunking for large documents.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import re
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import settings
+from app.processors.extraction_cache import extraction_key, extraction_version, get_extraction_cache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -77,6 +80,67 @@ Metadata objects to merge:
 """
 
 
+# How chunk results are combined per key when merging without the LLM:
+# "list" union in chunk order, "text" longest value, "first" first value seen,
+# "max" largest number, "any" true if any chunk says so, "object" merged recursively
+TENDER_MERGE_RULES: Dict[str, str] = {
+    "title": "first",
+    "department": "first",
+    "sector": "first",
+    "domains": "list",
+    "required_certifications": "list",
+    "required_technologies": "list",
+    "required_experience_years": "max",
+    "estimated_value": "first",
+    "eligibility_criteria": "object",
+    "location": "first",
+    "delivery_period": "first",
+    "emd_amount": "first",
+    "summary": "text",
+}
+
+COMPANY_MERGE_RULES: Dict[str, str] = {
+    "company_name": "first",
+    "industries": "list",
+    "capabilities": "list",
+    "certifications": "list",
+    "technologies": "list",
+    "domains": "list",
+    "past_clients": "list",
+    "government_experience": "any",
+    "years_in_business": "max",
+    "employee_count": "first",
+    "annual_turnover": "first",
+    "locations": "list",
+    "registrations": "list",
+    "summary": "text",
+}
+
+
+# Connection pool and in-flight limit shared by all extractors, created per event loop
+_async_state: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, asyncio.Semaphore]] = None
+
+
+def _get_async_state() -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    global _async_state
+    loop = asyncio.get_running_loop()
+    if _async_state is None or _async_state[0] is not loop:
+        limits = httpx.Limits(
+            max_connections=settings.LLM_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.LLM_MAX_CONCURRENCY,
+        )
+        client = httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS, limits=limits)
+        _async_state = (loop, client, asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY))
+    return _async_state[1], _async_state[2]
+
+
+async def close_async_client() -> None:
+    global _async_state
+    if _async_state is not None:
+        await _async_state[1].aclose()
+        _async_state = None
+
+
 class LLMExtractor:
     def __init__(self) -> None:
         self.provider = settings.LLM_PROVIDER.lower()
@@ -139,105 +203,203 @@ class LLMExtractor:
         logger.info("llm.text_chunked", total_length=len(text), num_chunks=len(chunks))
         return chunks
 
-    def _merge_metadata(self, metadata_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _merge_metadata(self, metadata_list: List[Dict[str, Any]], schema: Dict[str, str]) -> Dict[str, Any]:
         """Merge multiple metadata dicts into one comprehensive result."""
         if not metadata_list:
             return {}
         if len(metadata_list) == 1:
             return metadata_list[0]
 
-        # Try LLM-based merging for better results
-        try:
-            metadata_json = json.dumps(metadata_list, indent=2)
-            prompt = CHUNK_MERGE_PROMPT.format(metadata_list=metadata_json)
-            response_text = self._generate(prompt)
-            merged = self._parse_json(response_text)
-            if merged:
-                return merged
-        except Exception as exc:
-            logger.info("llm.merge_failed", error=str(exc))
-
-        # Fallback: manual merging
-        return self._manual_merge(metadata_list)
-
-    def _manual_merge(self, metadata_list: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Manually merge metadata when LLM merging fails."""
+        # The LLM merge costs one more round trip; the schema merge is deterministic
+        if settings.LLM_CHUNK_MERGE == "llm":
+            try:
+                metadata_json = json.dumps(metadata_list, indent=2)
+                prompt = CHUNK_MERGE_PROMPT.format(metadata_list=metadata_json)
+                response_text = self._generate(prompt)
+                merged = self._parse_json(response_text)
+                if merged:
+                    return merged
+            except Exception as exc:
+                logger.info("llm.merge_failed", error=str(exc))
+
+        return self._manual_merge(metadata_list, schema)
+
+    async def _merge_metadata_async(
+        self, metadata_list: List[Dict[str, Any]], schema: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """`_merge_metadata` without blocking the event loop."""
+        if not metadata_list:
+            return {}
+        if len(metadata_list) == 1:
+            return metadata_list[0]
+
+        if settings.LLM_CHUNK_MERGE == "llm":
+            try:
+                metadata_json = json.dumps(metadata_list, indent=2)
+                prompt = CHUNK_MERGE_PROMPT.format(metadata_list=metadata_json)
+                response_text = await self._generate_async(prompt)
+                merged = self._parse_json(response_text)
+                if merged:
+                    return merged
+            except Exception as exc:
+                logger.info("llm.merge_failed", error=str(exc))
+
+        return self._manual_merge(metadata_list, schema)
+
+    def _manual_merge(
+        self, metadata_list: List[Dict[str, Any]], schema: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Merge chunk metadata in chunk order using the schema's merge rule per key.
+        Keys outside the schema are merged by value type.
+        """
+        schema = schema or {}
         merged: Dict[str, Any] = {}
 
         for metadata in metadata_list:
             for key, value in metadata.items():
-                if value is None:
+                if value is None or value == "" or value == []:
                     continue
 
                 existing = merged.get(key)
+                rule = schema.get(key)
 
+                if existing is None and isinstance(value, list):
+                    existing = []
                 if existing is None:
                     merged[key] = value
+                elif rule == "object" and isinstance(value, dict) and isinstance(existing, dict):
+                    merged[key] = self._manual_merge([existing, value])
                 elif isinstance(value, list) and isinstance(existing, list):
-                    # Merge and deduplicate arrays
-                    combined = existing + [v for v in value if v not in existing]
+                    # Merge and deduplicate arrays, case-insensitively for strings
+                    seen = {self._dedupe_key(v) for v in existing}
+                    combined = list(existing)
+                    for v in value:
+                        if self._dedupe_key(v) not in seen:
+                            seen.add(self._dedupe_key(v))
+                            combined.append(v)
                     merged[key] = combined
-                elif isinstance(value, str) and isinstance(existing, str):
-                    # Keep longer/more detailed string
-                    if len(value) > len(existing):
-                        merged[key] = value
+                elif rule == "max" and isinstance(value, (int, float)) and isinstance(existing, (int, float)):
+                    merged[key] = max(existing, value)
                 elif isinstance(value, bool):
                     # If any is True, result is True
                     merged[key] = existing or value
-                elif isinstance(value, (int, float)) and existing is None:
-                    merged[key] = value
+                elif isinstance(value, str) and isinstance(existing, str) and rule != "first":
+                    # Keep longer/more detailed string
+                    if len(value) > len(existing):
+                        merged[key] = value
 
         return merged
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
-    def extract_tender(self, text: str) -> Dict[str, Any]:
-        """Extract tender metadata from full document text."""
-        max_chars = self._get_max_chars()
-
+    def _dedupe_key(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.strip().lower()
+        return json.dumps(value, sort_keys=True, default=str)
+
+    def _chunk_fan_out(self) -> int:
+        return max(settings.LLM_CHUNK_CONCURRENCY, 1)
+
+    def _model_name(self) -> str:
+        return settings.GEMINI_MODEL if self.provider == "gemini" else settings.LLM_MODEL
+
+    def _extract_piece(self, template: str, content: str) -> Dict[str, Any]:
+        """One LLM extraction (whole document or chunk), served from the extraction cache when possible."""
+        cache = get_extraction_cache()
+        key = extraction_key(template, content, self.provider, self._model_name()) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        metadata = self._parse_json(self._generate(template.format(content=content)))
+        if cache and metadata:
+            cache.set(key, metadata)
+        return metadata
+
+    async def _extract_piece_async(self, template: str, content: str) -> Dict[str, Any]:
+        cache = get_extraction_cache()
+        key = extraction_key(template, content, self.provider, self._model_name()) if cache else None
+        if cache:
+            cached = await cache.get_async(key)
+            if cached is not None:
+                return cached
+        metadata = self._parse_json(await self._generate_async(template.format(content=content)))
+        if cache and metadata:
+            await cache.set_async(key, metadata)
+        return metadata
+
+    def _extract(self, template: str, schema: Dict[str, str], text: str) -> Dict[str, Any]:
         # If text fits within limit, process directly
-        if len(text) <= max_chars:
-            prompt = TENDER_PROMPT.format(content=text)
-            response_text = self._generate(prompt)
-            return self._parse_json(response_text)
+        if len(text) <= self._get_max_chars():
+            return self._extract_piece(template, text)
 
-        # For very large documents, use chunking
+        # For very large documents, extract chunks in parallel and merge in chunk order
         chunks = self._split_into_chunks(text)
-        metadata_list = []
 
-        for i, chunk in enumerate(chunks):
-            logger.info("llm.processing_chunk", chunk_num=i+1, total_chunks=len(chunks))
-            prompt = TENDER_PROMPT.format(content=chunk)
-            response_text = self._generate(prompt)
-            metadata = self._parse_json(response_text)
-            if metadata:
-                metadata_list.append(metadata)
+        def extract_chunk(index: int) -> Dict[str, Any]:
+            logger.info("llm.processing_chunk", chunk_num=index + 1, total_chunks=len(chunks))
+            return self._extract_piece(template, chunks[index])
 
-        return self._merge_metadata(metadata_list)
+        with ThreadPoolExecutor(max_workers=min(self._chunk_fan_out(), len(chunks))) as pool:
+            results = list(pool.map(extract_chunk, range(len(chunks))))
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
-    def extract_company(self, text: str) -> Dict[str, Any]:
-        """Extract company metadata from full document text."""
-        max_chars = self._get_max_chars()
+        return self._merge_metadata([metadata for metadata in results if metadata], schema)
 
-        # If text fits within limit, process directly
-        if len(text) <= max_chars:
-            prompt = COMPANY_PROMPT.format(content=text)
-            response_text = self._generate(prompt)
-            return self._parse_json(response_text)
+    async def _extract_async(self, template: str, schema: Dict[str, str], text: str) -> Dict[str, Any]:
+        if len(text) <= self._get_max_chars():
+            return await self._extract_piece_async(template, text)
 
-        # For very large documents, use chunking
         chunks = self._split_into_chunks(text)
-        metadata_list = []
+        fan_out = asyncio.Semaphore(self._chunk_fan_out())
+
+        async def extract_chunk(index: int) -> Dict[str, Any]:
+            async with fan_out:
+                logger.info("llm.processing_chunk", chunk_num=index + 1, total_chunks=len(chunks))
+                return await self._extract_piece_async(template, chunks[index])
+
+        results = await asyncio.gather(*(extract_chunk(i) for i in range(len(chunks))))
+        return await self._merge_metadata_async([metadata for metadata in results if metadata], schema)
+
+    def tender_extraction_version(self) -> str:
+        """Version stamp of `extract_tender` results under the current prompt, provider and model."""
+        return extraction_version(TENDER_PROMPT, self.provider, self._model_name())
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
+    def extract_tender(self, text: str) -> Dict[str, Any]:
+        """Extract tender metadata from full document text."""
+        return self._extract(TENDER_PROMPT, TENDER_MERGE_RULES, text)
 
-        for i, chunk in enumerate(chunks):
-            logger.info("llm.processing_chunk", chunk_num=i+1, total_chunks=len(chunks))
-            prompt = COMPANY_PROMPT.format(content=chunk)
-            response_text = self._generate(prompt)
-            metadata = self._parse_json(response_text)
-            if metadata:
-                metadata_list.append(metadata)
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
+    def extract_company(self, text: str) -> Dict[str, Any]:
+        """Extract company metadata from full document text."""
+        return self._extract(COMPANY_PROMPT, COMPANY_MERGE_RULES, text)
 
-        return self._merge_metadata(metadata_list)
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
+    async def extract_tender_async(self, text: str) -> Dict[str, Any]:
+        """Async variant of `extract_tender` for use from the event loop."""
+        return await self._extract_async(TENDER_PROMPT, TENDER_MERGE_RULES, text)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
+    async def extract_company_async(self, text: str) -> Dict[str, Any]:
+        """Async variant of `extract_company` for use from the event loop."""
+        return await self._extract_async(COMPANY_PROMPT, COMPANY_MERGE_RULES, text)
+
+    async def _generate_async(self, prompt: str) -> str:
+        client, semaphore = _get_async_state()
+        async with semaphore:
+            if self.provider == "gemini":
+                response = await self._model.generate_content_async(prompt)
+                return response.text
+
+            payload = {"model": settings.LLM_MODEL, "prompt": prompt, "stream": False}
+            url = settings.LLM_BASE_URL.rstrip("/") + "/api/generate"
+            headers = {"Content-Type": "text/plain"}
+            response = await client.post(url, content=json.dumps(payload), headers=headers)
+        response.raise_for_status()
+        try:
+            data = response.json()
+            return data.get("response") or data.get("text") or response.text
+        except json.JSONDecodeError:
+            return response.text
 
     def _generate(self, prompt: str) -> str:
         if self.provider == "gemini":
@@ -9,6 +9,7 @@ from typing import Optional
 
 import fitz
 
+from app.utils.executors import thread_pool
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -37,6 +38,10 @@ class PDFExtractor:
         text = "\n".join(text_parts)
         return self._clean_text(text)
 
+    async def extract_text_async(self, path: str) -> Optional[str]:
+        """`extract_text` on the worker thread pool; PyMuPDF releases the GIL while parsing."""
+        return await thread_pool.run(self.extract_text, path)
+
     def _clean_text(self, text: str) -> str:
         cleaned = re.sub(r"Page\s+\d+", "", text, flags=re.IGNORECASE)
         cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
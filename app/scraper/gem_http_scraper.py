@@ -0,0 +1,222 @@
+"""
+Browserless GeM scraper.
+
+Calls the endpoint the all-bids page itself uses (a form POST to
+`all-bids-data` carrying the page's CSRF token and cookies) over one pooled
+aiohttp session. `FallbackScraper` switches to Playwright when this backend
+cannot produce a first page, e.g. after a portal change.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from app.config import settings
+from app.scraper.gem_scraper import USER_AGENT, GemScraper, limit_bid_pages, listing_page_rate, pages_per_minute
+from app.scraper.parser import parse_bid_cards, parse_bid_json
+from app.utils.logger import get_logger
+from app.utils.rate_limit import RateLimiter
+
+logger = get_logger(__name__)
+
+_CSRF_INPUT = re.compile(r"""<input[^>]*name=["'](csrf[^"']*)["'][^>]*value=["']([^"']+)["']""", re.I)
+
+
+class GemHttpScraper:
+    """Scraper for GeM bid listings over plain HTTP, with the same interface as `GemScraper`."""
+
+    BASE_URL = "https://bidplus.gem.gov.in"
+    LISTING_PATH = "/all-bids"
+    DATA_PATH = "/all-bids-data"
+    # Pages are requested latest-published first, so incremental runs can stop at a fully known page
+    LISTING_SORT = "Bid-Start-Date-Latest"
+    newest_first = True
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.csrf: Optional[Tuple[str, str]] = None
+        self.rate_limiter = RateLimiter(*listing_page_rate())
+        self.pages_loaded = 0
+        self._started_at: Optional[float] = None
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def initialize(self) -> None:
+        self.session = aiohttp.ClientSession(
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=GemScraper.PAGE_LOAD_TIMEOUT / 1000),
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "http",
+            "pages_loaded": self.pages_loaded,
+            "pages_per_minute": pages_per_minute(self.pages_loaded, self._started_at),
+        }
+
+    async def scrape_bids(self, max_pages: Optional[int] = None, max_bids: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Scrape bids from GeM listing pages."""
+        collected: List[Dict[str, Any]] = []
+        async for bids in self.iter_bid_pages(max_pages=max_pages, max_bids=max_bids):
+            collected.extend(bids)
+        return collected
+
+    async def iter_bid_pages(
+        self, max_pages: Optional[int] = None, max_bids: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the new bids of each listing page, in page order."""
+        if self.session is None:
+            raise RuntimeError("Scraper not initialized")
+
+        max_pages = max_pages or settings.SCRAPE_MAX_PAGES
+        max_bids = max_bids or settings.SCRAPE_MAX_BIDS
+        logger.info("scraper.start", backend="http", max_pages=max_pages, max_bids=max_bids)
+        self._started_at = time.perf_counter()
+        limited = limit_bid_pages(self._pages(max_pages), max_bids)
+        try:
+            async for bids in limited:
+                yield bids
+        finally:
+            await limited.aclose()
+            logger.info("scraper.done", **self.stats())
+
+    async def _pages(self, max_pages: int) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        for page_number in range(1, max_pages + 1):
+            bids = await self._fetch_page(page_number)
+            if not bids:
+                return
+            yield page_number, bids
+
+    async def listing_html(self) -> str:
+        await self.rate_limiter.acquire()
+        async with self.session.get(self.base_url + self.LISTING_PATH) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def _refresh_csrf(self) -> None:
+        """Load the listing page for its session cookies and the CSRF token the data endpoint expects."""
+        html = await self.listing_html()
+        match = _CSRF_INPUT.search(html)
+        if not match:
+            raise RuntimeError("CSRF token not found on the GeM listing page")
+        self.csrf = (match.group(1), match.group(2))
+
+    async def _fetch_page(self, page_number: int) -> List[Dict[str, Any]]:
+        body = await self.fetch_raw_page(page_number)
+        try:
+            return parse_bid_json(json.loads(body))
+        except ValueError:
+            # Some deployments answer with the rendered card HTML instead of JSON
+            return parse_bid_cards(body)
+
+    async def fetch_raw_page(self, page_number: int) -> str:
+        """Response body of the data endpoint for one listing page (also used to record test fixtures)."""
+        if self.csrf is None:
+            await self._refresh_csrf()
+        payload = {
+            "page": page_number,
+            "param": {"searchBid": "", "searchType": "fullText"},
+            "filter": {
+                "bidStatusType": "ongoing_bids",
+                "byType": "all",
+                "highBidValue": "",
+                "byEndDate": {"from": "", "to": ""},
+                "sort": self.LISTING_SORT,
+            },
+        }
+        headers = {"X-Requested-With": "XMLHttpRequest", "Referer": self.base_url + self.LISTING_PATH}
+        for attempt in range(2):
+            await self.rate_limiter.acquire()
+            form = {"payload": json.dumps(payload), self.csrf[0]: self.csrf[1]}
+            async with self.session.post(self.base_url + self.DATA_PATH, data=form, headers=headers) as response:
+                if response.status in (403, 419) and attempt == 0:
+                    # Token or session expired mid-run
+                    await self._refresh_csrf()
+                    continue
+                response.raise_for_status()
+                body = await response.text()
+            self.pages_loaded += 1
+            return body
+        return ""
+
+
+class FallbackScraper:
+    """HTTP backend first; Playwright takes over if the HTTP backend fails before yielding a page."""
+
+    def __init__(self) -> None:
+        self.active: Optional[Any] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        if self.active is not None:
+            await self.active.close()
+            self.active = None
+
+    @property
+    def newest_first(self) -> bool:
+        return bool(self.active is not None and self.active.newest_first)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.active.stats() if self.active is not None else {}
+
+    async def scrape_bids(self, max_pages: Optional[int] = None, max_bids: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Scrape bids from GeM listing pages."""
+        collected: List[Dict[str, Any]] = []
+        async for bids in self.iter_bid_pages(max_pages=max_pages, max_bids=max_bids):
+            collected.extend(bids)
+        return collected
+
+    async def iter_bid_pages(
+        self, max_pages: Optional[int] = None, max_bids: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        http = GemHttpScraper()
+        self.active = http
+        yielded = False
+        try:
+            await http.initialize()
+            async for bids in http.iter_bid_pages(max_pages=max_pages, max_bids=max_bids):
+                yielded = True
+                yield bids
+        except Exception as exc:
+            if yielded:
+                raise
+            logger.info("scraper.http_failed", error=str(exc))
+        if yielded:
+            return
+
+        logger.info("scraper.fallback", backend="playwright")
+        await self.close()
+        browser = GemScraper()
+        self.active = browser
+        await browser.initialize()
+        async for bids in browser.iter_bid_pages(max_pages=max_pages, max_bids=max_bids):
+            yield bids
+
+
+def create_scraper():
+    """Scraper for the configured SCRAPER_BACKEND, used as `async with create_scraper() as scraper`."""
+    if settings.SCRAPER_BACKEND.lower() == "playwright":
+        return GemScraper()
+    return FallbackScraper()
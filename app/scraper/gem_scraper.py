@@ -5,22 +5,91 @@ GeM Portal Scraper using Playwright.
 from __future__ import annotations
 
 import asyncio
-import random
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route
 
 from app.config import settings
 from app.scraper.parser import parse_bid_cards
 from app.utils.logger import get_logger
+from app.utils.rate_limit import RateLimiter
 
 logger = get_logger(__name__)
 
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+)
+
+# Requests the listing renders fine without
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+)
+
+# Resolves once the first bid link differs from `previous` (any bid link when `previous` is empty)
+_CARDS_CHANGED_JS = """([selector, previous]) => {
+    const link = document.querySelector(selector);
+    return link !== null && link.textContent.trim() !== previous;
+}"""
+
+
+def listing_page_rate() -> Tuple[float, float]:
+    """Listing pages per minute for a scrape run, and the jitter applied to their spacing."""
+    low, high = settings.SCRAPE_MIN_DELAY, settings.SCRAPE_MAX_DELAY
+    jitter = (high - low) / (high + low) if high + low > 0 else 0.0
+    if settings.SCRAPE_PAGES_PER_MINUTE > 0:
+        return settings.SCRAPE_PAGES_PER_MINUTE, jitter
+    # Unset: same average pace as the old random MIN..MAX delay per page
+    return (60.0 / ((low + high) / 2) if high + low > 0 else 0.0), jitter
+
+
+def pages_per_minute(pages: int, started_at: Optional[float]) -> float:
+    elapsed = time.perf_counter() - started_at if started_at else 0.0
+    return round(pages / elapsed * 60, 2) if elapsed > 0 else 0.0
+
+
+async def limit_bid_pages(
+    pages: AsyncIterator[Tuple[int, List[Dict[str, Any]]]], max_bids: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Drop bids already seen this run and stop once `max_bids` have been yielded."""
+    seen = set()
+    try:
+        async for page_number, bids in pages:
+            page_bids: List[Dict[str, Any]] = []
+            for bid in bids:
+                bid_id = bid.get("bid_id")
+                if not bid_id or bid_id in seen:
+                    continue
+                seen.add(bid_id)
+                page_bids.append(bid)
+                if len(seen) >= max_bids:
+                    break
+
+            logger.info("scraper.page_parsed", page=page_number, bids=len(bids), total=len(seen))
+            yield page_bids
+
+            if len(seen) >= max_bids:
+                logger.info("scraper.max_bids_reached", count=len(seen))
+                return
+    finally:
+        await pages.aclose()
+
 
 class GemScraper:
     """Scraper for GeM bid listings."""
 
     BASE_URL = "https://bidplus.gem.gov.in/all-bids"
+    BID_LINK_SELECTOR = "a[href*='showbidDocument']"
+    PAGE_LINK_SELECTOR = "#light-pagination a.page-link"
+
+    # The listing's default order is not by publish date, so incremental runs read every page
+    newest_first = False
 
     PAGE_LOAD_TIMEOUT = 60000
     ELEMENT_TIMEOUT = 30000
@@ -29,6 +98,10 @@ class GemScraper:
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         self.playwright = None
+        self.contexts: List[BrowserContext] = []
+        self.rate_limiter = RateLimiter(*listing_page_rate())
+        self.pages_loaded = 0
+        self._started_at: Optional[float] = None
 
     async def __aenter__(self):
         await self.initialize()
@@ -46,55 +119,195 @@ class GemScraper:
                 "--disable-dev-shm-usage",
             ],
         )
-        self.page = await self.browser.new_page(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        )
+        self.page = await self._new_page()
 
     async def close(self) -> None:
-        if self.page is not None:
-            await self.page.close()
+        for context in self.contexts:
+            await context.close()
+        self.contexts = []
+        self.page = None
         if self.browser is not None:
             await self.browser.close()
         if self.playwright is not None:
             await self.playwright.stop()
 
+    async def _new_page(self) -> Page:
+        """A page in its own browser context (separate cookies), with resource blocking applied."""
+        context = await self.browser.new_context(user_agent=USER_AGENT)
+        if settings.SCRAPER_BLOCK_RESOURCES:
+            await context.route("**/*", self._filter_request)
+        self.contexts.append(context)
+        return await context.new_page()
+
+    async def _filter_request(self, route: Route) -> None:
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(host in request.url for host in _BLOCKED_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "playwright",
+            "contexts": max(len(self.contexts), 1),
+            "pages_loaded": self.pages_loaded,
+            "pages_per_minute": pages_per_minute(self.pages_loaded, self._started_at),
+        }
+
     async def scrape_bids(self, max_pages: Optional[int] = None, max_bids: Optional[int] = None) -> List[Dict[str, Any]]:
         """Scrape bids from GeM listing pages."""
+        collected: List[Dict[str, Any]] = []
+        async for bids in self.iter_bid_pages(max_pages=max_pages, max_bids=max_bids):
+            collected.extend(bids)
+        return collected
+
+    async def iter_bid_pages(
+        self, max_pages: Optional[int] = None, max_bids: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the new bids of each listing page, in page order, as soon as it is parsed."""
         if self.page is None:
             raise RuntimeError("Scraper not initialized")
 
         max_pages = max_pages or settings.SCRAPE_MAX_PAGES
         max_bids = max_bids or settings.SCRAPE_MAX_BIDS
+        contexts = min(max(settings.SCRAPER_CONTEXTS, 1), max_pages)
 
-        logger.info("scraper.start", max_pages=max_pages, max_bids=max_bids)
-        await self.page.goto(self.BASE_URL, timeout=self.PAGE_LOAD_TIMEOUT, wait_until="networkidle")
+        logger.info("scraper.start", max_pages=max_pages, max_bids=max_bids, contexts=contexts)
+        self._started_at = time.perf_counter()
+        pages = self._parallel_pages(max_pages, contexts) if contexts > 1 else self._sequential_pages(max_pages)
+        limited = limit_bid_pages(pages, max_bids)
+        try:
+            async for bids in limited:
+                yield bids
+        finally:
+            await limited.aclose()
+            logger.info("scraper.done", **self.stats())
 
-        collected: List[Dict[str, Any]] = []
-        seen = set()
+    async def _sequential_pages(self, max_pages: int) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """One page, following Next (or infinite scroll) from the first listing page."""
+        await self.rate_limiter.acquire()
+        await self._open_listing(self.page)
 
         for page_index in range(max_pages):
-            await self._random_delay()
             html = await self.page.content()
-            bids = parse_bid_cards(html)
-
-            for bid in bids:
-                bid_id = bid.get("bid_id")
-                if not bid_id or bid_id in seen:
-                    continue
-                seen.add(bid_id)
-                collected.append(bid)
-                if len(collected) >= max_bids:
-                    logger.info("scraper.max_bids_reached", count=len(collected))
-                    return collected
-
-            logger.info("scraper.page_parsed", page=page_index + 1, bids=len(bids), total=len(collected))
+            self.pages_loaded += 1
+            yield page_index + 1, parse_bid_cards(html)
 
+            if page_index + 1 >= max_pages:
+                break
+            await self.rate_limiter.acquire()
             if not await self._try_next_page():
                 if not await self._try_scroll():
                     break
 
-        return collected
+    async def _parallel_pages(
+        self, max_pages: int, contexts: int
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        `contexts` browser contexts each walk every `contexts`-th page (context i
+        takes pages i+1, i+1+contexts, ...). Results are released in page order, the
+        order a single context would have produced. Only an empty or unreachable page
+        ends the listing; a context that fails raises its error once its page is due.
+        """
+        results: asyncio.Queue = asyncio.Queue()
+        pages = [self.page] + [await self._new_page() for _ in range(contexts - 1)]
+        workers = [
+            asyncio.create_task(self._scrape_partition(pages[i], range(i + 1, max_pages + 1, contexts), results))
+            for i in range(contexts)
+        ]
+        pending: Dict[int, Any] = {}
+        last_page = max_pages
+        next_page = 1
+        running = contexts
+        try:
+            while next_page <= last_page and (running or next_page in pending):
+                page_number, bids = await results.get()
+                if page_number is None:
+                    running -= 1
+                elif bids is None:
+                    # The listing ends before this page; later pages don't exist either
+                    last_page = min(last_page, page_number - 1)
+                else:
+                    pending[page_number] = bids
+                while next_page <= last_page and next_page in pending:
+                    bids = pending.pop(next_page)
+                    if isinstance(bids, Exception):
+                        raise bids
+                    yield next_page, bids
+                    next_page += 1
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _scrape_partition(self, page: Page, page_numbers: range, results: asyncio.Queue) -> None:
+        """Post (page, bids) per page, (page, None) past the end, (page, error) on failure, then (None, None)."""
+        page_number = page_numbers[0] if page_numbers else None
+        try:
+            current = 0
+            for page_number in page_numbers:
+                if current == 0:
+                    await self.rate_limiter.acquire()
+                    if not await self._open_listing(page) and page_number > 1:
+                        # Page 1 without cards is an empty listing; any other context needs it rendered
+                        raise RuntimeError("Listing did not render")
+                    current = 1
+                current = await self._jump_to_page(page, current, page_number)
+                if current != page_number:
+                    await results.put((page_number, None))
+                    return
+                html = await page.content()
+                self.pages_loaded += 1
+                bids = parse_bid_cards(html)
+                await results.put((page_number, bids if bids else None))
+                if not bids:
+                    return
+        except Exception as exc:
+            logger.info("scraper.partition_failed", page=page_number, error=str(exc))
+            await results.put((page_number, exc))
+        finally:
+            await results.put((None, None))
+
+    async def _open_listing(self, page: Page) -> bool:
+        # Cards are awaited by selector; networkidle never settles with analytics blocked or polling
+        await page.goto(self.BASE_URL, timeout=self.PAGE_LOAD_TIMEOUT, wait_until="domcontentloaded")
+        return await self._wait_for_cards(page)
+
+    async def _wait_for_cards(self, page: Page, previous: str = "") -> bool:
+        """Wait until bid cards are rendered (and differ from `previous`, the first bid id before a click)."""
+        try:
+            await page.wait_for_function(
+                _CARDS_CHANGED_JS, arg=[self.BID_LINK_SELECTOR, previous], timeout=self.ELEMENT_TIMEOUT
+            )
+            return True
+        except Exception as exc:
+            logger.info("scraper.cards_timeout", error=str(exc))
+            return False
+
+    async def _first_bid(self, page: Page) -> str:
+        link = await page.query_selector(self.BID_LINK_SELECTOR)
+        return (await link.text_content() or "").strip() if link else ""
+
+    async def _jump_to_page(self, page: Page, current: int, target: int) -> int:
+        """
+        Click numbered pagination links forward until `target` is shown; returns the page
+        reached, short of `target` when no link leads further. Raises if a click never renders.
+        """
+        while current < target:
+            best = None
+            for link in await page.query_selector_all(self.PAGE_LINK_SELECTOR):
+                label = (await link.text_content() or "").strip()
+                if label.isdigit() and current < int(label) <= target and (best is None or int(label) > best[0]):
+                    best = (int(label), link)
+            if best is None:
+                return current
+            previous = await self._first_bid(page)
+            await self.rate_limiter.acquire()
+            await best[1].click()
+            if not await self._wait_for_cards(page, previous):
+                raise RuntimeError(f"Listing page {best[0]} did not render")
+            current = best[0]
+        return current
 
     async def _try_next_page(self) -> bool:
         if self.page is None:
@@ -102,9 +315,9 @@ class GemScraper:
         try:
             next_button = await self.page.query_selector("text=Next")
             if next_button:
+                previous = await self._first_bid(self.page)
                 await next_button.click()
-                await self.page.wait_for_load_state("networkidle", timeout=self.PAGE_LOAD_TIMEOUT)
-                return True
+                return await self._wait_for_cards(self.page, previous)
         except Exception as exc:
             logger.info("scraper.next_failed", error=str(exc))
         return False
@@ -121,7 +334,3 @@ class GemScraper:
         except Exception as exc:
             logger.info("scraper.scroll_failed", error=str(exc))
             return False
-
-    async def _random_delay(self) -> None:
-        delay = random.uniform(settings.SCRAPE_MIN_DELAY, settings.SCRAPE_MAX_DELAY)
-        await asyncio.sleep(delay)
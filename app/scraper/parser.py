@@ -6,17 +6,55 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
 
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+from app.config import settings
 
 
 BID_ID_PATTERN = re.compile(r"GEM/\d{4}/[A-Z]/\d+")
 RA_NO_PATTERN = re.compile(r"GEM/\d{4}/R/\d+")
 
+# Card label -> scraped field. Each value runs up to the next "<Word> Date:" label or the end of the card text.
+_LABEL_FIELDS = {
+    "Items": "items",
+    "Quantity": "quantity",
+    "Department": "department",
+    "Department Name And Address": "department_address",
+    "Start Date": "start_date",
+    "End Date": "end_date",
+    "Bid Type": "bid_type",
+    "Bid Value": "bid_value_range",
+}
+_DATE_FIELDS = {"start_date", "end_date"}
+_VALUE_END = re.compile(r"\s+[A-Z][a-z]+\s+Date:")
+_DATE_VALUE = re.compile(r"\d{2}-\d{2}-\d{4}\s+\d{1,2}:\d{2}\s*(?:AM|PM)")
+_DATE_FORMATS = ("%d-%m-%Y %I:%M %p", "%d-%m-%Y %H:%M")
+
+# Every label (longest first, so "Department Name And Address" wins over "Department") and the RA number in one pass
+_CARD_FIELDS = re.compile(
+    rf"(?P<ra_no>{RA_NO_PATTERN.pattern})"
+    rf"|(?P<label>{'|'.join(re.escape(label) for label in sorted(_LABEL_FIELDS, key=len, reverse=True))})\s*[:\-]\s*"
+)
+_BID_LINKS = etree.XPath("//a[contains(., 'GEM/')]")
+# Text nodes as bs4's get_text() sees them (script, style and template contents are left out)
+_CARD_TEXT = etree.XPath(
+    "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]", smart_strings=False
+)
+
 
 def parse_bid_cards(html: str) -> List[Dict[str, Any]]:
-    """Parse bid cards from HTML into structured dictionaries."""
+    """Parse bid cards from HTML into structured dictionaries, with the configured SCRAPER_PARSER."""
+    if settings.SCRAPER_PARSER.lower() == "bs4":
+        return parse_bid_cards_bs4(html)
+    return parse_bid_cards_lxml(html)
+
+
+def parse_bid_cards_bs4(html: str) -> List[Dict[str, Any]]:
+    """Reference parser on a BeautifulSoup tree; `parse_bid_cards_lxml` must return the same bids."""
     soup = BeautifulSoup(html, "lxml")
     candidates = []
 
@@ -28,13 +66,117 @@ def parse_bid_cards(html: str) -> List[Dict[str, Any]]:
 
     # Fallback: scan text blocks if anchors are missing
     if not candidates:
-        for element in soup.find_all(text=BID_ID_PATTERN):
+        for element in soup.find_all(string=BID_ID_PATTERN):
             bid_id = BID_ID_PATTERN.search(element).group(0)
             container = _find_card_container(element.parent)
             text = container.get_text(" ", strip=True) if container else element.parent.get_text(" ", strip=True)
             candidates.append(_parse_bid_text(bid_id, text, None))
 
-    # Deduplicate by bid_id
+    return _unique_bids(candidates)
+
+
+def parse_bid_cards_lxml(html: str) -> List[Dict[str, Any]]:
+    """
+    Same result as `parse_bid_cards_bs4` from an lxml tree: bid links are
+    pre-filtered by XPath and each card's text is read with a single scan of
+    `_CARD_FIELDS` instead of one regex per label.
+    """
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        # Empty documents and str input with an XML encoding declaration
+        return parse_bid_cards_bs4(html)
+
+    links = []
+    for link in _BID_LINKS(root):
+        string = _single_string(link)
+        if string is not None and BID_ID_PATTERN.search(string):
+            links.append((string.strip(), link))
+    if not links:
+        # Cards without bid links are rare; the reference parser handles them
+        return parse_bid_cards_bs4(html)
+
+    candidates = []
+    for bid_id, link in links:
+        container = _find_card_container_lxml(link)
+        text = _element_text(container if container is not None else link.getparent())
+        if "\n" in text:
+            # The per-label regexes cannot match across a newline; keep their exact behaviour
+            scraped = _parse_bid_text(bid_id, text, None)
+        else:
+            scraped = {"bid_id": bid_id, **_scan_card_fields(text)}
+        href = link.get("href")
+        scraped["pdf_url"] = scraped["gem_url"] = _normalize_pdf_url(href) if href else None
+        candidates.append(scraped)
+    return _unique_bids(candidates)
+
+
+def _single_string(element) -> Optional[str]:
+    """bs4's `Tag.string`: the text of an element whose only content is one string, or one such element."""
+    while True:
+        children = len(element)
+        if not children:
+            return element.text
+        if children > 1 or element.text or element[0].tail:
+            return None
+        element = element[0]
+
+
+def _find_card_container_lxml(element) -> Optional[Any]:
+    current = element
+    for _ in range(6):
+        if current is None:
+            break
+        if any("card" in cls.lower() for cls in (current.get("class") or "").split()):
+            return current
+        current = current.getparent()
+    return None
+
+
+def _element_text(element) -> str:
+    """bs4's `get_text(" ", strip=True)`."""
+    if element is None:
+        return ""
+    return " ".join(part for part in (text.strip() for text in _CARD_TEXT(element)) if part)
+
+
+def _scan_card_fields(text: str) -> Dict[str, Any]:
+    ra_no = None
+    value_starts: Dict[str, List[int]] = {}
+    for match in _CARD_FIELDS.finditer(text):
+        label = match.group("label")
+        if label is None:
+            if ra_no is None:
+                ra_no = match.group("ra_no")
+        else:
+            value_starts.setdefault(_LABEL_FIELDS[label], []).append(match.end())
+
+    fields: Dict[str, Any] = {"ra_no": ra_no}
+    for field in _LABEL_FIELDS.values():
+        starts = value_starts.get(field, ())
+        fields[field] = _date_at(text, starts) if field in _DATE_FIELDS else _value_at(text, starts)
+    fields["quantity"] = _to_int(fields["quantity"])
+    return fields
+
+
+def _value_at(text: str, starts: Iterable[int]) -> Optional[str]:
+    for start in starts:
+        if start < len(text):
+            end = _VALUE_END.search(text, start + 1)
+            return text[start : end.start() if end else len(text)].strip()
+    return None
+
+
+def _date_at(text: str, starts: Iterable[int]) -> Optional[datetime]:
+    for start in starts:
+        match = _DATE_VALUE.match(text, start)
+        if match:
+            return _parse_date(match.group(0))
+    return None
+
+
+def _unique_bids(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Deduplicate by bid_id, keeping the first card."""
     seen = set()
     unique = []
     for item in candidates:
@@ -46,6 +188,77 @@ def parse_bid_cards(html: str) -> List[Dict[str, Any]]:
     return unique
 
 
+# all-bids-data document field -> scraped bid field. Solr-style fields, each value a one-element list.
+_JSON_FIELDS = {
+    "bid_id": "b_bid_number",
+    "items": "b_category_name",
+    "quantity": "b_total_quantity",
+    "department": "ba_official_details_deptName",
+    "start_date": "final_start_date_sort",
+    "end_date": "final_end_date_sort",
+    "bid_type": "b_bid_type",
+}
+
+
+def parse_bid_json(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Parse the JSON returned by GeM's all-bids-data endpoint into the same dicts as `parse_bid_cards`."""
+    docs = ((payload.get("response") or {}).get("response") or {}).get("docs") or []
+    bids = []
+    seen = set()
+    for doc in docs:
+        bid_id = _json_value(doc, _JSON_FIELDS["bid_id"])
+        if not bid_id or not BID_ID_PATTERN.fullmatch(str(bid_id)) or bid_id in seen:
+            continue
+        seen.add(bid_id)
+        ministry = _json_value(doc, "ba_official_details_minName")
+        department = _json_value(doc, _JSON_FIELDS["department"])
+        quantity = _json_value(doc, _JSON_FIELDS["quantity"])
+        internal_id = _json_value(doc, "b_id")
+        pdf_url = _normalize_pdf_url(f"/showbidDocument/{internal_id}") if internal_id else None
+        bids.append(
+            {
+                "bid_id": bid_id,
+                "ra_no": _json_ra_no(doc, bid_id),
+                "items": _json_value(doc, _JSON_FIELDS["items"]),
+                "quantity": int(quantity) if str(quantity or "").isdigit() else None,
+                "department": department,
+                "department_address": " ".join(part for part in (ministry, department) if part) or None,
+                "start_date": _json_date(_json_value(doc, _JSON_FIELDS["start_date"])),
+                "end_date": _json_date(_json_value(doc, _JSON_FIELDS["end_date"])),
+                "bid_type": _json_value(doc, _JSON_FIELDS["bid_type"]),
+                "bid_value_range": None,
+                "pdf_url": pdf_url,
+                "gem_url": pdf_url,
+            }
+        )
+    return bids
+
+
+def _json_value(doc: Dict[str, Any], field: str) -> Any:
+    value = doc.get(field)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value
+
+
+def _json_ra_no(doc: Dict[str, Any], bid_id: str) -> Optional[str]:
+    for value in doc.values():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, str) and item != bid_id and RA_NO_PATTERN.fullmatch(item):
+                return item
+    return None
+
+
+def _json_date(value: Any) -> Optional[datetime]:
+    """all-bids-data dates are ISO strings in portal (IST) time with a `Z`; kept naive like the HTML dates."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
 def _find_card_container(element) -> Optional[Any]:
     current = element
     for _ in range(6):
@@ -91,16 +304,28 @@ def _normalize_pdf_url(href: str) -> str:
     return f"https://bidplus.gem.gov.in/{href}"
 
 
+@lru_cache(maxsize=None)
+def _label_pattern(label: str) -> re.Pattern:
+    return re.compile(rf"{re.escape(label)}\s*[:\-]\s*(.+?)(?:{_VALUE_END.pattern}|$)")
+
+
+@lru_cache(maxsize=None)
+def _date_pattern(label: str) -> re.Pattern:
+    return re.compile(rf"{re.escape(label)}\s*[:\-]\s*({_DATE_VALUE.pattern})")
+
+
 def _extract_after_label(text: str, label: str) -> Optional[str]:
-    pattern = re.compile(rf"{re.escape(label)}\s*[:\-]\s*(.+?)(?:\s+[A-Z][a-z]+\s+Date:|$)")
-    match = pattern.search(text)
+    match = _label_pattern(label).search(text)
     if match:
         return match.group(1).strip()
     return None
 
 
 def _extract_int_after_label(text: str, label: str) -> Optional[int]:
-    value = _extract_after_label(text, label)
+    return _to_int(_extract_after_label(text, label))
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
     if not value:
         return None
     digits = re.sub(r"[^0-9]", "", value)
@@ -108,11 +333,14 @@ def _extract_int_after_label(text: str, label: str) -> Optional[int]:
 
 
 def _extract_date(text: str, label: str) -> Optional[datetime]:
-    match = re.search(rf"{re.escape(label)}\s*[:\-]\s*(\d{{2}}-\d{{2}}-\d{{4}}\s+\d{{1,2}}:\d{{2}}\s*(?:AM|PM))", text)
+    match = _date_pattern(label).search(text)
     if not match:
         return None
-    raw = match.group(1)
-    for fmt in ("%d-%m-%Y %I:%M %p", "%d-%m-%Y %H:%M"):
+    return _parse_date(match.group(1))
+
+
+def _parse_date(raw: str) -> Optional[datetime]:
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(raw, fmt)
         except ValueError:
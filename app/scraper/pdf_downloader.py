@@ -1,67 +1,134 @@
 """
 Async PDF download utility.
+
+One long-lived aiohttp session per event loop is shared by every download, so
+repeated fetches from bidplus.gem.gov.in reuse kept-alive connections instead
+of opening a new pool (and TLS handshake) per file.
 """
 
 from __future__ import annotations
 
 import asyncio
+import json
 import os
-import uuid
-from typing import Optional
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import aiofiles
 import aiohttp
 
 from app.config import settings
-from app.utils.helpers import ensure_dir, sha256_file, safe_filename
-
+from app.utils.content_store import ContentStore, tender_store
+from app.utils.helpers import ensure_dir
+from app.utils.logger import get_logger
 
-class PDFDownloader:
-    """Download and validate PDFs."""
+logger = get_logger(__name__)
 
-    def __init__(self) -> None:
-        ensure_dir(settings.TENDER_PDF_DIR)
 
-    async def download_pdf(self, url: str, filename_hint: Optional[str] = None) -> Optional[str]:
+class PDFDownloader:
+    """Download and validate PDFs over a pooled, kept-alive session."""
+
+    def __init__(self, store: Optional[ContentStore] = None) -> None:
+        self.store = store or tender_store
+        self._session: Optional[Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = None
+        # url -> [lock, holders]; concurrent fetches of one URL share its partial file, so they take turns
+        self._url_locks: Dict[str, List[Any]] = {}
+        self._locks_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session[0] is not loop or self._session[1].closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.DOWNLOAD_MAX_CONNECTIONS,
+                limit_per_host=settings.DOWNLOAD_MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300,
+            )
+            timeout = aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT_SECONDS)
+            self._session = (loop, aiohttp.ClientSession(connector=connector, timeout=timeout))
+        return self._session[1]
+
+    async def close(self) -> None:
+        if self._session is not None:
+            loop, session = self._session
+            self._session = None
+            if loop is asyncio.get_running_loop() and not session.closed:
+                await session.close()
+
+    async def download_pdf(self, url: str) -> Optional[str]:
+        """Stream `url` into the content-addressed store and return the stored path."""
+        result = await self.fetch_pdf(url)
+        return result["path"] if result else None
+
+    async def fetch_pdf(self, url: str, previous: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Download `url` unless it is unchanged since `previous` (an earlier result).
+
+        Sends If-None-Match / If-Modified-Since when the earlier file is still on
+        disk; a 304 returns `previous` with `not_modified` set. An interrupted
+        transfer leaves its bytes behind and the next attempt resumes it with a
+        Range request guarded by If-Range. Fetches of the same URL run one at a time.
+        """
         if not url:
             return None
 
-        timeout = aiohttp.ClientTimeout(total=120)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return None
-
-                temp_name = f"tmp_{uuid.uuid4().hex}.pdf"
-                temp_path = os.path.join(settings.TENDER_PDF_DIR, temp_name)
-                size = 0
-
-                async with aiofiles.open(temp_path, "wb") as handle:
-                    async for chunk in response.content.iter_chunked(8192):
-                        if not chunk:
-                            continue
-                        size += len(chunk)
-                        if size > settings.MAX_UPLOAD_SIZE:
-                            await handle.close()
-                            os.remove(temp_path)
-                            return None
-                        await handle.write(chunk)
-
-        if not self._is_valid_pdf(temp_path):
-            os.remove(temp_path)
+        loop = asyncio.get_running_loop()
+        if self._locks_loop is not loop:
+            self._locks_loop, self._url_locks = loop, {}
+        entry = self._url_locks.setdefault(url, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._fetch_pdf(url, previous)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                self._url_locks.pop(url, None)
+
+    async def _fetch_pdf(self, url: str, previous: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        headers: Dict[str, str] = {}
+        if previous and previous.get("path") and os.path.exists(previous["path"]):
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        partial_path = self.store.partial_path(url)
+        partial_validator = _read_partial_validator(partial_path)
+        offset = os.path.getsize(partial_path) if partial_validator and os.path.exists(partial_path) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = partial_validator
+
+        session = self._get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and previous:
+                return {**previous, "not_modified": True}
+            if response.status == 416:
+                # The partial file no longer fits the remote one; start over on the next attempt
+                _remove_partial(partial_path)
+                return None
+            if response.status not in (200, 206):
+                return None
+            resumed = response.status == 206 and offset > 0
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_length": _total_length(response, offset if resumed else 0),
+            }
+            _write_partial_validator(partial_path, validators)
+            stored = await self.store.save_stream(
+                response.content.iter_chunked(8192),
+                ".pdf",
+                settings.MAX_UPLOAD_SIZE,
+                validate=self._is_valid_pdf,
+                partial_path=partial_path,
+                resume=resumed,
+            )
+        _remove_partial(partial_path)
+        if not stored:
             return None
-
-        file_hash = sha256_file(temp_path)
-        safe_name = safe_filename(filename_hint or file_hash)
-        final_name = f"{safe_name}_{file_hash[:8]}.pdf"
-        final_path = os.path.join(settings.TENDER_PDF_DIR, final_name)
-
-        if os.path.exists(final_path):
-            os.remove(temp_path)
-            return final_path
-
-        os.replace(temp_path, final_path)
-        return final_path
+        if resumed:
+            logger.info("download.resumed", url=url, offset=offset)
+        return {"path": stored[1], "not_modified": False, **validators}
 
     def _is_valid_pdf(self, path: str) -> bool:
         try:
@@ -71,12 +138,96 @@ class PDFDownloader:
         except OSError:
             return False
 
+    async def download_with_retry(self, url: str, retries: Optional[int] = None) -> Optional[str]:
+        result = await self.fetch_with_retry(url, retries=retries)
+        return result["path"] if result else None
 
-async def download_with_retry(url: str, filename_hint: Optional[str] = None, retries: int = 3) -> Optional[str]:
-    downloader = PDFDownloader()
-    for attempt in range(retries):
-        result = await downloader.download_pdf(url, filename_hint=filename_hint)
-        if result:
-            return result
-        await asyncio.sleep(2 ** attempt)
+    async def fetch_with_retry(
+        self, url: str, previous: Optional[Dict[str, Any]] = None, retries: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """`fetch_pdf`, retrying failures with jittered exponential backoff."""
+        if not url:
+            return None
+        retries = retries or settings.DOWNLOAD_RETRIES
+        for attempt in range(retries):
+            try:
+                result = await self.fetch_pdf(url, previous=previous)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.info("download.attempt_failed", url=url, attempt=attempt + 1, error=str(exc))
+                result = None
+            if result:
+                return result
+            if attempt + 1 < retries:
+                # Full jitter keeps parallel retries against the same host from lining up
+                await asyncio.sleep(random.uniform(0, settings.DOWNLOAD_RETRY_BASE_DELAY * 2**attempt))
+        return None
+
+    async def download_many(self, urls: Sequence[str]) -> List[Optional[str]]:
+        """Download several PDFs at once; results line up with `urls` (None where a download failed)."""
+        semaphore = asyncio.Semaphore(max(settings.DOWNLOAD_CONCURRENCY, 1))
+
+        async def fetch(url: str) -> Optional[str]:
+            async with semaphore:
+                return await self.download_with_retry(url)
+
+        return list(await asyncio.gather(*(fetch(url) for url in urls)))
+
+
+def _total_length(response: aiohttp.ClientResponse, offset: int) -> Optional[int]:
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    if response.content_length is not None:
+        return offset + response.content_length
     return None
+
+
+def _read_partial_validator(partial_path: str) -> Optional[str]:
+    """ETag (strong only) or Last-Modified of the response a partial file came from."""
+    try:
+        with open(f"{partial_path}.json", "r", encoding="utf-8") as handle:
+            validators = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+
+def _write_partial_validator(partial_path: str, validators: Dict[str, Any]) -> None:
+    ensure_dir(os.path.dirname(partial_path))
+    with open(f"{partial_path}.json", "w", encoding="utf-8") as handle:
+        json.dump(validators, handle)
+
+
+def _remove_partial(partial_path: str) -> None:
+    for path in (partial_path, f"{partial_path}.json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+_downloader: Optional[PDFDownloader] = None
+
+
+def get_downloader() -> PDFDownloader:
+    """Process-wide downloader, so every caller shares one connection pool."""
+    global _downloader
+    if _downloader is None:
+        _downloader = PDFDownloader()
+    return _downloader
+
+
+async def close_downloader() -> None:
+    if _downloader is not None:
+        await _downloader.close()
+
+
+async def download_with_retry(url: str, retries: Optional[int] = None) -> Optional[str]:
+    return await get_downloader().download_with_retry(url, retries=retries)
+
+
+async def fetch_with_retry(
+    url: str, previous: Optional[Dict[str, Any]] = None, retries: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    return await get_downloader().fetch_with_retry(url, previous=previous, retries=retries)
@@ -7,18 +7,20 @@ from __future__ import annotations
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import aiofiles
 from fastapi import UploadFile
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.config import settings
+from app.database.pagination import keyset_page, list_total
 from app.database.repositories.company_repo import CompanyRepository
 from app.processors.document_extractor import DocumentExtractor, is_supported_file, get_supported_extensions
-from app.processors.embedder import TextEmbedder
+from app.processors.embedder import get_embedder
 from app.processors.llm_extractor import LLMExtractor
-from app.utils.helpers import ensure_dir, safe_filename, sha256_file
+from app.services.embedding_index import company_matrix
+from app.services.match_service import MatchService
+from app.utils.content_store import profile_store
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -27,8 +29,9 @@ logger = get_logger(__name__)
 class CompanyService:
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self.repo = CompanyRepository(db)
+        self.matches = MatchService(db)
         self.document_extractor = DocumentExtractor()
-        self.embedder = TextEmbedder()
+        self.embedder = get_embedder()
         self._llm: Optional[LLMExtractor] = None
 
     def _get_llm(self) -> LLMExtractor:
@@ -41,35 +44,20 @@ class CompanyService:
             raise ValueError("No files provided")
 
         company_id = str(uuid.uuid4())
-        company_dir = os.path.join(settings.PROFILE_UPLOAD_DIR, company_id)
-        ensure_dir(company_dir)
-
         uploaded_files = []
         texts = []
         total_files = len(files)
 
-        for index, file in enumerate(files, start=1):
+        for file in files:
             if not file.filename or not is_supported_file(file.filename):
                 supported = ", ".join(get_supported_extensions())
                 raise ValueError(f"Unsupported file format. Supported formats: {supported}")
 
-            # Get the original extension for the default filename
             ext = os.path.splitext(file.filename.lower())[1] or ".pdf"
-            safe_name = safe_filename(file.filename, default=f"profile_{index}{ext}")
-            local_path = os.path.join(company_dir, safe_name)
-
-            size = 0
-            async with aiofiles.open(local_path, "wb") as handle:
-                while True:
-                    chunk = await file.read(8192)
-                    if not chunk:
-                        break
-                    size += len(chunk)
-                    if size > settings.MAX_UPLOAD_SIZE:
-                        raise ValueError("File exceeds maximum upload size")
-                    await handle.write(chunk)
-
-            file_hash = sha256_file(local_path)
+            stored = await profile_store.save_stream(_read_chunks(file), ext, settings.MAX_UPLOAD_SIZE)
+            if stored is None:
+                raise ValueError("File exceeds maximum upload size")
+            file_hash, local_path = stored
             uploaded_files.append(
                 {
                     "file_hash": file_hash,
@@ -79,7 +67,8 @@ class CompanyService:
                 }
             )
 
-            extracted = self.document_extractor.extract_text(local_path)
+            # A file uploaded before (by any company) reuses its extracted text
+            extracted = await profile_store.extract_text(local_path, self.document_extractor.extract_text_async)
             if extracted:
                 texts.append(extracted)
 
@@ -95,8 +84,8 @@ class CompanyService:
         try:
             combined_text = "\n".join(texts)
             if combined_text:
-                metadata = self._get_llm().extract_company(combined_text)
-            summary_embedding = self.embedder.embed(metadata.get("summary") if metadata else "")
+                metadata = await self._get_llm().extract_company_async(combined_text)
+            summary_embedding = await self.embedder.embed_async(metadata.get("summary") if metadata else "")
             status["processing_status"] = "ready"
         except Exception as exc:
             status["processing_status"] = "failed"
@@ -115,10 +104,13 @@ class CompanyService:
         }
 
         await self.repo.create(profile)
+        company_matrix.upsert(company_id, summary_embedding)
+        # Scoring against the whole corpus runs after the upload returns
+        self.matches.schedule_company_refresh(profile)
         return self._serialize(profile)
 
-    async def get_profile(self, company_id: str) -> Optional[Dict[str, Any]]:
-        profile = await self.repo.get_by_id(company_id)
+    async def get_profile(self, company_id: str, include_embedding: bool = False) -> Optional[Dict[str, Any]]:
+        profile = await self.repo.get_by_id(company_id, view=None if include_embedding else "detail")
         return self._serialize(profile) if profile else None
 
     async def list_companies(
@@ -127,6 +119,8 @@ class CompanyService:
         limit: int = 50,
         status: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
         filters: Dict[str, Any] = {}
         if status:
@@ -139,12 +133,19 @@ class CompanyService:
                 {"metadata.domains": regex},
             ]
 
-        total = await self.repo.collection.count_documents(filters)
-        cursor = self.repo.collection.find(filters).sort("created_at", -1).skip(skip).limit(limit)
-        items = []
-        async for profile in cursor:
-            items.append(self._serialize(profile))
-        return {"items": items, "total": total, "skip": skip, "limit": limit}
+        profiles, next_cursor = await keyset_page(
+            self.repo.collection,
+            filters,
+            "created_at",
+            -1,
+            limit,
+            cursor=cursor,
+            projection=self.repo.VIEWS["list"],
+            skip=skip,
+        )
+        total = await list_total(self.repo.collection, filters) if include_total else None
+        items = [self._serialize(profile) for profile in profiles]
+        return {"items": items, "total": total, "next_cursor": next_cursor, "skip": skip, "limit": limit}
 
     async def get_search_history(self, company_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         cursor = (
@@ -168,8 +169,17 @@ class CompanyService:
             return False
         for file_info in profile.get("uploaded_files", []):
             path = file_info.get("local_path")
-            if path and os.path.exists(path):
-                os.remove(path)
+            if not path or not os.path.exists(path):
+                continue
+            # Stored files are shared by content; keep them while another profile uses them
+            shared = await self.repo.collection.find_one(
+                {"company_id": {"$ne": company_id}, "uploaded_files.file_hash": file_info.get("file_hash")},
+                {"_id": 1},
+            )
+            if shared is None:
+                profile_store.remove(path)
+        company_matrix.remove([company_id])
+        await self.matches.repo.delete_for_company(company_id)
         return await self.repo.delete(company_id)
 
     def _serialize(self, profile: Dict[str, Any]) -> Dict[str, Any]:
@@ -180,3 +190,11 @@ class CompanyService:
             profile["id"] = str(profile_id)
             profile["_id"] = str(profile_id)
         return profile
+
+
+async def _read_chunks(file: UploadFile, size: int = 8192) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(size)
+        if not chunk:
+            return
+        yield chunk
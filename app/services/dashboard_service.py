@@ -9,6 +9,11 @@ from typing import Any, Dict, List
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.database.repositories.tender_repo import TenderRepository
+from app.processors.embedder import embedding_cache
+from app.processors.extraction_cache import get_extraction_cache
+from app.utils.executors import executor_stats
+
 
 class DashboardService:
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
@@ -55,10 +60,20 @@ class DashboardService:
             "searches": {"today": searches_today, "total": searches_total},
         }
 
+    def get_runtime_metrics(self) -> Dict[str, Any]:
+        """In-process worker pool and cache counters (per API process)."""
+        extraction_cache = get_extraction_cache()
+        return {
+            "executors": executor_stats(),
+            "embedding_cache": embedding_cache.stats(),
+            "llm_cache": extraction_cache.stats() if extraction_cache else None,
+        }
+
     async def get_activity(self, limit: int = 10) -> List[Dict[str, Any]]:
         activity: List[Dict[str, Any]] = []
 
-        async for tender in self.tenders.find().sort("created_at", -1).limit(limit):
+        tender_fields = {"bid_id": 1, "scraped_at": 1, "created_at": 1}
+        async for tender in self.tenders.find({}, tender_fields).sort("created_at", -1).limit(limit):
             activity.append(
                 {
                     "type": "tender",
@@ -68,7 +83,8 @@ class DashboardService:
                 }
             )
 
-        async for company in self.companies.find().sort("created_at", -1).limit(limit):
+        company_fields = {"company_id": 1, "name": 1, "created_at": 1}
+        async for company in self.companies.find({}, company_fields).sort("created_at", -1).limit(limit):
             activity.append(
                 {
                     "type": "company",
@@ -103,7 +119,11 @@ class DashboardService:
         return activity[:limit]
 
     async def get_queue(self, limit: int = 20) -> List[Dict[str, Any]]:
-        cursor = self.tenders.find({"status.llm_processed": False}).sort("created_at", -1).limit(limit)
+        cursor = (
+            self.tenders.find({"status.llm_processed": False}, TenderRepository.VIEWS["list"])
+            .sort("created_at", -1)
+            .limit(limit)
+        )
         items: List[Dict[str, Any]] = []
         async for tender in cursor:
             items.append(
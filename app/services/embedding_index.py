@@ -0,0 +1,436 @@
+"""
+In-memory embedding indexes for vector scoring and first-stage retrieval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config import settings
+from app.utils.helpers import ensure_dir
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingMatrix:
+    """
+    Process-wide float32 matrix of unit-normalized embeddings with a row -> document id mapping.
+
+    Loaded lazily from Mongo on first use, then kept current through `upsert` and `remove`
+    so scoring a query against every row is a single matrix-vector product. This is also
+    the exact (brute-force) nearest-neighbour backend.
+
+    Rows live in a preallocated buffer that doubles when full, so appends are amortized
+    O(1); `_size` rows are in use out of `len(_buffer)` allocated.
+    """
+
+    MIN_CAPACITY = 64
+
+    def __init__(self, collection: str, filters: Optional[Dict[str, Any]] = None, id_field: str = "_id") -> None:
+        self.collection_name = collection
+        self.filters = filters or {}
+        self.id_field = id_field
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def dim(self) -> int:
+        return int(self._buffer.shape[1])
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        """View of the rows in use."""
+        return self._buffer[:self._size]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def ensure_loaded(self, db: AsyncIOMotorDatabase) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.load(db)
+
+    async def load(self, db: AsyncIOMotorDatabase) -> None:
+        """Rebuild the index from every matching document that has an embedding."""
+        filters = dict(self.filters)
+        filters["summary_embedding"] = {"$exists": True, "$ne": []}
+        cursor = db.get_collection(self.collection_name).find(
+            filters, {self.id_field: 1, "summary_embedding": 1}
+        )
+
+        ids: List[str] = []
+        vectors: List[List[float]] = []
+        async for doc in cursor:
+            embedding = doc.get("summary_embedding") or []
+            if vectors and len(embedding) != len(vectors[0]):
+                logger.info("embedding_matrix.dim_mismatch", collection=self.collection_name, doc_id=str(doc.get(self.id_field)))
+                continue
+            ids.append(str(doc.get(self.id_field)))
+            vectors.append(embedding)
+
+        self.set_vectors(ids, vectors)
+        logger.info("embedding_matrix.loaded", collection=self.collection_name, rows=len(ids))
+
+    def set_vectors(self, ids: Sequence[str], vectors: Any) -> None:
+        """Replace the whole index contents."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix = matrix.reshape(len(ids), -1) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        self._buffer = self._normalize_rows(matrix)
+        self._size = len(ids)
+        self._ids = [str(doc_id) for doc_id in ids]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._loaded = True
+
+    def upsert(self, doc_id: str, embedding: Optional[List[float]]) -> None:
+        """Insert or replace a document's row. No-op until the index has been loaded."""
+        if not self._loaded:
+            return
+        if not embedding:
+            self.remove([doc_id])
+            return
+        vector = self._normalize_rows(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+        if len(self._ids) and vector.shape[1] != self.dim:
+            logger.info("embedding_matrix.dim_mismatch", collection=self.collection_name, doc_id=doc_id)
+            return
+
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = self._size
+            self._reserve(row + 1, vector.shape[1])
+            self._size += 1
+            self._rows[doc_id] = row
+            self._ids.append(doc_id)
+        self._buffer[row] = vector[0]
+        self._row_written(row)
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        """Drop rows by moving the last row into each freed slot."""
+        if not self._loaded:
+            return
+        for doc_id in doc_ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._buffer[row] = self._buffer[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+                self._row_moved(last, row)
+            self._ids.pop()
+            self._size = last
+
+    def scores(self, query: Optional[List[float]]) -> Dict[str, float]:
+        """Cosine similarity of `query` against every row, keyed by document id."""
+        vector = self._query_vector(query)
+        if vector is None:
+            return {}
+        similarities = self._matrix @ vector
+        return dict(zip(self._ids, similarities.tolist()))
+
+    def search(self, query: Optional[List[float]], k: int) -> List[Tuple[str, float]]:
+        """Top-k neighbours of `query` as (document id, cosine similarity), best first."""
+        return self.exact_search(query, k)
+
+    def exact_search(
+        self, query: Optional[List[float]], k: int, among: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Brute-force `search`, optionally restricted to the documents in `among`."""
+        vector = self._query_vector(query)
+        if vector is None or k <= 0:
+            return []
+        if among is None:
+            return self._top_k(np.arange(len(self._ids)), self._matrix @ vector, k)
+        rows = np.fromiter((self._rows[doc_id] for doc_id in among if doc_id in self._rows), dtype=np.int64)
+        if not len(rows):
+            return []
+        return self._top_k(rows, self._matrix[rows] @ vector, k)
+
+    def clear(self) -> None:
+        self._ids = []
+        self._rows = {}
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._loaded = False
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Make room for `rows` rows, doubling the buffer (or starting it over at a new width when empty)."""
+        if not self._size and self._buffer.shape[1] != dim:
+            self._buffer = np.zeros((self.MIN_CAPACITY, dim), dtype=np.float32)
+        if rows <= len(self._buffer):
+            return
+        capacity = max(2 * len(self._buffer), rows, self.MIN_CAPACITY)
+        buffer = np.zeros((capacity, dim), dtype=np.float32)
+        buffer[:self._size] = self._buffer[:self._size]
+        self._buffer = buffer
+
+    def _query_vector(self, query: Optional[List[float]]) -> Optional[np.ndarray]:
+        if query is None or not len(query) or not len(self._ids):
+            return None
+        vector = np.asarray(query, dtype=np.float32)
+        if vector.shape[0] != self.dim:
+            logger.info("embedding_matrix.query_dim_mismatch", collection=self.collection_name, dim=int(vector.shape[0]))
+            return None
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def _top_k(self, rows: np.ndarray, similarities: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if len(rows) > k:
+            best = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-similarities[best], kind="stable")]
+        return [(self._ids[rows[i]], float(similarities[i])) for i in best]
+
+    # Hooks for subclasses that keep per-row state aligned with the matrix
+    def _row_written(self, row: int) -> None:
+        return
+
+    def _row_moved(self, source: int, target: int) -> None:
+        return
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        if not matrix.size:
+            return matrix
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
+
+
+class IVFIndex(EmbeddingMatrix):
+    """
+    Inverted-file approximate index: rows are bucketed under the nearest of `nlist` centroids
+    (spherical k-means) and a query only scores rows in its `nprobe` closest buckets.
+
+    Only the trained centroids are persisted (under ANN_INDEX_DIR), so restarts skip k-means
+    but re-assign every row. List assignments are not saved: embeddings change while the
+    process is down (tenders are reprocessed, expired ones dropped), and a saved assignment
+    would put a changed row in the wrong bucket without any way to tell.
+    Small collections (below ANN_MIN_ROWS) are searched exactly. Inside an event loop,
+    k-means and the bulk assignment run in the default executor and the index keeps
+    answering with exact search until the new centroids are swapped in.
+    """
+
+    KMEANS_ITERATIONS = 10
+    ASSIGN_BATCH = 8192
+
+    def __init__(
+        self,
+        collection: str,
+        filters: Optional[Dict[str, Any]] = None,
+        id_field: str = "_id",
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        min_rows: Optional[int] = None,
+        index_dir: Optional[str] = None,
+    ) -> None:
+        super().__init__(collection, filters=filters, id_field=id_field)
+        self.nlist = nlist if nlist is not None else settings.ANN_NLIST
+        self.nprobe = nprobe if nprobe is not None else settings.ANN_NPROBE
+        self.min_rows = min_rows if min_rows is not None else settings.ANN_MIN_ROWS
+        self.index_dir = index_dir if index_dir is not None else settings.ANN_INDEX_DIR
+        self._centroids: Optional[np.ndarray] = None
+        # Bucket of every row; grows with the row buffer, so entries past _size are unused
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+        self._training: Optional[asyncio.Task] = None
+        # Rows written while a background build runs; re-assigned before the swap
+        self._stale_rows: Set[int] = set()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.index_dir, f"{self.collection_name}_ivf.npz")
+
+    def set_vectors(self, ids: Sequence[str], vectors: Any) -> None:
+        super().set_vectors(ids, vectors)
+        self._reset_quantizer()
+        if len(self._ids) < self.min_rows:
+            return
+        centroids = self._load_centroids()
+        if centroids is not None and len(self._ids) > 2 * self._trained_rows:
+            centroids = None
+        self._schedule_build(centroids)
+
+    def train(self) -> None:
+        """Fit centroids on the current rows, assign every row and persist the quantizer. Blocking."""
+        if not len(self._ids):
+            return
+        self._install(*self._build(self._matrix), trained=True)
+
+    @property
+    def training(self) -> Optional[asyncio.Task]:
+        """The background build in flight, if any."""
+        return self._training
+
+    def _build(self, matrix: np.ndarray, centroids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Centroids and row assignment for `matrix`; k-means runs only when no centroids are given.
+
+        Reads nothing but its arguments and settings, so it is safe to run in a worker thread.
+        """
+        if centroids is None:
+            n_rows = len(matrix)
+            nlist = min(self.nlist or int(np.sqrt(n_rows)), n_rows)
+            nlist = max(nlist, 1)
+            rng = np.random.default_rng(0)
+            centroids = matrix[rng.choice(n_rows, size=nlist, replace=False)].copy()
+
+            for _ in range(self.KMEANS_ITERATIONS):
+                assign = self._nearest_centroid(matrix, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, matrix)
+                counts = np.bincount(assign, minlength=nlist)
+                empty = counts == 0
+                if empty.any():
+                    # Re-seed empty buckets from random rows
+                    sums[empty] = matrix[rng.choice(n_rows, size=int(empty.sum()))]
+                centroids = self._normalize_rows(sums)
+        return centroids, self._nearest_centroid(matrix, centroids)
+
+    def _schedule_build(self, centroids: Optional[np.ndarray] = None) -> None:
+        """Build the quantizer off the event loop, or inline when no loop is running (scripts)."""
+        if self._training is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._install(*self._build(self._matrix, centroids), trained=centroids is None)
+            return
+        self._stale_rows = set()
+        self._training = loop.create_task(self._build_in_executor(self._matrix.copy(), centroids))
+
+    async def _build_in_executor(self, snapshot: np.ndarray, centroids: Optional[np.ndarray]) -> None:
+        try:
+            fitted, assign = await asyncio.get_running_loop().run_in_executor(None, self._build, snapshot, centroids)
+        except Exception as exc:
+            logger.info("ivf_index.build_failed", collection=self.collection_name, error=str(exc))
+            return
+        finally:
+            if self._training is asyncio.current_task():
+                self._training = None
+
+        # Catch up with rows written, moved or appended since the snapshot
+        size = len(self._ids)
+        assign = np.resize(assign, size)
+        stale = np.fromiter((row for row in self._stale_rows if row < size), dtype=np.int64)
+        if len(stale):
+            assign[stale] = self._nearest_centroid(self._matrix[stale], fitted)
+        self._stale_rows = set()
+        self._install(fitted, assign, trained=centroids is None)
+
+    def _install(self, centroids: np.ndarray, assign: np.ndarray, trained: bool) -> None:
+        self._centroids = centroids
+        self._assign = assign
+        if trained:
+            self._trained_rows = len(assign)
+            self._save_centroids()
+            logger.info("ivf_index.trained", collection=self.collection_name, rows=len(assign), nlist=len(centroids))
+
+    def _reset_quantizer(self) -> None:
+        if self._training is not None:
+            self._training.cancel()
+            self._training = None
+        self._stale_rows = set()
+        self._centroids = None
+        self._assign = np.zeros(0, dtype=np.int32)
+
+    def search(self, query: Optional[List[float]], k: int) -> List[Tuple[str, float]]:
+        if self._centroids is None:
+            return self.exact_search(query, k)
+        vector = self._query_vector(query)
+        if vector is None or k <= 0:
+            return []
+        nprobe = min(max(self.nprobe, 1), len(self._centroids))
+        centroid_scores = self._centroids @ vector
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.flatnonzero(np.isin(self._assign[:self._size], probes))
+        if not len(rows):
+            return []
+        return self._top_k(rows, self._matrix[rows] @ vector, k)
+
+    def clear(self) -> None:
+        super().clear()
+        self._reset_quantizer()
+
+    def _row_written(self, row: int) -> None:
+        if self._training is not None:
+            self._stale_rows.add(row)
+        if self._centroids is None:
+            if len(self._ids) >= self.min_rows and self._loaded:
+                self._schedule_build()
+            return
+        if row >= len(self._assign):
+            self._assign = np.resize(self._assign, len(self._buffer))
+        self._assign[row] = self._nearest_centroid(self._matrix[row:row + 1], self._centroids)[0]
+
+    def _row_moved(self, source: int, target: int) -> None:
+        if self._training is not None:
+            self._stale_rows.add(target)
+        if self._centroids is not None:
+            self._assign[target] = self._assign[source]
+
+    def _nearest_centroid(self, matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assign = np.empty(len(matrix), dtype=np.int32)
+        for start in range(0, len(matrix), self.ASSIGN_BATCH):
+            block = matrix[start:start + self.ASSIGN_BATCH]
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assign
+
+    def _load_centroids(self) -> Optional[np.ndarray]:
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            with np.load(self.index_path) as data:
+                centroids = data["centroids"].astype(np.float32)
+                trained_rows = int(data["trained_rows"])
+        except Exception as exc:
+            logger.info("ivf_index.load_failed", path=self.index_path, error=str(exc))
+            return None
+        if centroids.ndim != 2 or centroids.shape[1] != self.dim:
+            return None
+        self._trained_rows = trained_rows
+        return centroids
+
+    def _save_centroids(self) -> None:
+        # Centroids only; see the class docstring for why assignments are recomputed on load
+        try:
+            ensure_dir(self.index_dir)
+            tmp_path = self.index_path + ".tmp.npz"
+            np.savez(tmp_path, centroids=self._centroids, trained_rows=self._trained_rows)
+            os.replace(tmp_path, self.index_path)
+        except OSError as exc:
+            logger.info("ivf_index.save_failed", path=self.index_path, error=str(exc))
+
+
+def create_index(collection: str, filters: Optional[Dict[str, Any]] = None, id_field: str = "_id") -> EmbeddingMatrix:
+    """Build the vector index configured by ANN_BACKEND ("ivf" or "exact")."""
+    backend = settings.ANN_BACKEND.lower()
+    if backend == "ivf":
+        return IVFIndex(collection, filters=filters, id_field=id_field)
+    if backend == "exact":
+        return EmbeddingMatrix(collection, filters=filters, id_field=id_field)
+    raise ValueError(f"Unsupported ANN_BACKEND: {settings.ANN_BACKEND}")
+
+
+tender_matrix = create_index("tenders", filters={"is_active": True, "expired": False})
+company_matrix = create_index("company_profiles", id_field="company_id")
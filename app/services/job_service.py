@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.database.pagination import keyset_page, list_total
 from app.jobs.scrape_job import run_process_job, run_scrape_job
 from app.jobs.scheduler import scheduler
 from app.services.socket_manager import manager
@@ -24,6 +25,8 @@ class JobService:
         limit: int = 20,
         job_type: Optional[str] = None,
         status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
         filters: Dict[str, Any] = {}
         if job_type:
@@ -31,12 +34,10 @@ class JobService:
         if status:
             filters["status"] = status
 
-        total = await self.collection.count_documents(filters)
-        cursor = self.collection.find(filters).sort("started_at", -1).skip(skip).limit(limit)
-        items = []
-        async for job in cursor:
-            items.append(self._serialize(job))
-        return {"items": items, "total": total, "skip": skip, "limit": limit}
+        jobs, next_cursor = await keyset_page(self.collection, filters, "started_at", -1, limit, cursor=cursor, skip=skip)
+        total = await list_total(self.collection, filters) if include_total else None
+        items = [self._serialize(job) for job in jobs]
+        return {"items": items, "total": total, "next_cursor": next_cursor, "skip": skip, "limit": limit}
 
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         job = await self.collection.find_one({"job_id": job_id})
@@ -0,0 +1,174 @@
+"""
+Materialized tender -> company match table.
+
+Scores are computed when a tender finishes processing or a company profile is
+created, so search can read ranked matches instead of scoring on every request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config import settings
+from app.database.repositories.company_repo import CompanyRepository
+from app.database.repositories.match_repo import MatchRepository
+from app.database.repositories.tender_repo import TenderRepository, open_end_date
+from app.services.embedding_index import company_matrix, tender_matrix
+from app.services.matching_utils import (
+    get_profile_features,
+    get_tender_features,
+    score_profile_against_tenders,
+    score_tender_against_companies,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Tenders scored per batch when refreshing a company's matches
+_TENDER_BATCH_SIZE = 1000
+
+# Company refreshes running in the background, by company_id
+_company_refreshes: Dict[str, asyncio.Task] = {}
+
+
+class MatchService:
+    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+        self.repo = MatchRepository(db)
+        self.company_repo = CompanyRepository(db)
+        self.tender_repo = TenderRepository(db)
+        self.db = db
+
+    async def refresh_tender(self, tender: Dict[str, Any]) -> int:
+        """Score one tender against all ready company profiles and replace its matches."""
+        tender_id = str(tender["_id"])
+        if not tender.get("is_active", True) or tender.get("expired"):
+            await self.repo.delete_for_tender(tender_id)
+            return 0
+
+        await company_matrix.ensure_loaded(self.db)
+        vector_scores = company_matrix.scores(tender.get("summary_embedding"))
+        companies = [
+            company
+            async for company in self.company_repo.collection.find(
+                {"status.processing_status": "ready"}, self.company_repo.VIEWS["scoring"]
+            )
+        ]
+        batch = score_tender_against_companies(
+            get_tender_features(tender),
+            [get_profile_features(company) for company in companies],
+            [vector_scores.get(company.get("company_id"), 0.0) for company in companies],
+        )
+        now = datetime.now(timezone.utc)
+        matches = [
+            self._match_doc(tender, companies[i], float(batch.scores[i]), batch.reasons(i), now)
+            for i in range(len(companies))
+            if batch.scores[i] >= settings.MATCH_TABLE_MIN_SCORE
+        ]
+        count = await self.repo.replace_for_tender(tender_id, matches, now)
+        await self.tender_repo.collection.update_one({"_id": tender["_id"]}, {"$set": {"matches_refreshed_at": now}})
+        logger.info("matches.tender_refreshed", tender_id=tender_id, companies=len(companies), matches=count)
+        return count
+
+    async def refresh_company(self, profile: Dict[str, Any]) -> int:
+        """
+        Score one company profile against all active tenders and replace its matches.
+        Rows are rewritten in place and stale ones dropped at the end, so stored matches
+        stay readable during the rescan.
+        """
+        company_id = profile.get("company_id")
+        now = datetime.now(timezone.utc)
+        count = 0
+        if (profile.get("status") or {}).get("processing_status") == "ready":
+            await tender_matrix.ensure_loaded(self.db)
+            vector_scores = tender_matrix.scores(profile.get("summary_embedding"))
+            profile_features = get_profile_features(profile)
+            tenders: List[Dict[str, Any]] = []
+            cursor = self.tender_repo.collection.find(
+                {"is_active": True, "expired": False, **open_end_date()}, self.tender_repo.VIEWS["scoring"]
+            )
+            async for tender in cursor:
+                tenders.append(tender)
+                if len(tenders) >= _TENDER_BATCH_SIZE:
+                    count += await self._upsert_company_matches(profile, profile_features, tenders, vector_scores, now)
+                    tenders = []
+            count += await self._upsert_company_matches(profile, profile_features, tenders, vector_scores, now)
+        await self.repo.delete_stale({"company_id": company_id}, now)
+
+        await self.company_repo.collection.update_one(
+            {"company_id": company_id}, {"$set": {"matches_refreshed_at": now}}
+        )
+        logger.info("matches.company_refreshed", company_id=company_id, matches=count)
+        return count
+
+    def schedule_company_refresh(self, profile: Dict[str, Any]) -> asyncio.Task:
+        """
+        Run `refresh_company` in the background, at most once per company at a time.
+        The profile gets `matches_refreshed_at` only when the rescan completes.
+        """
+        company_id = profile.get("company_id")
+        task = _company_refreshes.get(company_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh_company_in_background(profile))
+            _company_refreshes[company_id] = task
+        return task
+
+    async def _refresh_company_in_background(self, profile: Dict[str, Any]) -> None:
+        company_id = profile.get("company_id")
+        try:
+            await self.refresh_company(profile)
+        except Exception as exc:
+            logger.info("matches.company_refresh_failed", company_id=company_id, error=str(exc))
+        finally:
+            if _company_refreshes.get(company_id) is asyncio.current_task():
+                del _company_refreshes[company_id]
+
+    async def _upsert_company_matches(
+        self,
+        profile: Dict[str, Any],
+        profile_features,
+        tenders: List[Dict[str, Any]],
+        vector_scores: Dict[str, float],
+        now: datetime,
+    ) -> int:
+        if not tenders:
+            return 0
+        batch = score_profile_against_tenders(
+            profile_features,
+            [get_tender_features(tender) for tender in tenders],
+            [vector_scores.get(str(tender.get("_id")), 0.0) for tender in tenders],
+        )
+        matches = [
+            self._match_doc(tenders[i], profile, float(batch.scores[i]), batch.reasons(i), now)
+            for i in range(len(tenders))
+            if batch.scores[i] >= settings.MATCH_TABLE_MIN_SCORE
+        ]
+        return await self.repo.upsert(matches)
+
+    def _match_doc(
+        self,
+        tender: Dict[str, Any],
+        company: Dict[str, Any],
+        score: float,
+        reasons: List[str],
+        now: datetime,
+    ) -> Dict[str, Any]:
+        tender_meta = tender.get("metadata") or {}
+        return {
+            "tender_id": str(tender["_id"]),
+            "company_id": company.get("company_id"),
+            "bid_id": tender.get("bid_id"),
+            "company_name": company.get("name") or (company.get("metadata") or {}).get("company_name"),
+            "score": score,
+            "match_reasons": reasons,
+            # Copied from the tender so query-time filters need no join
+            "domains": tender_meta.get("domains") or [],
+            "required_certifications": tender_meta.get("required_certifications") or [],
+            "end_date": (tender.get("scraped_info") or {}).get("end_date"),
+            "is_active": tender.get("is_active", True),
+            "expired": bool(tender.get("expired")),
+            "computed_at": now,
+        }
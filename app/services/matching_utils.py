@@ -6,7 +6,15 @@ Provides semantic matching, synonym handling, and fuzzy matching capabilities.
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Set, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.config import settings
+from app.utils.aho_corasick import PhraseAutomaton
 
 # Domain synonyms and related terms mapping - PRECISE coverage to avoid false matches
 DOMAIN_SYNONYMS: Dict[str, Set[str]] = {
@@ -77,17 +85,64 @@ def normalize_text(text: str) -> str:
     return text
 
 
+# Common words to ignore when adding individual words of a term
+IGNORE_WORDS: Set[str] = {
+    "system", "systems", "service", "services", "equipment", "contract",
+    "management", "maintenance", "support", "solution", "solutions",
+    "infrastructure", "technology", "technologies", "annual", "comprehensive"
+}
+
+
+class SynonymIndex:
+    """
+    Normalized view of the synonym tables, built once instead of on every lookup.
+
+    Each (table, key) pair becomes a group holding the normalized key and its
+    normalized synonyms. A term selects a group when it equals the key or one of the
+    synonyms, or when the key (longer than 6 chars) is contained in the term.
+    """
+
+    def __init__(self, *tables: Dict[str, Set[str]]) -> None:
+        self.groups: List[Tuple[str, Set[str]]] = []
+        self.reverse: Dict[str, List[int]] = {}
+        self.key_automaton = PhraseAutomaton()
+
+        for table in tables:
+            for key, synonyms in table.items():
+                group_id = len(self.groups)
+                norm_key = normalize_text(key)
+                norm_synonyms = {normalize_text(s) for s in synonyms}
+                self.groups.append((norm_key, norm_synonyms))
+                for value in {norm_key, *norm_synonyms}:
+                    self.reverse.setdefault(value, []).append(group_id)
+                if len(norm_key) > 6:
+                    self.key_automaton.add(norm_key, group_id)
+
+        self.key_automaton.build()
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def _match(self, norm_term: str) -> Tuple[int, ...]:
+        """Group ids selected by a normalized term, in table order."""
+        matched = set(self.reverse.get(norm_term, ()))
+        matched.update(self.key_automaton.find_all(norm_term))
+        return tuple(sorted(matched))
+
+
+_synonym_index = SynonymIndex(DOMAIN_SYNONYMS, TECH_SYNONYMS)
+
+
+def rebuild_synonym_index() -> SynonymIndex:
+    """Rebuild the synonym index. Call after DOMAIN_SYNONYMS or TECH_SYNONYMS change."""
+    global _synonym_index
+    _synonym_index = SynonymIndex(DOMAIN_SYNONYMS, TECH_SYNONYMS)
+    return _synonym_index
+
+
 def expand_with_synonyms(terms: List[str]) -> Set[str]:
     """Expand a list of terms with their synonyms. STRICT matching to avoid false positives."""
+    index = _synonym_index
     expanded = set()
 
-    # Common words to ignore when checking word overlap
-    IGNORE_WORDS = {
-        "system", "systems", "service", "services", "equipment", "contract",
-        "management", "maintenance", "support", "solution", "solutions",
-        "infrastructure", "technology", "technologies", "annual", "comprehensive"
-    }
-
     for term in terms:
         norm_term = normalize_text(term)
         expanded.add(norm_term)
@@ -97,33 +152,11 @@ def expand_with_synonyms(terms: List[str]) -> Set[str]:
             if len(word) > 4 and word not in IGNORE_WORDS:
                 expanded.add(word)
 
-        # Add direct synonyms - STRICT matching only
-        for key, synonyms in DOMAIN_SYNONYMS.items():
-            norm_key = normalize_text(key)
-            norm_synonyms = {normalize_text(s) for s in synonyms}
-
-            # Exact match only
-            if norm_term == norm_key or norm_term in norm_synonyms:
-                expanded.add(norm_key)
-                expanded.update(norm_synonyms)
-            # Partial match - but only if the key phrase is FULLY contained
-            elif len(norm_key) > 6 and norm_key in norm_term:
-                expanded.add(norm_key)
-                expanded.update(norm_synonyms)
-
-        # Add technology synonyms - STRICT matching only
-        for key, synonyms in TECH_SYNONYMS.items():
-            norm_key = normalize_text(key)
-            norm_synonyms = {normalize_text(s) for s in synonyms}
-
-            # Exact match
-            if norm_term == norm_key or norm_term in norm_synonyms:
-                expanded.add(norm_key)
-                expanded.update(norm_synonyms)
-            # Partial match - only if key is FULLY contained (not just word overlap)
-            elif len(norm_key) > 6 and norm_key in norm_term:
-                expanded.add(norm_key)
-                expanded.update(norm_synonyms)
+        # Add synonym groups - exact key/synonym match or key FULLY contained in the term
+        for group_id in index.match(norm_term):
+            norm_key, norm_synonyms = index.groups[group_id]
+            expanded.add(norm_key)
+            expanded.update(norm_synonyms)
 
     return expanded
 
@@ -132,7 +165,11 @@ def fuzzy_match_score(str1: str, str2: str) -> float:
     """Calculate fuzzy match score between two strings."""
     s1 = normalize_text(str1)
     s2 = normalize_text(str2)
+    return _normalized_fuzzy_score(s1, s2, set(s1.split()), set(s2.split()))
+
 
+def _normalized_fuzzy_score(s1: str, s2: str, words1: Set[str], words2: Set[str]) -> float:
+    """`fuzzy_match_score` for already normalized strings and their word sets."""
     if not s1 or not s2:
         return 0.0
 
@@ -144,9 +181,6 @@ def fuzzy_match_score(str1: str, str2: str) -> float:
         return 0.8
 
     # Check word overlap
-    words1 = set(s1.split())
-    words2 = set(s2.split())
-
     if not words1 or not words2:
         return 0.0
 
@@ -157,6 +191,261 @@ def fuzzy_match_score(str1: str, str2: str) -> float:
     return 0.0
 
 
+# Weights of each component in calculate_enhanced_match_score
+MATCH_WEIGHTS: Dict[str, float] = {
+    "domain": 0.20,
+    "technology": 0.20,
+    "certification": 0.10,
+    "capability": 0.15,
+    "text_match": 0.15,
+    "cross_match": 0.10,
+    "government": 0.05,
+    "vector": 0.05,
+}
+
+# Common short words dropped from word-level overlap
+STOP_WORDS: Set[str] = {"and", "the", "for", "with", "from", "into"}
+
+# Specific capability phrases to look for in tender text (not generic words)
+CAPABILITY_PHRASES: Dict[str, List[str]] = {
+    "audio visual": ["audio visual", "audiovisual", "audio-visual", "av system"],
+    "led wall": ["led wall", "led walls", "video wall", "led display wall"],
+    "projector": ["projector", "projectors", "projection system", "projection equipment"],
+    "maintenance": ["annual maintenance", "amc", "comprehensive maintenance", "maintenance contract"],
+    "content production": ["content production", "media production", "video production"],
+    "museum": ["museum", "museums", "memorial", "memorials", "heritage"],
+}
+
+# Capability phrases searched for directly in tender text
+TEXT_MATCH_PHRASES: List[str] = [
+    "audio visual", "audiovisual", "led wall", "led walls", "video wall",
+    "projector", "projectors", "projection", "memorial", "museum"
+]
+
+# Significant profile domain terms checked against tender text
+PROFILE_DOMAIN_TERMS: List[str] = [
+    "museum", "memorial", "heritage", "archaeology", "audio visual", "audiovisual", "led wall", "projector"
+]
+
+
+class PhraseScanner:
+    """
+    Single-pass scanner over the static phrase dictionaries used by the text scorers.
+
+    `scan` returns the dictionary phrases found in a normalized text. Phrases outside
+    the dictionary (profile-specific terms) fall back to a plain substring check.
+    """
+
+    def __init__(self, phrases: Sequence[str]) -> None:
+        self.phrases: Set[str] = set(phrases)
+        self.automaton = PhraseAutomaton((phrase, phrase) for phrase in self.phrases).build()
+
+    def scan(self, text: str) -> "PhraseHits":
+        return PhraseHits(text, self)
+
+
+class PhraseHits:
+    """Dictionary phrases contained in one normalized text; supports `phrase in hits` like the text itself."""
+
+    __slots__ = ("text", "hits", "_scanner")
+
+    def __init__(self, text: str, scanner: PhraseScanner) -> None:
+        self.text = text or ""
+        self.hits: Set[str] = scanner.automaton.find_all(self.text)
+        self._scanner = scanner
+
+    def __contains__(self, phrase: str) -> bool:
+        if phrase in self._scanner.phrases:
+            return phrase in self.hits
+        return phrase in self.text
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+
+def _scanner_phrases() -> List[str]:
+    phrases = [phrase for group in CAPABILITY_PHRASES.values() for phrase in group]
+    phrases += [phrase for group in CAPABILITY_KEYWORDS.values() for phrase in group]
+    phrases += TEXT_MATCH_PHRASES + PROFILE_DOMAIN_TERMS
+    for table in (DOMAIN_SYNONYMS, TECH_SYNONYMS):
+        for key, synonyms in table.items():
+            phrases.append(normalize_text(key))
+            phrases.extend(normalize_text(s) for s in synonyms)
+    return phrases
+
+
+_phrase_scanner = PhraseScanner(_scanner_phrases())
+
+
+def rebuild_phrase_scanner() -> PhraseScanner:
+    """Rebuild the phrase scanner. Call after any of the phrase or synonym tables change."""
+    global _phrase_scanner
+    _phrase_scanner = PhraseScanner(_scanner_phrases())
+    return _phrase_scanner
+
+
+def scan_phrases(text: str) -> PhraseHits:
+    """Scan normalized text for all dictionary phrases in one pass."""
+    return _phrase_scanner.scan(text)
+
+
+class TermFeatures:
+    """Synonym expansion and word set of one metadata list field, computed once per document."""
+
+    __slots__ = (
+        "count",
+        "expanded",
+        "words",
+        "meaningful_words",
+        "terms",
+        "norms",
+        "norm_words",
+        "word_index",
+        "_containment",
+    )
+
+    def __init__(self, values: List[str]) -> None:
+        values = values or []
+        self.count = len(values)
+        self.expanded: Set[str] = expand_with_synonyms(values) if values else set()
+        words: Set[str] = set()
+        for term in self.expanded:
+            words.update(term.split())
+        words -= STOP_WORDS
+        self.words = words
+        self.meaningful_words: Set[str] = {w for w in words if len(w) > 3}
+
+        # Fuzzy matching inputs, in the iteration order of `expanded`: normalized form and
+        # word set of every term, plus an inverted word -> term positions index
+        self.terms: List[str] = list(self.expanded)
+        self.norms: List[str] = [normalize_text(term) for term in self.terms]
+        self.norm_words: List[Set[str]] = [set(norm.split()) for norm in self.norms]
+        self.word_index: Dict[str, List[int]] = {}
+        for position, term_words in enumerate(self.norm_words):
+            for word in term_words:
+                self.word_index.setdefault(word, []).append(position)
+        self._containment: Optional[PhraseAutomaton] = None
+
+    @property
+    def containment(self) -> PhraseAutomaton:
+        """Automaton reporting the positions of the terms contained in a text, built on first use."""
+        if self._containment is None:
+            self._containment = PhraseAutomaton((norm, i) for i, norm in enumerate(self.norms) if norm)
+        return self._containment
+
+
+class TenderFeatures:
+    """Precompiled matching inputs derived from tender metadata."""
+
+    __slots__ = (
+        "domains",
+        "technologies",
+        "certifications",
+        "text_norm",
+        "text_hits",
+        "domain_norms",
+        "sector",
+        "_keywords",
+    )
+
+    def __init__(self, tender_meta: Dict) -> None:
+        tender_meta = tender_meta or {}
+        self.domains = TermFeatures(tender_meta.get("domains", []))
+        self.technologies = TermFeatures(tender_meta.get("required_technologies", []))
+        self.certifications = TermFeatures(tender_meta.get("required_certifications", []))
+        self.text_norm = normalize_text(f"{tender_meta.get('title', '')} {tender_meta.get('summary', '')}")
+        # Phrase hits in title + summary, shared by the capability, text keyword and cross-match scorers
+        self.text_hits = scan_phrases(self.text_norm)
+        self.domain_norms: Dict[str, Set[str]] = {
+            norm: set(norm.split()) for norm in set(normalize_text(d) for d in tender_meta.get("domains", []) or [])
+        }
+        self.sector = bool(tender_meta.get("sector"))
+        self._keywords: Optional[Set[str]] = None
+
+    @property
+    def keywords(self) -> Set[str]:
+        """`extract_keywords_from_text` of the tender title + summary."""
+        if self._keywords is None:
+            self._keywords = _extract_keywords(self.text_hits)
+        return self._keywords
+
+
+class ProfileFeatures:
+    """Precompiled matching inputs derived from company profile metadata."""
+
+    __slots__ = (
+        "domains",
+        "technologies",
+        "certifications",
+        "capability_categories",
+        "domain_entries",
+        "tech_entries",
+        "tech_norms",
+        "domain_terms",
+        "government_experience",
+    )
+
+    def __init__(self, profile_meta: Dict) -> None:
+        profile_meta = profile_meta or {}
+        domains = profile_meta.get("domains", []) or []
+        technologies = profile_meta.get("technologies", []) or []
+        self.domains = TermFeatures(profile_meta.get("domains", []))
+        self.technologies = TermFeatures(profile_meta.get("technologies", []))
+        self.certifications = TermFeatures(profile_meta.get("certifications", []))
+        self.capability_categories = _capability_categories(profile_meta.get("capabilities", []) or [])
+        self.domain_entries = _domain_text_entries(domains)
+        self.tech_entries = _tech_text_entries(technologies)
+        self.tech_norms: Dict[str, Set[str]] = {
+            norm: set(norm.split()) for norm in set(normalize_text(t) for t in technologies)
+        }
+        self.domain_terms = _profile_domain_terms(domains)
+        self.government_experience = bool(profile_meta.get("government_experience"))
+
+
+class FeatureCache:
+    """LRU cache of compiled features keyed by document id and `updated_at`."""
+
+    def __init__(self, factory, id_field: str = "_id", maxsize: int = 5000) -> None:
+        self.factory = factory
+        self.id_field = id_field
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Any], Any]" = OrderedDict()
+
+    def get(self, doc: Dict) -> Any:
+        meta = doc.get("metadata") or {}
+        doc_id = doc.get(self.id_field)
+        updated_at = doc.get("updated_at")
+        if doc_id is None or updated_at is None:
+            return self.factory(meta)
+
+        key = (str(doc_id), updated_at)
+        features = self._entries.get(key)
+        if features is not None:
+            self._entries.move_to_end(key)
+            return features
+
+        features = self.factory(meta)
+        self._entries[key] = features
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return features
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+tender_features_cache = FeatureCache(TenderFeatures, id_field="_id", maxsize=settings.MATCH_FEATURES_CACHE_SIZE)
+profile_features_cache = FeatureCache(ProfileFeatures, id_field="company_id", maxsize=settings.MATCH_FEATURES_CACHE_SIZE)
+
+
+def get_tender_features(tender: Dict) -> TenderFeatures:
+    return tender_features_cache.get(tender)
+
+
+def get_profile_features(profile: Dict) -> ProfileFeatures:
+    return profile_features_cache.get(profile)
+
+
 def semantic_overlap_score(
     tender_values: List[str],
     profile_values: List[str],
@@ -167,44 +456,35 @@ def semantic_overlap_score(
     """
     if not tender_values or not profile_values:
         return 0.0, []
+    return term_overlap_score(TermFeatures(tender_values), TermFeatures(profile_values))
 
-    # Expand both with synonyms
-    tender_expanded = expand_with_synonyms(tender_values)
-    profile_expanded = expand_with_synonyms(profile_values)
+
+def term_overlap_score(
+    tender_terms: TermFeatures,
+    profile_terms: TermFeatures,
+) -> Tuple[float, List[str]]:
+    """`semantic_overlap_score` over precompiled term features."""
+    if not tender_terms.count or not profile_terms.count:
+        return 0.0, []
+
+    tender_expanded = tender_terms.expanded
+    profile_expanded = profile_terms.expanded
 
     # Direct overlap after synonym expansion
     direct_overlap = tender_expanded.intersection(profile_expanded)
 
-    # Word-level overlap (for partial matches)
-    tender_words = set()
-    profile_words = set()
-    for term in tender_expanded:
-        tender_words.update(term.split())
-    for term in profile_expanded:
-        profile_words.update(term.split())
-
-    # Remove common short words
-    stop_words = {"and", "the", "for", "with", "from", "into"}
-    tender_words -= stop_words
-    profile_words -= stop_words
-
-    word_overlap = tender_words.intersection(profile_words)
-    # Filter to meaningful words (length > 3)
+    # Word-level overlap (for partial matches), filtered to meaningful words (length > 3)
+    tender_words = tender_terms.words
+    word_overlap = tender_words.intersection(profile_terms.words)
     word_overlap = {w for w in word_overlap if len(w) > 3}
 
     # Fuzzy matching for non-direct matches
-    fuzzy_matches = []
-    for t_term in tender_expanded:
-        for p_term in profile_expanded:
-            if t_term not in direct_overlap and p_term not in direct_overlap:
-                score = fuzzy_match_score(t_term, p_term)
-                if score >= 0.5:  # Lowered threshold
-                    fuzzy_matches.append((t_term, p_term, score))
+    fuzzy_matches = _fuzzy_matches(tender_terms, profile_terms, direct_overlap)
 
     # Calculate final score with multiple components
-    direct_score = len(direct_overlap) / max(len(tender_values), 1) * 0.5
+    direct_score = len(direct_overlap) / max(tender_terms.count, 1) * 0.5
     word_score = len(word_overlap) / max(len(tender_words), 1) * 0.3
-    fuzzy_score = sum(m[2] for m in fuzzy_matches) / max(len(tender_values), 1) * 0.2 if fuzzy_matches else 0
+    fuzzy_score = sum(m[2] for m in fuzzy_matches) / max(tender_terms.count, 1) * 0.2 if fuzzy_matches else 0
 
     total_score = min(direct_score + word_score + fuzzy_score, 1.0)
 
@@ -221,12 +501,51 @@ def semantic_overlap_score(
     return total_score, matched_terms[:5]
 
 
+def _fuzzy_matches(
+    tender_terms: TermFeatures,
+    profile_terms: TermFeatures,
+    direct_overlap: Set[str],
+) -> List[Tuple[str, str, float]]:
+    """
+    Fuzzy matches between non-direct term pairs.
+
+    A pair can only reach the 0.5 threshold if the terms share a word or one contains the
+    other, so candidates come from the word index and the containment automata instead of
+    the full cross product. They are scored in cross-product order to keep sums identical.
+    """
+    candidates: Set[Tuple[int, int]] = set()
+    profile_index = profile_terms.word_index
+    for i, term_words in enumerate(tender_terms.norm_words):
+        for word in term_words:
+            for j in profile_index.get(word, ()):
+                candidates.add((i, j))
+        for j in profile_terms.containment.find_all(tender_terms.norms[i]):
+            candidates.add((i, j))
+    for j, norm in enumerate(profile_terms.norms):
+        for i in tender_terms.containment.find_all(norm):
+            candidates.add((i, j))
+
+    fuzzy_matches = []
+    for i, j in sorted(candidates):
+        t_term = tender_terms.terms[i]
+        p_term = profile_terms.terms[j]
+        if t_term not in direct_overlap and p_term not in direct_overlap:
+            score = _normalized_fuzzy_score(
+                tender_terms.norms[i], profile_terms.norms[j], tender_terms.norm_words[i], profile_terms.norm_words[j]
+            )
+            if score >= 0.5:  # Lowered threshold
+                fuzzy_matches.append((t_term, p_term, score))
+    return fuzzy_matches
+
+
 def extract_keywords_from_text(text: str) -> Set[str]:
     """Extract relevant keywords from text."""
     if not text:
         return set()
+    return _extract_keywords(scan_phrases(normalize_text(text)))
+
 
-    text = normalize_text(text)
+def _extract_keywords(text: PhraseHits) -> Set[str]:
     keywords = set()
 
     # Check for capability keywords
@@ -244,6 +563,17 @@ def extract_keywords_from_text(text: str) -> Set[str]:
     return keywords
 
 
+def _capability_categories(capabilities: List[str]) -> List[str]:
+    """Phrase categories each capability relates to, in capability order."""
+    categories = []
+    for cap in capabilities:
+        cap_hits = scan_phrases(normalize_text(cap))
+        for category, phrases in CAPABILITY_PHRASES.items():
+            if any(phrase in cap_hits for phrase in phrases):
+                categories.append(category)
+    return categories
+
+
 def capability_match_score(
     tender_summary: str,
     tender_title: str,
@@ -255,39 +585,48 @@ def capability_match_score(
     """
     if not company_capabilities:
         return 0.0, []
+    return _capability_score(
+        scan_phrases(normalize_text(f"{tender_title} {tender_summary}")),
+        _capability_categories(company_capabilities),
+    )
+
 
-    tender_text = normalize_text(f"{tender_title} {tender_summary}")
+def _capability_score(tender_text: PhraseHits, capability_categories: List[str]) -> Tuple[float, List[str]]:
     matches = []
     score = 0.0
 
-    # Define specific capability phrases to look for (not generic words)
-    specific_phrases = {
-        "audio visual": ["audio visual", "audiovisual", "audio-visual", "av system"],
-        "led wall": ["led wall", "led walls", "video wall", "led display wall"],
-        "projector": ["projector", "projectors", "projection system", "projection equipment"],
-        "maintenance": ["annual maintenance", "amc", "comprehensive maintenance", "maintenance contract"],
-        "content production": ["content production", "media production", "video production"],
-        "museum": ["museum", "museums", "memorial", "memorials", "heritage"],
-    }
-
-    # Check each capability for specific phrase matches
-    for cap in company_capabilities:
-        cap_lower = normalize_text(cap)
-        for category, phrases in specific_phrases.items():
-            # Check if capability relates to this category
-            if any(phrase in cap_lower for phrase in phrases):
-                # Check if tender text mentions this category
-                for phrase in phrases:
-                    if phrase in tender_text:
-                        matches.append(f"{category}:{phrase}")
-                        score += 0.25
-                        break
+    # Check if tender text mentions each category a capability relates to
+    for category in capability_categories:
+        for phrase in CAPABILITY_PHRASES[category]:
+            if phrase in tender_text:
+                matches.append(f"{category}:{phrase}")
+                score += 0.25
+                break
 
     # Cap score and deduplicate matches
     unique_matches = list(set(matches))
     return min(score, 1.0), unique_matches[:4]
 
 
+def _domain_text_entries(domains: List[str]) -> List[Tuple[str, str, List[str]]]:
+    """(domain, normalized domain, expanded terms longer than 8 chars) per profile domain."""
+    entries = []
+    for domain in domains:
+        domain_expanded = expand_with_synonyms([domain])
+        entries.append((domain, normalize_text(domain), [term for term in domain_expanded if len(term) > 8]))
+    return entries
+
+
+def _tech_text_entries(technologies: List[str]) -> List[Tuple[str, str]]:
+    """(technology, normalized technology) for names long enough to match on."""
+    entries = []
+    for tech in technologies:
+        tech_norm = normalize_text(tech)
+        if len(tech_norm) > 5:
+            entries.append((tech, tech_norm))
+    return entries
+
+
 def text_keyword_match_score(
     tender_text: str,
     profile_meta: Dict,
@@ -299,39 +638,42 @@ def text_keyword_match_score(
     """
     if not tender_text:
         return 0.0, []
+    return _text_keyword_score(
+        scan_phrases(normalize_text(tender_text)),
+        _domain_text_entries(profile_meta.get("domains", [])),
+        _tech_text_entries(profile_meta.get("technologies", [])),
+    )
 
-    tender_text_lower = normalize_text(tender_text)
+
+def _text_keyword_score(
+    tender_text_lower: PhraseHits,
+    domain_entries: List[Tuple[str, str, List[str]]],
+    tech_entries: List[Tuple[str, str]],
+) -> Tuple[float, List[str]]:
     matched_keywords = []
     total_keywords = 0
 
     # Check profile domains in tender text - require longer matches
-    for domain in profile_meta.get("domains", []):
-        domain_norm = normalize_text(domain)
+    for domain, domain_norm, long_terms in domain_entries:
         # Only match if the full domain phrase or significant portion is found
         if len(domain_norm) > 5 and domain_norm in tender_text_lower:
             matched_keywords.append(f"domain:{domain}")
             total_keywords += 1
         # Also check synonyms but require longer matches
-        domain_expanded = expand_with_synonyms([domain])
-        for term in domain_expanded:
-            if len(term) > 8 and term in tender_text_lower:  # Require longer terms
+        for term in long_terms:
+            if term in tender_text_lower:
                 matched_keywords.append(f"domain:{term}")
                 total_keywords += 1
                 break
 
     # Check profile technologies in tender text - require exact technology name
-    for tech in profile_meta.get("technologies", []):
-        tech_norm = normalize_text(tech)
-        if len(tech_norm) > 5 and tech_norm in tender_text_lower:
+    for tech, tech_norm in tech_entries:
+        if tech_norm in tender_text_lower:
             matched_keywords.append(f"tech:{tech}")
             total_keywords += 1
 
     # Check specific capability phrases in tender text
-    capability_phrases = [
-        "audio visual", "audiovisual", "led wall", "led walls", "video wall",
-        "projector", "projectors", "projection", "memorial", "museum"
-    ]
-    for phrase in capability_phrases:
+    for phrase in TEXT_MATCH_PHRASES:
         if phrase in tender_text_lower:
             matched_keywords.append(f"phrase:{phrase}")
             total_keywords += 1
@@ -344,6 +686,11 @@ def text_keyword_match_score(
     return score, matched_keywords[:5]
 
 
+def _profile_domain_terms(domains: List[str]) -> List[List[str]]:
+    """Significant terms contained in each profile domain."""
+    return [[term for term in PROFILE_DOMAIN_TERMS if term in normalize_text(domain)] for domain in domains]
+
+
 def cross_match_domains_and_text(
     tender_meta: Dict,
     profile_meta: Dict,
@@ -353,23 +700,34 @@ def cross_match_domains_and_text(
     This catches when a tender domain matches company technology.
     Uses STRICT matching to avoid false positives.
     """
-    matches = []
-    score = 0.0
-
-    # Check if tender domains match profile technologies - require meaningful overlap
     tender_domains = set(normalize_text(d) for d in tender_meta.get("domains", []))
     profile_techs = set(normalize_text(t) for t in profile_meta.get("technologies", []))
+    tender_text = f"{tender_meta.get('title', '')} {tender_meta.get('summary', '')}"
+    return _cross_match_score(
+        {td: set(td.split()) for td in tender_domains},
+        {pt: set(pt.split()) for pt in profile_techs},
+        scan_phrases(normalize_text(tender_text)),
+        _profile_domain_terms(profile_meta.get("domains", [])),
+    )
+
+
+def _cross_match_score(
+    tender_domains: Dict[str, Set[str]],
+    profile_techs: Dict[str, Set[str]],
+    tender_text_norm: PhraseHits,
+    profile_domain_terms: List[List[str]],
+) -> Tuple[float, List[str]]:
+    matches = []
+    score = 0.0
 
     # Check for direct phrase containment (not just word overlap)
-    for td in tender_domains:
-        for pt in profile_techs:
+    for td, td_words in tender_domains.items():
+        for pt, pt_words in profile_techs.items():
             # Check if tech is contained in domain or vice versa
             if len(pt) > 8 and (pt in td or td in pt):
                 matches.append(f"domain-tech:{pt}")
                 score += 0.3
             # Check if they share significant words
-            td_words = set(td.split())
-            pt_words = set(pt.split())
             common = td_words.intersection(pt_words)
             # Require meaningful words (not just 'and', 'the', etc.)
             meaningful_common = {w for w in common if len(w) > 4}
@@ -378,15 +736,9 @@ def cross_match_domains_and_text(
                 score += 0.2
 
     # Check if specific profile domains appear in tender text
-    tender_text = f"{tender_meta.get('title', '')} {tender_meta.get('summary', '')}"
-    tender_text_norm = normalize_text(tender_text)
-
-    # Only check for significant profile domain terms
-    important_profile_terms = ["museum", "memorial", "heritage", "archaeology", "audio visual", "audiovisual", "led wall", "projector"]
-    for domain in profile_meta.get("domains", []):
-        domain_norm = normalize_text(domain)
-        for term in important_profile_terms:
-            if term in domain_norm and term in tender_text_norm:
+    for terms in profile_domain_terms:
+        for term in terms:
+            if term in tender_text_norm:
                 matches.append(f"profile-domain-in-text:{term}")
                 score += 0.3
                 break
@@ -398,69 +750,64 @@ def calculate_enhanced_match_score(
     tender_meta: Dict,
     profile_meta: Dict,
     vector_similarity: float,
+    tender_features: Optional[TenderFeatures] = None,
+    profile_features: Optional[ProfileFeatures] = None,
 ) -> Tuple[float, List[str]]:
     """
     Calculate enhanced match score using multiple factors.
 
+    Precompiled features (see `get_tender_features` / `get_profile_features`) can be
+    passed to skip re-deriving them from metadata for every pair.
+
     Returns:
         Tuple of (final_score, match_reasons)
     """
+    tender = tender_features or TenderFeatures(tender_meta)
+    profile = profile_features or ProfileFeatures(profile_meta)
     reasons = []
     scores = {}
 
     # 1. Domain matching with synonyms (weight: 0.20)
-    domain_score, domain_matches = semantic_overlap_score(
-        tender_meta.get("domains", []),
-        profile_meta.get("domains", [])
-    )
+    domain_score, domain_matches = term_overlap_score(tender.domains, profile.domains)
     scores["domain"] = domain_score
     if domain_matches:
         reasons.append(f"Domain match: {', '.join(domain_matches[:3])}")
 
     # 2. Technology matching with synonyms (weight: 0.20)
-    tech_score, tech_matches = semantic_overlap_score(
-        tender_meta.get("required_technologies", []),
-        profile_meta.get("technologies", [])
-    )
+    tech_score, tech_matches = term_overlap_score(tender.technologies, profile.technologies)
     scores["technology"] = tech_score
     if tech_matches:
         reasons.append(f"Technology match: {', '.join(tech_matches[:3])}")
 
     # 3. Certification matching (weight: 0.10)
-    cert_score, cert_matches = semantic_overlap_score(
-        tender_meta.get("required_certifications", []),
-        profile_meta.get("certifications", [])
-    )
+    cert_score, cert_matches = term_overlap_score(tender.certifications, profile.certifications)
     scores["certification"] = cert_score
     if cert_matches:
         reasons.append(f"Certification match: {', '.join(cert_matches[:2])}")
 
     # 4. Capability matching from text (weight: 0.15)
-    cap_score, cap_matches = capability_match_score(
-        tender_meta.get("summary", ""),
-        tender_meta.get("title", ""),
-        profile_meta.get("capabilities", [])
-    )
+    cap_score, cap_matches = _capability_score(tender.text_hits, profile.capability_categories)
     scores["capability"] = cap_score
     if cap_matches:
         reasons.append(f"Capability match: {', '.join(cap_matches[:3])}")
 
-    # 5. Text keyword matching (weight: 0.15) - NEW
-    tender_text = f"{tender_meta.get('title', '')} {tender_meta.get('summary', '')}"
-    text_score, text_matches = text_keyword_match_score(tender_text, profile_meta)
+    # 5. Text keyword matching (weight: 0.15)
+    text_score, text_matches = _text_keyword_score(tender.text_hits, profile.domain_entries, profile.tech_entries)
     scores["text_match"] = text_score
     if text_matches:
         reasons.append(f"Text match: {', '.join(text_matches[:3])}")
 
-    # 6. Cross-domain matching (weight: 0.10) - NEW
-    cross_score, cross_matches = cross_match_domains_and_text(tender_meta, profile_meta)
+    # 6. Cross-domain matching (weight: 0.10)
+    cross_score, cross_matches = _cross_match_score(
+        tender.domain_norms, profile.tech_norms, tender.text_hits, profile.domain_terms
+    )
     scores["cross_match"] = cross_score
     if cross_matches:
         reasons.append(f"Cross match: {', '.join(cross_matches[:2])}")
 
     # 7. Government sector bonus (weight: 0.05)
     govt_score = 0.0
-    if tender_meta.get("sector") and profile_meta.get("government_experience"):
+    if tender.sector and profile.government_experience:
         govt_score = 1.0
         reasons.append("Government sector experience")
     scores["government"] = govt_score
@@ -468,19 +815,8 @@ def calculate_enhanced_match_score(
     # 8. Vector similarity (weight: 0.05)
     scores["vector"] = vector_similarity
 
-    # Calculate weighted score
-    weights = {
-        "domain": 0.20,
-        "technology": 0.20,
-        "certification": 0.10,
-        "capability": 0.15,
-        "text_match": 0.15,
-        "cross_match": 0.10,
-        "government": 0.05,
-        "vector": 0.05,
-    }
-
     # Calculate base weighted score
+    weights = MATCH_WEIGHTS
     base_score = sum(scores[k] * weights[k] for k in weights)
 
     # Dynamic boosting based on match quality
@@ -501,3 +837,257 @@ def calculate_enhanced_match_score(
         final_score = base_score
 
     return min(final_score, 1.0), reasons
+
+
+class BatchMatchResult:
+    """Scores of one document against many candidates; reasons are built only when asked for."""
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        components: Dict[str, np.ndarray],
+        tenders: List[TenderFeatures],
+        profiles: List[ProfileFeatures],
+        vector_scores: np.ndarray,
+    ) -> None:
+        self.scores = scores
+        self.components = components
+        self._tenders = tenders
+        self._profiles = profiles
+        self._vector_scores = vector_scores
+        self._reasons: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def top(self, k: int) -> List[int]:
+        """Candidate indices of the `k` best scores, best first (stable on ties)."""
+        order = np.argsort(-self.scores, kind="stable")
+        return order[:k].tolist()
+
+    def reasons(self, index: int) -> List[str]:
+        if index not in self._reasons:
+            tender = self._tenders[index] if len(self._tenders) > 1 else self._tenders[0]
+            profile = self._profiles[index] if len(self._profiles) > 1 else self._profiles[0]
+            _, reasons = calculate_enhanced_match_score(
+                {}, {}, float(self._vector_scores[index]), tender_features=tender, profile_features=profile
+            )
+            self._reasons[index] = reasons
+        return self._reasons[index]
+
+
+def score_profile_against_tenders(
+    profile: ProfileFeatures,
+    tenders: List[TenderFeatures],
+    vector_scores: Sequence[float],
+) -> BatchMatchResult:
+    """Batch form of `calculate_enhanced_match_score` for one company profile and many tenders."""
+    return _batch_match([profile], tenders, vector_scores)
+
+
+def score_tender_against_companies(
+    tender: TenderFeatures,
+    profiles: List[ProfileFeatures],
+    vector_scores: Sequence[float],
+) -> BatchMatchResult:
+    """Batch form of `calculate_enhanced_match_score` for one tender and many company profiles."""
+    return _batch_match(profiles, [tender], vector_scores)
+
+
+def _batch_match(
+    profiles: List[ProfileFeatures],
+    tenders: List[TenderFeatures],
+    vector_scores: Sequence[float],
+) -> BatchMatchResult:
+    size = max(len(profiles), len(tenders)) if profiles and tenders else 0
+    vectors = np.asarray(vector_scores, dtype=np.float64).reshape(-1)
+    if len(vectors) != size:
+        raise ValueError("vector_scores must have one entry per candidate")
+    if not size:
+        return BatchMatchResult(np.zeros(0), {}, tenders, profiles, vectors)
+
+    def pairs():
+        for i in range(size):
+            yield (
+                tenders[i] if len(tenders) > 1 else tenders[0],
+                profiles[i] if len(profiles) > 1 else profiles[0],
+            )
+
+    scores: Dict[str, np.ndarray] = {
+        "domain": _batch_term_overlap(tenders, profiles, "domains", size),
+        "technology": _batch_term_overlap(tenders, profiles, "technologies", size),
+        "certification": _batch_term_overlap(tenders, profiles, "certifications", size),
+    }
+
+    capability = np.zeros(size)
+    text_match = np.zeros(size)
+    cross_match = np.zeros(size)
+    government = np.zeros(size)
+    for i, (tender, profile) in enumerate(pairs()):
+        capability[i] = _capability_score(tender.text_hits, profile.capability_categories)[0]
+        text_match[i] = _text_keyword_score(tender.text_hits, profile.domain_entries, profile.tech_entries)[0]
+        cross_match[i] = _cross_match_score(
+            tender.domain_norms, profile.tech_norms, tender.text_hits, profile.domain_terms
+        )[0]
+        government[i] = 1.0 if tender.sector and profile.government_experience else 0.0
+    scores.update(
+        {
+            "capability": capability,
+            "text_match": text_match,
+            "cross_match": cross_match,
+            "government": government,
+            "vector": vectors,
+        }
+    )
+
+    # Same operation order as calculate_enhanced_match_score so results are bit-identical
+    base_score = np.zeros(size)
+    for key, weight in MATCH_WEIGHTS.items():
+        base_score = base_score + scores[key] * weight
+
+    strong_matches = (
+        (scores["domain"] > 0.5).astype(int)
+        + (scores["technology"] > 0.5)
+        + (scores["capability"] > 0.5)
+        + (scores["text_match"] > 0.3)
+        + (scores["cross_match"] > 0.3)
+    )
+    final_score = np.where(
+        strong_matches >= 3,
+        np.minimum(base_score * 1.5, 1.0),
+        np.where(strong_matches >= 2, np.minimum(base_score * 1.3, 1.0), base_score),
+    )
+    final_score = np.minimum(final_score, 1.0)
+    return BatchMatchResult(final_score, scores, tenders, profiles, vectors)
+
+
+def _batch_term_overlap(
+    tenders: List[TenderFeatures],
+    profiles: List[ProfileFeatures],
+    field: str,
+    size: int,
+) -> np.ndarray:
+    """Vectorized `term_overlap_score` over all candidate pairs of one field."""
+    tender_terms = [getattr(tender, field) for tender in tenders]
+    profile_terms = [getattr(profile, field) for profile in profiles]
+    fixed_is_profile = len(tender_terms) > 1 or len(profile_terms) == 1
+    if fixed_is_profile:
+        fixed, many = profile_terms[0], tender_terms
+    else:
+        fixed, many = tender_terms[0], profile_terms
+
+    counts = _fixed_side_overlap_counts(fixed, many)
+    direct_counts, word_counts = counts[:, 0], counts[:, 1]
+
+    def side(values: List[TermFeatures], attr) -> np.ndarray:
+        if len(values) == 1:
+            return np.full(size, attr(values[0]), dtype=np.int64)
+        return np.fromiter((attr(v) for v in values), dtype=np.int64, count=size)
+
+    tender_count = side(tender_terms, lambda terms: terms.count)
+    profile_count = side(profile_terms, lambda terms: terms.count)
+    tender_word_count = side(tender_terms, lambda terms: len(terms.words))
+
+    fuzzy_sum = np.zeros(size)
+    has_fuzzy = np.zeros(size, dtype=bool)
+    partners = _FuzzyPartners(fixed)
+    active = np.flatnonzero((tender_count > 0) & (profile_count > 0))
+    for i in active.tolist():
+        terms = many[i] if len(many) > 1 else many[0]
+        fuzzy_matches = partners.matches(terms, fixed_is_profile)
+        if fuzzy_matches:
+            has_fuzzy[i] = True
+            fuzzy_sum[i] = sum(fuzzy_matches)
+
+    direct_score = direct_counts / np.maximum(tender_count, 1) * 0.5
+    word_score = word_counts / np.maximum(tender_word_count, 1) * 0.3
+    fuzzy_score = np.where(has_fuzzy, fuzzy_sum / np.maximum(tender_count, 1) * 0.2, 0.0)
+
+    total_score = np.minimum(direct_score + word_score + fuzzy_score, 1.0)
+    boosted = (direct_counts >= 2) | (word_counts >= 3)
+    total_score = np.where(boosted, np.minimum(total_score * 1.5, 1.0), total_score)
+    return np.where((tender_count > 0) & (profile_count > 0), total_score, 0.0)
+
+
+def _fixed_side_overlap_counts(fixed: TermFeatures, many: List[TermFeatures]) -> np.ndarray:
+    """
+    Expanded terms and meaningful words each candidate shares with `fixed`, as two columns.
+
+    The vocabulary is local to the call and holds only the fixed side's entries (nothing
+    else can overlap). Candidates become one CSR incidence matrix over it, and a single
+    sparse product with the block indicator matrix yields both counts.
+    """
+    blocks = (
+        (fixed.expanded, lambda terms: terms.expanded),
+        (fixed.meaningful_words, lambda terms: terms.meaningful_words),
+    )
+    vocabularies: List[Dict[str, int]] = []
+    offset = 0
+    for entries, _ in blocks:
+        vocabularies.append({entry: offset + k for k, entry in enumerate(entries)})
+        offset += len(entries)
+    if not offset:
+        return np.zeros((len(many), len(blocks)), dtype=np.int64)
+
+    indices: List[int] = []
+    indptr = [0]
+    for terms in many:
+        for vocabulary, (_, values) in zip(vocabularies, blocks):
+            indices.extend(vocabulary[entry] for entry in values(terms) if entry in vocabulary)
+        indptr.append(len(indices))
+    incidence = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+        shape=(len(many), offset),
+    )
+    block_of = np.repeat(np.arange(len(blocks)), [len(vocabulary) for vocabulary in vocabularies])
+    indicator = sparse.csr_matrix(
+        (np.ones(offset, dtype=np.int64), (np.arange(offset), block_of)), shape=(offset, len(blocks))
+    )
+    return (incidence @ indicator).toarray()
+
+
+class _FuzzyPartners:
+    """
+    `_fuzzy_matches` against one fixed side, for many candidates.
+
+    The fixed terms a candidate term can fuzzy-match (shared word via the word index, or
+    containment either way) are resolved once per distinct term, so candidates without any
+    are skipped outright and the rest only filter out their direct overlap.
+    """
+
+    def __init__(self, fixed: TermFeatures) -> None:
+        self.fixed = fixed
+        self._partners: Dict[str, List[Tuple[int, float]]] = {}
+
+    def _resolve(self, term: str, norm: str, words: Set[str]) -> List[Tuple[int, float]]:
+        fixed = self.fixed
+        if term in fixed.expanded:
+            # Always part of the direct overlap
+            return []
+        positions: Set[int] = set()
+        for word in words:
+            positions.update(fixed.word_index.get(word, ()))
+        if norm:
+            positions.update(fixed.containment.find_all(norm))
+            positions.update(j for j, fixed_norm in enumerate(fixed.norms) if norm in fixed_norm)
+        partners = []
+        for j in sorted(positions):
+            score = _normalized_fuzzy_score(norm, fixed.norms[j], words, fixed.norm_words[j])
+            if score >= 0.5:
+                partners.append((j, score))
+        return partners
+
+    def matches(self, terms: TermFeatures, fixed_is_profile: bool) -> List[float]:
+        """Fuzzy scores between `terms` and the fixed side, in `_fuzzy_matches` order."""
+        found: List[Tuple[int, int, float]] = []
+        fixed_terms = self.fixed.terms
+        for i, term in enumerate(terms.terms):
+            partners = self._partners.get(term)
+            if partners is None:
+                partners = self._partners[term] = self._resolve(term, terms.norms[i], terms.norm_words[i])
+            for j, score in partners:
+                if fixed_terms[j] not in terms.expanded:
+                    found.append((i, j, score) if fixed_is_profile else (j, i, score))
+        if not fixed_is_profile:
+            found.sort()
+        return [score for _, _, score in found]
@@ -7,13 +7,22 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.config import settings
 from app.database.repositories.company_repo import CompanyRepository
-from app.database.repositories.tender_repo import TenderRepository
-from app.processors.embedder import TextEmbedder
-from app.services.matching_utils import calculate_enhanced_match_score, semantic_overlap_score
+from app.database.repositories.match_repo import MatchRepository
+from app.database.repositories.tender_repo import TenderRepository, open_end_date
+from app.processors.embedder import get_embedder
+from app.services.embedding_index import company_matrix, tender_matrix
+from app.services.match_service import MatchService
+from app.services.matching_utils import (
+    get_profile_features,
+    get_tender_features,
+    score_profile_against_tenders,
+    score_tender_against_companies,
+)
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,7 +32,8 @@ class SearchService:
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self.company_repo = CompanyRepository(db)
         self.tender_repo = TenderRepository(db)
-        self.embedder = TextEmbedder()
+        self.match_repo = MatchRepository(db)
+        self.embedder = get_embedder()
         self.db = db
 
     async def search_tenders(
@@ -37,32 +47,49 @@ class SearchService:
         if not profile:
             raise ValueError("Company profile not found")
 
-        query_embedding = self._get_query_embedding(profile, query)
+        if not query:
+            if profile.get("matches_refreshed_at"):
+                results = await self._stored_tender_matches(profile, filters, limit)
+                await self._log_search(company_id, query, filters, results)
+                return self._search_response(company_id, query, filters, results)
+            # No stored matches yet (new profile, or created before the match table):
+            # backfill in the background and score this request live
+            MatchService(self.db).schedule_company_refresh(profile)
 
-        candidate_filter = {"is_active": True, "expired": False}
+        # Ad-hoc queries are scored live
+        query_embedding = await self._get_query_embedding(profile, query)
+
+        # The end date check covers tenders the expiry sweep has not flagged yet
+        candidate_filter = {"is_active": True, "expired": False, **open_end_date()}
         if filters:
             if filters.get("domains"):
                 candidate_filter["metadata.domains"] = {"$in": filters["domains"]}
             if filters.get("required_certifications"):
                 candidate_filter["metadata.required_certifications"] = {"$in": filters["required_certifications"]}
 
-        candidates = await self.tender_repo.list(skip=0, limit=500, filters=candidate_filter)
-
-        scored: List[Tuple[Dict[str, Any], float, List[str]]] = []
-        for tender in candidates:
-            tender_embedding = tender.get("summary_embedding") or []
-            vector_score = self._cosine_similarity(query_embedding, tender_embedding)
-
-            # Use enhanced matching algorithm
-            tender_meta = tender.get("metadata") or {}
-            profile_meta = profile.get("metadata") or {}
-            final_score, reasons = calculate_enhanced_match_score(
-                tender_meta, profile_meta, vector_score
-            )
-            scored.append((tender, final_score, reasons))
-
-        scored.sort(key=lambda item: (-item[1], self._end_date_sort(item[0])))
-        top = scored[:limit]
+        # First stage: nearest tenders across the whole corpus from the shared vector index,
+        # so candidates are loaded without their embeddings and only the shortlist is reranked.
+        await tender_matrix.ensure_loaded(self.db)
+        vector_scores = dict(tender_matrix.search(query_embedding, settings.ANN_TOP_K))
+        candidates = await self._tender_candidates(candidate_filter, vector_scores)
+        if vector_scores and len(candidates) < limit and len(vector_scores) < len(tender_matrix):
+            # The shortlist is cut before the Mongo filters apply, so they can empty it;
+            # rank exactly among the tenders that pass them instead.
+            allowed = await self.tender_repo.list_ids(candidate_filter)
+            vector_scores = dict(tender_matrix.exact_search(query_embedding, settings.ANN_TOP_K, among=allowed))
+            candidates = await self._tender_candidates(candidate_filter, vector_scores)
+
+        # Score every candidate in one batch; reasons are only built for the returned results
+        batch = score_profile_against_tenders(
+            get_profile_features(profile),
+            [get_tender_features(tender) for tender in candidates],
+            [vector_scores.get(str(tender.get("_id")), 0.0) for tender in candidates],
+        )
+        order = sorted(
+            range(len(candidates)),
+            key=lambda i: (-batch.scores[i], self._end_date_sort(candidates[i])),
+        )
+        top = [(candidates[i], float(batch.scores[i]), batch.reasons(i)) for i in order[:limit]]
 
         results = []
         for tender, score, reasons in top:
@@ -76,7 +103,50 @@ class SearchService:
             )
 
         await self._log_search(company_id, query, filters, results)
-
+        return self._search_response(company_id, query, filters, results)
+
+    async def _tender_candidates(
+        self, candidate_filter: Dict[str, Any], vector_scores: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Scoring views of the shortlisted tenders that pass `candidate_filter`."""
+        filters = dict(candidate_filter)
+        candidate_limit = 500
+        if vector_scores:
+            filters["_id"] = {"$in": [self._object_id(tender_id) for tender_id in vector_scores]}
+            candidate_limit = len(vector_scores)
+        return await self.tender_repo.list(skip=0, limit=candidate_limit, filters=filters, view="scoring")
+
+    async def _stored_tender_matches(
+        self,
+        profile: Dict[str, Any],
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Ranked matches from the materialized tender_matches table."""
+        match_filters: Dict[str, Any] = {}
+        if filters:
+            if filters.get("domains"):
+                match_filters["domains"] = {"$in": filters["domains"]}
+            if filters.get("required_certifications"):
+                match_filters["required_certifications"] = {"$in": filters["required_certifications"]}
+        matches = await self.match_repo.top_for_company(profile["company_id"], limit=limit, filters=match_filters)
+        return [
+            {
+                "tender_id": match.get("tender_id"),
+                "bid_id": match.get("bid_id"),
+                "score": round(match.get("score", 0.0), 4),
+                "match_reasons": match.get("match_reasons") or [],
+            }
+            for match in matches
+        ]
+
+    def _search_response(
+        self,
+        company_id: str,
+        query: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         return {
             "company_id": company_id,
             "results": results,
@@ -91,24 +161,41 @@ class SearchService:
         if not tender:
             raise ValueError("Tender not found")
 
+        if tender.get("matches_refreshed_at"):
+            matches = await self.match_repo.top_for_tender(tender_id, limit=limit)
+            results = [
+                {
+                    "company_id": match.get("company_id"),
+                    "name": match.get("company_name"),
+                    "score": round(match.get("score", 0.0), 4),
+                    "match_reasons": match.get("match_reasons") or [],
+                }
+                for match in matches
+            ]
+            return {"tender_id": tender_id, "results": results, "total": len(results)}
+
         tender_embedding = tender.get("summary_embedding") or []
-        companies = await self.company_repo.list(skip=0, limit=500)
-
-        scored: List[Tuple[Dict[str, Any], float, List[str]]] = []
-        for company in companies:
-            company_embedding = company.get("summary_embedding") or []
-            vector_score = self._cosine_similarity(tender_embedding, company_embedding)
-
-            # Use enhanced matching algorithm
-            tender_meta = tender.get("metadata") or {}
-            company_meta = company.get("metadata") or {}
-            final_score, reasons = calculate_enhanced_match_score(
-                tender_meta, company_meta, vector_score
+        await company_matrix.ensure_loaded(self.db)
+        vector_scores = dict(company_matrix.search(tender_embedding, settings.ANN_TOP_K))
+        if len(vector_scores) < min(limit, len(company_matrix)):
+            # The probed buckets came back short of a page; rank every company exactly
+            vector_scores = dict(company_matrix.exact_search(tender_embedding, settings.ANN_TOP_K))
+        if vector_scores:
+            companies = await self.company_repo.list(
+                skip=0,
+                limit=len(vector_scores),
+                filters={"company_id": {"$in": list(vector_scores)}},
+                view="scoring",
             )
-            scored.append((company, final_score, reasons))
+        else:
+            companies = await self.company_repo.list(skip=0, limit=500, view="scoring")
 
-        scored.sort(key=lambda item: item[1], reverse=True)
-        top = scored[:limit]
+        batch = score_tender_against_companies(
+            get_tender_features(tender),
+            [get_profile_features(company) for company in companies],
+            [vector_scores.get(company.get("company_id"), 0.0) for company in companies],
+        )
+        top = [(companies[i], float(batch.scores[i]), batch.reasons(i)) for i in batch.top(limit)]
 
         results = []
         for company, score, reasons in top:
@@ -123,24 +210,17 @@ class SearchService:
 
         return {"tender_id": tender_id, "results": results, "total": len(results)}
 
-    def _get_query_embedding(self, profile: Dict[str, Any], query: Optional[str]) -> List[float]:
+    async def _get_query_embedding(self, profile: Dict[str, Any], query: Optional[str]) -> List[float]:
         if query:
-            return self.embedder.embed(query)
+            return await self.embedder.embed_async(query)
         embedding = profile.get("summary_embedding")
         if embedding:
             return embedding
         summary = (profile.get("metadata") or {}).get("summary") or ""
-        return self.embedder.embed(summary)
+        return await self.embedder.embed_async(summary)
 
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        if not a or not b:
-            return 0.0
-        vec_a = np.array(a, dtype=float)
-        vec_b = np.array(b, dtype=float)
-        denom = np.linalg.norm(vec_a) * np.linalg.norm(vec_b)
-        if denom == 0:
-            return 0.0
-        return float(np.dot(vec_a, vec_b) / denom)
+    def _object_id(self, value: str) -> Any:
+        return ObjectId(value) if ObjectId.is_valid(value) else value
 
     def _metadata_score(self, tender: Dict[str, Any], profile: Dict[str, Any]) -> Tuple[float, List[str]]:
         tender_meta = tender.get("metadata") or {}
@@ -4,26 +4,94 @@ Tender processing service.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.database.repositories.tender_repo import TenderRepository
-from app.processors.embedder import TextEmbedder
+from app.config import settings
+from app.database.pagination import keyset_page, list_total
+from app.database.repositories.tender_repo import TenderRepository, expiry_cutoff, open_end_date
+from app.processors.embedder import get_embedder
 from app.processors.llm_extractor import LLMExtractor
 from app.processors.pdf_extractor import PDFExtractor
-from app.scraper.pdf_downloader import download_with_retry
+from app.scraper.pdf_downloader import fetch_with_retry
+from app.services.embedding_index import tender_matrix
+from app.services.match_service import MatchService
+from app.utils.content_store import tender_store
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# Listing fields whose change means a known bid has to be processed again
+_FINGERPRINT_FIELDS = (
+    "ra_no",
+    "pdf_url",
+    "items",
+    "quantity",
+    "department",
+    "department_address",
+    "start_date",
+    "end_date",
+    "bid_type",
+    "bid_value_range",
+)
+
+
+def scrape_fingerprint(bid: Dict[str, Any]) -> str:
+    """Hash of the listing fields of a scraped bid, stored as `scrape_hash`."""
+    payload = json.dumps([bid.get(field) for field in _FINGERPRINT_FIELDS], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _fresh_status() -> Dict[str, Any]:
+    return {
+        "scrape_status": "completed",
+        "pdf_downloaded": False,
+        "llm_processed": False,
+        "embedding_generated": False,
+        "last_error": None,
+    }
+
+
+def _scrape_document(bid: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Tender fields written from a scraped listing bid; processing status starts over."""
+    now = now or datetime.now(timezone.utc)
+    scraped_info = {
+        "items": bid.get("items"),
+        "quantity": bid.get("quantity"),
+        "department": bid.get("department"),
+        "department_address": bid.get("department_address"),
+        "start_date": bid.get("start_date"),
+        "end_date": bid.get("end_date"),
+        "bid_type": bid.get("bid_type"),
+        "bid_value_range": bid.get("bid_value_range"),
+    }
+    return {
+        "bid_id": bid.get("bid_id"),
+        "scrape_hash": scrape_fingerprint(bid),
+        "ra_no": bid.get("ra_no"),
+        "gem_url": bid.get("gem_url"),
+        "pdf_url": bid.get("pdf_url"),
+        "scraped_info": scraped_info,
+        "status": _fresh_status(),
+        "scraped_at": now,
+        "updated_at": now,
+        "is_active": True,
+        "expired": False,
+    }
+
+
 class TenderService:
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self.repo = TenderRepository(db)
+        self.matches = MatchService(db)
         self.pdf_extractor = PDFExtractor()
-        self.embedder = TextEmbedder()
+        self.embedder = get_embedder()
         self._llm: Optional[LLMExtractor] = None
 
     def _get_llm(self) -> LLMExtractor:
@@ -32,83 +100,165 @@ class TenderService:
         return self._llm
 
     async def create_or_update_from_scrape(self, bid: Dict[str, Any]) -> str:
+        return await self.repo.upsert_by_bid_id(bid.get("bid_id"), _scrape_document(bid))
+
+    async def upsert_scraped(self, bids: List[Dict[str, Any]], changed_only: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Store one batch of scraped bids with a single bulk upsert and load the
+        stored tenders back in one query. `result["tenders"]` holds the ones that
+        still need processing, in scrape order.
+        """
+        changed_only = settings.SCRAPE_UPSERT_CHANGED_ONLY if changed_only is None else changed_only
         now = datetime.now(timezone.utc)
-        scraped_info = {
-            "items": bid.get("items"),
-            "quantity": bid.get("quantity"),
-            "department": bid.get("department"),
-            "department_address": bid.get("department_address"),
-            "start_date": bid.get("start_date"),
-            "end_date": bid.get("end_date"),
-            "bid_type": bid.get("bid_type"),
-            "bid_value_range": bid.get("bid_value_range"),
-        }
-        status = {
-            "scrape_status": "completed",
-            "pdf_downloaded": False,
-            "llm_processed": False,
-            "embedding_generated": False,
-            "last_error": None,
-        }
-        data = {
-            "bid_id": bid.get("bid_id"),
-            "ra_no": bid.get("ra_no"),
-            "gem_url": bid.get("gem_url"),
-            "pdf_url": bid.get("pdf_url"),
-            "scraped_info": scraped_info,
-            "status": status,
-            "scraped_at": now,
-            "updated_at": now,
-            "is_active": True,
-            "expired": False,
-        }
-        return await self.repo.upsert_by_bid_id(bid.get("bid_id"), data)
+        documents = [_scrape_document(bid, now) for bid in bids if bid.get("bid_id")]
+        result = await self.repo.bulk_upsert(documents, changed_only=changed_only)
+
+        stored = [doc["bid_id"] for doc in documents if doc["bid_id"] not in result["errors"]]
+        tenders = await self.repo.get_many_by_bid_ids(stored)
+        if changed_only:
+            tenders = [tender for tender in tenders if await self._needs_processing(tender)]
+        result["tenders"] = tenders
+        return result
+
+    async def _needs_processing(self, tender: Dict[str, Any]) -> bool:
+        """For tenders whose status survived a changed-only upsert: unfinished, or the listing now points at another PDF."""
+        status = tender.get("status") or {}
+        if not (status.get("llm_processed") and status.get("embedding_generated")):
+            return True
+        downloaded_from = (tender.get("pdf_http") or {}).get("url")
+        if not downloaded_from or downloaded_from == tender.get("pdf_url"):
+            return False
+        tender["status"] = _fresh_status()
+        await self.repo.set_status(tender["bid_id"], tender["status"])
+        return True
 
-    async def process_tender(self, bid_id: str) -> bool:
+    async def process_tender(self, bid_id: str, reuse_duplicates: bool = True) -> bool:
         tender = await self.repo.get_by_bid_id(bid_id)
         if not tender:
             return False
 
-        status = tender.get("status", {})
         try:
-            if not status.get("pdf_downloaded"):
-                pdf_path = await download_with_retry(tender.get("pdf_url"), filename_hint=bid_id)
-                if not pdf_path:
-                    status.update({"last_error": "PDF download failed"})
-                    await self.repo.set_status(bid_id, status)
-                    return False
-                await self.repo.update(str(tender["_id"]), {"pdf_local_path": pdf_path})
-                status["pdf_downloaded"] = True
-
-            text = self.pdf_extractor.extract_text(tender.get("pdf_local_path"))
+            if not await self.download_pdf(tender):
+                return False
+            duplicate = await self.find_processed_duplicate(tender) if reuse_duplicates else None
+            if duplicate:
+                await self.reuse_processed(tender, duplicate)
+                return True
+            text = await self.extract_text(tender)
             if not text:
-                status.update({"last_error": "PDF extraction failed"})
-                await self.repo.set_status(bid_id, status)
                 return False
-
-            metadata = self._get_llm().extract_tender(text)
-            status["llm_processed"] = True
-
-            summary = metadata.get("summary") if isinstance(metadata, dict) else None
-            summary_embedding = self.embedder.embed(summary or "")
-            status["embedding_generated"] = True
-
-            await self.repo.update(
-                str(tender["_id"]),
-                {
-                    "metadata": metadata,
-                    "summary_embedding": summary_embedding,
-                    "processed_at": datetime.now(timezone.utc),
-                    "status": status,
-                },
-            )
+            metadata = await self.extract_metadata(tender, text)
+            summary_embedding = await self.embed_summary(tender, metadata)
+            await self.save_processed(tender, metadata, summary_embedding)
             return True
         except Exception as exc:
-            status.update({"last_error": str(exc)})
-            await self.repo.set_status(bid_id, status)
+            await self.mark_failed(tender, str(exc))
             logger.info("tender.process_failed", bid_id=bid_id, error=str(exc))
             return False
 
+    # Processing steps, run back to back by process_tender or as separate
+    # stages by the scrape job's ingest pipeline
+
+    async def download_pdf(self, tender: Dict[str, Any]) -> bool:
+        status = tender.setdefault("status", {})
+        if status.get("pdf_downloaded"):
+            return True
+        pdf_url = tender.get("pdf_url")
+        # Validators from the last download let a rescrape skip an unchanged PDF
+        previous = tender.get("pdf_http") or {}
+        if previous.get("url") == pdf_url and tender.get("pdf_local_path"):
+            previous = {**previous, "path": tender["pdf_local_path"]}
+        else:
+            previous = None
+
+        result = await fetch_with_retry(pdf_url, previous=previous)
+        if not result:
+            await self.mark_failed(tender, "PDF download failed")
+            return False
+        pdf_path = result["path"]
+        if result["not_modified"]:
+            logger.info("tender.pdf_not_modified", bid_id=tender.get("bid_id"))
+        update = {
+            "pdf_local_path": pdf_path,
+            "pdf_hash": tender_store.digest_of(pdf_path),
+            "pdf_http": {
+                "url": pdf_url,
+                "etag": result.get("etag"),
+                "last_modified": result.get("last_modified"),
+                "content_length": result.get("content_length"),
+                "checked_at": datetime.now(timezone.utc),
+            },
+        }
+        await self.repo.update(str(tender["_id"]), update)
+        tender.update(update)
+        status["pdf_downloaded"] = True
+        return True
+
+    async def find_processed_duplicate(self, tender: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Another tender already processed from the same PDF, whose results can be reused.
+        Only results extracted with the current prompt and model qualify.
+        """
+        pdf_hash = tender.get("pdf_hash")
+        if not pdf_hash:
+            return None
+        return await self.repo.collection.find_one(
+            {
+                "pdf_hash": pdf_hash,
+                "_id": {"$ne": tender["_id"]},
+                "status.llm_processed": True,
+                "status.embedding_generated": True,
+                "extraction_version": self._get_llm().tender_extraction_version(),
+            },
+            {"metadata": 1, "summary_embedding": 1, "extraction_version": 1},
+        )
+
+    async def extract_text(self, tender: Dict[str, Any]) -> Optional[str]:
+        text = await tender_store.extract_text(tender.get("pdf_local_path"), self.pdf_extractor.extract_text_async)
+        if not text:
+            await self.mark_failed(tender, "PDF extraction failed")
+            return None
+        return text
+
+    async def extract_metadata(self, tender: Dict[str, Any], text: str) -> Dict[str, Any]:
+        metadata = await self._get_llm().extract_tender_async(text)
+        tender.setdefault("status", {})["llm_processed"] = True
+        tender["extraction_version"] = self._get_llm().tender_extraction_version()
+        return metadata
+
+    async def embed_summary(self, tender: Dict[str, Any], metadata: Dict[str, Any]) -> List[float]:
+        summary = metadata.get("summary") if isinstance(metadata, dict) else None
+        summary_embedding = await self.embedder.embed_async(summary or "")
+        tender.setdefault("status", {})["embedding_generated"] = True
+        return summary_embedding
+
+    async def save_processed(
+        self, tender: Dict[str, Any], metadata: Dict[str, Any], summary_embedding: List[float]
+    ) -> None:
+        update = {
+            "metadata": metadata,
+            "summary_embedding": summary_embedding,
+            "processed_at": datetime.now(timezone.utc),
+            "status": tender.get("status", {}),
+            "extraction_version": tender.get("extraction_version"),
+        }
+        await self.repo.update(str(tender["_id"]), update)
+        tender.update(update)
+        if tender.get("is_active", True) and not tender.get("expired"):
+            tender_matrix.upsert(str(tender["_id"]), summary_embedding)
+        await self.matches.refresh_tender(tender)
+
+    async def reuse_processed(self, tender: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+        tender.setdefault("status", {}).update({"llm_processed": True, "embedding_generated": True})
+        tender["extraction_version"] = duplicate.get("extraction_version")
+        await self.save_processed(tender, duplicate.get("metadata") or {}, duplicate.get("summary_embedding") or [])
+        logger.info("tender.reused_duplicate_pdf", bid_id=tender.get("bid_id"), source_id=str(duplicate["_id"]))
+
+    async def mark_failed(self, tender: Dict[str, Any], error: str) -> None:
+        status = tender.setdefault("status", {})
+        status.update({"last_error": error})
+        await self.repo.set_status(tender.get("bid_id"), status)
+
     async def list_tenders(
         self,
         skip: int = 0,
@@ -119,26 +269,29 @@ class TenderService:
         expired: Optional[bool] = None,
         sort_by: str = "created_at",
         sort_dir: str = "desc",
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
-        await self._update_expired_flags()
         filters = self._build_filters(status=status, domains=domains, search=search, expired=expired)
         sort_field = self._sort_field(sort_by)
         sort_order = -1 if sort_dir.lower() == "desc" else 1
 
-        total = await self.repo.collection.count_documents(filters)
-        cursor = (
-            self.repo.collection.find(filters)
-            .sort(sort_field, sort_order)
-            .skip(skip)
-            .limit(limit)
+        tenders, next_cursor = await keyset_page(
+            self.repo.collection,
+            filters,
+            sort_field,
+            sort_order,
+            limit,
+            cursor=cursor,
+            projection=self.repo.VIEWS["list"],
+            skip=skip,
         )
-        items = []
-        async for tender in cursor:
-            items.append(self._serialize(tender))
-        return {"items": items, "total": total, "skip": skip, "limit": limit}
+        total = await list_total(self.repo.collection, filters) if include_total else None
+        items = [self._serialize(tender) for tender in tenders]
+        return {"items": items, "total": total, "next_cursor": next_cursor, "skip": skip, "limit": limit}
 
-    async def get_tender(self, tender_id: str) -> Optional[Dict[str, Any]]:
-        tender = await self.repo.get_by_id(tender_id)
+    async def get_tender(self, tender_id: str, include_embedding: bool = False) -> Optional[Dict[str, Any]]:
+        tender = await self.repo.get_by_id(tender_id, view=None if include_embedding else "detail")
         return self._serialize(tender) if tender else None
 
     async def get_stats(self) -> Dict[str, Any]:
@@ -159,13 +312,16 @@ class TenderService:
         return tender
 
     async def process_pending_tenders(self, limit: int = 50) -> int:
-        processed = 0
-        cursor = self.repo.collection.find({"status.llm_processed": False}).limit(limit)
-        async for tender in cursor:
-            bid_id = tender.get("bid_id")
-            if bid_id and await self.process_tender(bid_id):
-                processed += 1
-        return processed
+        cursor = self.repo.collection.find({"status.llm_processed": False}, {"bid_id": 1}).limit(limit)
+        bid_ids = [tender.get("bid_id") async for tender in cursor if tender.get("bid_id")]
+        semaphore = asyncio.Semaphore(max(settings.PROCESS_CONCURRENCY, 1))
+
+        async def process(bid_id: str) -> bool:
+            async with semaphore:
+                return await self.process_tender(bid_id)
+
+        results = await asyncio.gather(*(process(bid_id) for bid_id in bid_ids))
+        return sum(1 for result in results if result)
 
     async def reprocess_tender(self, tender_id: str) -> bool:
         tender = await self.repo.get_by_id(tender_id)
@@ -174,14 +330,26 @@ class TenderService:
         status = tender.get("status", {})
         status.update({"llm_processed": False, "embedding_generated": False, "last_error": None})
         await self.repo.update(tender_id, {"status": status})
-        return await self.process_tender(tender.get("bid_id"))
+        # A reprocess asks for a fresh extraction, not another tender's copy of an old one
+        return await self.process_tender(tender.get("bid_id"), reuse_duplicates=False)
 
-    async def _update_expired_flags(self) -> None:
+    async def expire_tenders(self) -> int:
+        """
+        Flag tenders whose end date has passed and drop them from the vector index and
+        match table. Run by the scheduler; list filters compute expiry from end_date.
+        """
         now = datetime.now(timezone.utc)
-        await self.repo.collection.update_many(
-            {"scraped_info.end_date": {"$lt": now}},
-            {"$set": {"expired": True}},
+        newly_expired = self.repo.collection.find(
+            {"expired": False, "scraped_info.end_date": {"$lt": now}}, {"_id": 1}
         )
+        object_ids = [tender["_id"] async for tender in newly_expired]
+        if not object_ids:
+            return 0
+        await self.repo.collection.update_many({"_id": {"$in": object_ids}}, {"$set": {"expired": True}})
+        expired_ids = [str(object_id) for object_id in object_ids]
+        tender_matrix.remove(expired_ids)
+        await self.matches.repo.mark_expired(expired_ids)
+        return len(expired_ids)
 
     def _build_filters(
         self,
@@ -225,7 +393,8 @@ class TenderService:
             )
 
         if expired is not None:
-            filters["expired"] = expired
+            # Computed from end_date so lists are exact between expiry sweeps
+            filters.update({"scraped_info.end_date": {"$lt": expiry_cutoff()}} if expired else open_end_date())
 
         if and_filters:
             filters["$and"] = and_filters
@@ -0,0 +1,78 @@
+"""
+Aho-Corasick multi-pattern substring matcher.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class PhraseAutomaton:
+    """Find every registered phrase that occurs as a substring of a text in a single pass."""
+
+    def __init__(self, phrases: Iterable[Tuple[str, Hashable]] = ()) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[List[Hashable]] = [[]]
+        self._out: List[List[Hashable]] = [[]]
+        self._always: List[Hashable] = []
+        self._built = False
+        for phrase, value in phrases:
+            self.add(phrase, value)
+
+    def add(self, phrase: str, value: Optional[Hashable] = None) -> None:
+        """Register a phrase; `value` is reported on a hit (defaults to the phrase itself)."""
+        value = phrase if value is None else value
+        self._built = False
+        if not phrase:
+            # "" is a substring of every text
+            self._always.append(value)
+            return
+        state = 0
+        for ch in phrase:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._own[state].append(value)
+
+    def build(self) -> "PhraseAutomaton":
+        """Compute failure links. Called lazily by `find_all` after new phrases are added."""
+        self._out = [list(values) for values in self._own]
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[child] = link if link != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def find_all(self, text: str) -> Set[Hashable]:
+        """Return the values of all phrases contained in `text`."""
+        if not self._built:
+            self.build()
+        hits: Set[Hashable] = set(self._always)
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for ch in text or "":
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
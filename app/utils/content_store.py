@@ -0,0 +1,148 @@
+"""
+Content-addressed file storage.
+
+Files are stored as `<root>/<aa>/<bb>/<sha256><ext>`, hashed while they are
+streamed to disk, so identical documents (the same bid PDF on several bids, a
+re-uploaded brochure) share one file. Extracted text is kept next to the file
+as `<sha256>.txt`, which lets a duplicate skip text extraction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+import aiofiles
+
+from app.config import settings
+from app.utils.helpers import ensure_dir
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ContentStore:
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def path_for(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{ext}")
+
+    def lookup(self, digest: str, ext: str) -> Optional[str]:
+        """Path of the stored file with this digest, if there is one."""
+        path = self.path_for(digest, ext)
+        return path if os.path.exists(path) else None
+
+    def digest_of(self, path: Optional[str]) -> Optional[str]:
+        """The digest a stored path is named by, or None for files outside the store."""
+        if not path:
+            return None
+        digest = os.path.splitext(os.path.basename(path))[0]
+        if not _DIGEST_RE.match(digest):
+            return None
+        if os.path.abspath(path) != os.path.abspath(self.path_for(digest, os.path.splitext(path)[1])):
+            return None
+        return digest
+
+    def partial_path(self, key: str) -> str:
+        """Where an interrupted download identified by `key` keeps its bytes for resuming."""
+        return os.path.join(self.root, "partial", f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.part")
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        ext: str,
+        max_size: int,
+        validate: Optional[Callable[[str], bool]] = None,
+        partial_path: Optional[str] = None,
+        resume: bool = False,
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Write `chunks` to the store, hashing them on the way. Returns (digest, path),
+        or None when the stream exceeds `max_size` or fails `validate(temp_path)`.
+
+        With `partial_path` the bytes are written there and left in place if the
+        stream breaks; `resume=True` appends to what an earlier attempt wrote.
+        """
+        ensure_dir(self.root)
+        temp_path = partial_path or os.path.join(self.root, f"tmp_{uuid.uuid4().hex}{ext}")
+        digest = hashlib.sha256()
+        size = 0
+        mode = "wb"
+        if partial_path is not None:
+            ensure_dir(os.path.dirname(partial_path))
+            if resume and os.path.exists(partial_path):
+                size = await asyncio.to_thread(_hash_into, digest, partial_path)
+                mode = "ab"
+        try:
+            async with aiofiles.open(temp_path, mode) as handle:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > max_size:
+                        await handle.close()
+                        os.remove(temp_path)
+                        return None
+                    digest.update(chunk)
+                    await handle.write(chunk)
+        except BaseException:
+            if partial_path is None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if validate is not None and not validate(temp_path):
+            os.remove(temp_path)
+            return None
+
+        file_hash = digest.hexdigest()
+        final_path = self.path_for(file_hash, ext)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+        else:
+            ensure_dir(os.path.dirname(final_path))
+            os.replace(temp_path, final_path)
+        return file_hash, final_path
+
+    def remove(self, path: str) -> None:
+        """Delete a stored file and its extracted-text sidecar."""
+        for target in (path, self._text_path(path)):
+            if os.path.exists(target):
+                os.remove(target)
+
+    async def extract_text(self, path: str, extract: Callable[[str], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Text of a stored file, extracted once per digest; files outside the store are always extracted."""
+        if self.digest_of(path) is None:
+            return await extract(path)
+        text_path = self._text_path(path)
+        try:
+            async with aiofiles.open(text_path, "r", encoding="utf-8") as handle:
+                return await handle.read()
+        except FileNotFoundError:
+            pass
+        text = await extract(path)
+        if text:
+            temp_path = f"{text_path}.{uuid.uuid4().hex}.tmp"
+            async with aiofiles.open(temp_path, "w", encoding="utf-8") as handle:
+                await handle.write(text)
+            os.replace(temp_path, text_path)
+        return text
+
+    def _text_path(self, path: str) -> str:
+        return f"{os.path.splitext(path)[0]}.txt"
+
+
+def _hash_into(digest: Any, path: str) -> int:
+    size = 0
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size
+
+
+tender_store = ContentStore(settings.TENDER_PDF_DIR)
+profile_store = ContentStore(settings.PROFILE_UPLOAD_DIR)
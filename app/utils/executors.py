@@ -0,0 +1,151 @@
+"""
+Worker pools for blocking work called from async code.
+
+The thread pool takes work that releases the GIL (model inference, PyMuPDF);
+the process pool takes pure-Python parsing (python-docx, python-pptx).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[float, float, Any]:
+    """Run `fn` in the worker and report when it started and how long it ran."""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time() - started, result
+
+
+class WorkerPool:
+    """
+    Executor with a bounded backlog and queue-wait / run-time metrics.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait for a
+    worker; further callers wait in `run` before submitting, which applies backpressure.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, float] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # Forking a process that runs threads (event loop, thread pool) can deadlock the child
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop a broken executor so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_workers + self.max_queue))
+        return self._slots[1]
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` in the pool without blocking the event loop."""
+        async with self._get_slots():
+            submitted = time.time()
+            self._update(submitted=1, in_flight=1)
+            executor = self._get_executor()
+            try:
+                started, run_seconds, result = await asyncio.get_running_loop().run_in_executor(
+                    executor, _timed_call, fn, args
+                )
+            except BrokenProcessPool:
+                # A worker died (OOM kill, crash); the pool refuses all further work
+                self._discard(executor)
+                self._update(failed=1)
+                raise
+            except Exception:
+                self._update(failed=1)
+                raise
+            finally:
+                # Also when the awaiting task is cancelled
+                self._update(in_flight=-1)
+            self._record(max(started - submitted, 0.0), run_seconds)
+            return result
+
+    def _update(self, **deltas: float) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._metrics[key] += delta
+
+    def _record(self, wait_seconds: float, run_seconds: float) -> None:
+        with self._lock:
+            metrics = self._metrics
+            metrics["completed"] += 1
+            metrics["wait_seconds_total"] += wait_seconds
+            metrics["wait_seconds_max"] = max(metrics["wait_seconds_max"], wait_seconds)
+            metrics["run_seconds_total"] += run_seconds
+            metrics["run_seconds_max"] = max(metrics["run_seconds_max"], run_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        completed = metrics["completed"] or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "submitted": int(metrics["submitted"]),
+            "completed": int(metrics["completed"]),
+            "failed": int(metrics["failed"]),
+            "in_flight": int(metrics["in_flight"]),
+            "wait_ms_avg": round(metrics["wait_seconds_total"] / completed * 1000, 3),
+            "wait_ms_max": round(metrics["wait_seconds_max"] * 1000, 3),
+            "run_ms_avg": round(metrics["run_seconds_total"] / completed * 1000, 3),
+            "run_ms_max": round(metrics["run_seconds_max"] * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._discard(self._executor)
+
+
+thread_pool = WorkerPool("worker-thread", "thread", settings.EXECUTOR_THREAD_WORKERS, settings.EXECUTOR_MAX_QUEUE)
+process_pool = WorkerPool("worker-process", "process", settings.EXECUTOR_PROCESS_WORKERS, settings.EXECUTOR_MAX_QUEUE)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {"thread": thread_pool.stats(), "process": process_pool.stats()}
+
+
+def shutdown_executors() -> None:
+    thread_pool.shutdown()
+    process_pool.shutdown()
@@ -0,0 +1,30 @@
+"""
+Async rate limiter shared by concurrent callers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+
+class RateLimiter:
+    """
+    Spaces `acquire()` calls about `60 / per_minute` seconds apart across every
+    caller, with each gap drawn uniformly within +/- `jitter` of that interval.
+    """
+
+    def __init__(self, per_minute: float, jitter: float = 0.0) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            wait = self._next_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            spacing = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._next_at = time.monotonic() + spacing
@@ -4,6 +4,8 @@ import { Company, CompanyListResponse } from "@/types/company";
 export interface CompanyQueryParams {
   skip?: number;
   limit?: number;
+  cursor?: string;
+  include_total?: boolean;
   status?: string;
   search?: string;
 }
@@ -4,6 +4,8 @@ import { Job, JobListResponse } from "@/types/job";
 export interface JobQueryParams {
   skip?: number;
   limit?: number;
+  cursor?: string;
+  include_total?: boolean;
   job_type?: string;
   status?: string;
 }
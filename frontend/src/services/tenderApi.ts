@@ -4,6 +4,8 @@ import { Tender, TenderListResponse } from "@/types/tender";
 export interface TenderQueryParams {
   skip?: number;
   limit?: number;
+  cursor?: string;
+  include_total?: boolean;
   status?: string;
   domains?: string[];
   search?: string;
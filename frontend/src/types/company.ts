@@ -43,7 +43,8 @@ export interface Company {
 
 export interface CompanyListResponse {
   items: Company[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
   skip: number;
   limit: number;
 }
@@ -18,7 +18,8 @@ export interface Job {
 
 export interface JobListResponse {
   items: Job[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
   skip: number;
   limit: number;
 }
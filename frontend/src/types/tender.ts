@@ -46,7 +46,8 @@ export interface Tender {
 
 export interface TenderListResponse {
   items: Tender[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
   skip: number;
   limit: number;
 }
@@ -0,0 +1,60 @@
+"""Recall vs latency of the IVF vector index against exact search."""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.embedding_index import EmbeddingMatrix, IVFIndex
+
+
+def make_corpus(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=rows)
+    return centers[labels] + 0.6 * rng.normal(size=(rows, dim))
+
+
+def timed_search(index, queries, k):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([doc_id for doc_id, _ in index.search(query, k)])
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return results, elapsed_ms
+
+
+def run(rows: int, dim: int, queries: int, k: int, nlist: int, index_dir: str) -> None:
+    vectors = make_corpus(rows, dim, clusters=max(rows // 200, 8), seed=0)
+    ids = [str(i) for i in range(rows)]
+    query_vectors = make_corpus(queries, dim, clusters=max(rows // 200, 8), seed=1).tolist()
+
+    exact = EmbeddingMatrix("benchmark")
+    exact.set_vectors(ids, vectors)
+    truth, exact_ms = timed_search(exact, query_vectors, k)
+    print(f"rows={rows} dim={dim} k={k}")
+    print(f"exact        recall=1.000 latency={exact_ms:.2f}ms")
+
+    ivf = IVFIndex("benchmark", nlist=nlist, min_rows=0, index_dir=index_dir)
+    start = time.perf_counter()
+    ivf.set_vectors(ids, vectors)
+    print(f"ivf build {time.perf_counter() - start:.1f}s nlist={len(ivf._centroids)}")
+
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        ivf.nprobe = nprobe
+        found, ivf_ms = timed_search(ivf, query_vectors, k)
+        recall = np.mean([len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(found, truth)])
+        print(f"ivf nprobe={nprobe:<3} recall={recall:.3f} latency={ivf_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=500)
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--index-dir", default="data/ann/benchmark")
+    args = parser.parse_args()
+
+    run(args.rows, args.dim, args.queries, args.k, args.nlist, args.index_dir)
@@ -0,0 +1,55 @@
+"""Fuzzy term pass: the word/containment index against the full cross product, on identical TermFeatures."""
+
+import argparse
+import time
+
+from app.services.matching_utils import DOMAIN_SYNONYMS, TECH_SYNONYMS, TermFeatures, _fuzzy_matches, fuzzy_match_score
+
+
+def cross_product_fuzzy_matches(tender_terms, profile_terms, direct_overlap):
+    """The fuzzy pass before the index: every tender term against every profile term."""
+    matches = []
+    for t_term in tender_terms.terms:
+        for p_term in profile_terms.terms:
+            if t_term not in direct_overlap and p_term not in direct_overlap:
+                score = fuzzy_match_score(t_term, p_term)
+                if score >= 0.5:
+                    matches.append((t_term, p_term, score))
+    return matches
+
+
+def make_corpus(step: int):
+    corpus = []
+    for table in (DOMAIN_SYNONYMS, TECH_SYNONYMS):
+        for key, synonyms in list(table.items())[::step]:
+            corpus.append([key, f"{key} installation", *sorted(synonyms)[:2]])
+    return [TermFeatures(values) for values in corpus]
+
+
+def timed_pass(fuzzy_matches, pairs, rounds):
+    results = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [fuzzy_matches(t, p, t.expanded & p.expanded) for t, p in pairs]
+    return results, (time.perf_counter() - start) * 1e6 / (rounds * len(pairs))
+
+
+def run(step: int, rounds: int) -> None:
+    features = make_corpus(step)
+    pairs = [(t, p) for t in features for p in features]
+    print(f"term lists={len(features)} pairs={len(pairs)} rounds={rounds}")
+
+    reference, cross_us = timed_pass(cross_product_fuzzy_matches, pairs, rounds)
+    print(f"cross product {cross_us:.1f}us/pair")
+    found, indexed_us = timed_pass(_fuzzy_matches, pairs, rounds)
+    same = [sorted(matches) for matches in found] == [sorted(matches) for matches in reference]
+    print(f"indexed       {indexed_us:.1f}us/pair speedup={cross_us / indexed_us:.1f}x parity={'ok' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--step", type=int, default=1, help="Use every n-th synonym table entry")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.step, args.rounds)
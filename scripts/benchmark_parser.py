@@ -0,0 +1,51 @@
+"""Listing card parsing time of the lxml parser against the BeautifulSoup reference parser."""
+
+import argparse
+import glob
+import os
+import time
+
+from app.scraper.parser import parse_bid_cards_bs4, parse_bid_cards_lxml
+
+PARSERS = (("bs4", parse_bid_cards_bs4), ("lxml", parse_bid_cards_lxml))
+
+
+def timed_parse(parse, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse(html)
+    return (time.perf_counter() - start) * 1000 / (rounds * len(pages))
+
+
+def run(fixture_dir: str, rounds: int) -> None:
+    paths = sorted(glob.glob(os.path.join(fixture_dir, "listing_page*.html")))
+    if not paths:
+        raise SystemExit(f"No listing_page*.html fixtures in {fixture_dir}")
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            pages.append(handle.read())
+
+    reference = [parse_bid_cards_bs4(html) for html in pages]
+    cards = sum(len(bids) for bids in reference)
+    print(f"pages={len(pages)} cards={cards} rounds={rounds}")
+
+    baseline_ms = None
+    for name, parse in PARSERS:
+        same = [parse(html) for html in pages] == reference
+        page_ms = timed_parse(parse, pages, rounds)
+        baseline_ms = baseline_ms or page_ms
+        print(
+            f"{name:<5} {page_ms:.2f}ms/page {page_ms * len(pages) / cards:.3f}ms/card "
+            f"speedup={baseline_ms / page_ms:.1f}x parity={'ok' if same else 'MISMATCH'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default="tests/fixtures/gem")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    run(args.fixtures, args.rounds)
@@ -0,0 +1,46 @@
+"""Record GeM listing responses as offline fixtures for the scraper and parser tests."""
+
+import argparse
+import asyncio
+import os
+
+from app.scraper.gem_http_scraper import GemHttpScraper
+from app.scraper.gem_scraper import GemScraper
+
+
+async def run(pages: int, out_dir: str) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    async with GemHttpScraper() as scraper:
+        with open(os.path.join(out_dir, "all_bids.html"), "w", encoding="utf-8") as handle:
+            handle.write(await scraper.listing_html())
+        for page in range(1, pages + 1):
+            body = await scraper.fetch_raw_page(page)
+            with open(os.path.join(out_dir, f"all_bids_data_page{page}.json"), "w", encoding="utf-8") as handle:
+                handle.write(body)
+            print(f"Recorded page {page} ({len(body)} bytes)")
+
+
+async def record_rendered(pages: int, out_dir: str) -> None:
+    """Rendered listing pages (the HTML the card parsers see), via the browser backend."""
+    os.makedirs(out_dir, exist_ok=True)
+    async with GemScraper() as scraper:
+        await scraper._open_listing(scraper.page)
+        for page in range(1, pages + 1):
+            if page > 1 and await scraper._jump_to_page(scraper.page, page - 1, page) != page:
+                break
+            html = await scraper.page.content()
+            with open(os.path.join(out_dir, f"listing_page{page}.html"), "w", encoding="utf-8") as handle:
+                handle.write(html)
+            print(f"Recorded listing page {page} ({len(html)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--rendered-pages", type=int, default=0)
+    parser.add_argument("--out", default="tests/fixtures/gem")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.pages, args.out))
+    if args.rendered_pages:
+        asyncio.run(record_rendered(args.rendered_pages, args.out))
@@ -4,12 +4,12 @@ import argparse
 import asyncio
 
 from app.database.mongodb import get_database
-from app.scraper.gem_scraper import GemScraper
+from app.scraper.gem_http_scraper import create_scraper
 from app.services.tender_service import TenderService
 
 
 async def run(max_pages: int, max_bids: int, test: bool) -> None:
-    async with GemScraper() as scraper:
+    async with create_scraper() as scraper:
         bids = await scraper.scrape_bids(max_pages=max_pages, max_bids=max_bids)
         if test:
             print(f"Scraped {len(bids)} bids")
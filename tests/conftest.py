@@ -35,3 +35,149 @@ async def clean_db(test_db):
     for coll in collections:
         await test_db[coll].delete_many({})
     return test_db
+
+
+# In-memory stand-ins for the Motor collections the services use
+
+
+class MemoryCursor:
+    def __init__(self, items):
+        self.items = list(items)
+
+    def sort(self, key, direction=None):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self.items.sort(key=lambda item: (item.get(field) is not None, item.get(field) or 0), reverse=order == -1)
+        return self
+
+    def skip(self, count):
+        self.items = self.items[count:]
+        return self
+
+    def limit(self, count):
+        self.items = self.items[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.items[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.items)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    def __init__(self, items=(), name="memory"):
+        self.name = name
+        self.items = [dict(item) for item in items]
+        self.counts = 0
+
+    def _matches(self, item, query):
+        for key, expected in (query or {}).items():
+            if key == "$or":
+                if not any(self._matches(item, clause) for clause in expected):
+                    return False
+                continue
+            if key == "$and":
+                if not all(self._matches(item, clause) for clause in expected):
+                    return False
+                continue
+            value = item
+            for part in key.split("."):
+                value = (value or {}).get(part)
+            if isinstance(expected, dict) and "$in" in expected:
+                values = value if isinstance(value, list) else [value]
+                if not set(values) & set(expected["$in"]):
+                    return False
+            elif isinstance(expected, dict) and "$not" in expected:
+                if self._matches(item, {key: expected["$not"]}):
+                    return False
+            elif isinstance(expected, dict) and any(op in expected for op in ("$lt", "$gt", "$ne")):
+                if "$ne" in expected and value == expected["$ne"]:
+                    return False
+                if "$lt" in expected and (value is None or not value < expected["$lt"]):
+                    return False
+                if "$gt" in expected and (value is None or not value > expected["$gt"]):
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(item for item in self.items if self._matches(item, query))
+
+    async def find_one(self, query=None, projection=None):
+        return next((item for item in self.items if self._matches(item, query)), None)
+
+    async def count_documents(self, query):
+        self.counts += 1
+        return sum(1 for item in self.items if self._matches(item, query))
+
+    async def estimated_document_count(self):
+        return len(self.items)
+
+    async def insert_one(self, doc):
+        self.items.append(dict(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self.items.extend(dict(doc) for doc in docs)
+
+    async def delete_many(self, query):
+        before = len(self.items)
+        self.items = [item for item in self.items if not self._matches(item, query)]
+        return type("Result", (), {"deleted_count": before - len(self.items)})()
+
+    async def update_many(self, query, update):
+        for item in self.items:
+            if self._matches(item, query):
+                item.update(update.get("$set", {}))
+
+    async def update_one(self, query, update):
+        for item in self.items:
+            if self._matches(item, query):
+                item.update(update.get("$set", {}))
+                return type("Result", (), {"modified_count": 1})()
+        return type("Result", (), {"modified_count": 0})()
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted_ids = {}
+        for index, operation in enumerate(operations):
+            query, update = operation._filter, operation._doc
+            item = next((item for item in self.items if self._matches(item, query)), None)
+            if item is None:
+                item = {**query, "_id": f"id{len(self.items)}", **update.get("$setOnInsert", {})}
+                self.items.append(item)
+                upserted_ids[index] = item["_id"]
+            for key, value in update.get("$set", {}).items():
+                target = item
+                *parents, field = key.split(".")
+                for part in parents:
+                    target = target.setdefault(part, {})
+                target[field] = value
+        return type("Result", (), {"upserted_ids": upserted_ids})()
+
+
+class MemoryDB:
+    def __init__(self, **collections):
+        self.collections = {name: MemoryCollection(items) for name, items in collections.items()}
+
+    def get_collection(self, name):
+        return self.collections.setdefault(name, MemoryCollection())
+
+
+@pytest.fixture
+def memory_collection():
+    """Factory for an in-memory collection holding the given documents."""
+    return MemoryCollection
+
+
+@pytest.fixture
+def memory_db():
+    """Factory for an in-memory database: memory_db(tenders=[...], company_profiles=[...])."""
+    return MemoryDB
@@ -51,6 +51,9 @@ class FakeCollection:
     async def count_documents(self, _):
         return len(self.items)
 
+    async def estimated_document_count(self):
+        return len(self.items)
+
     async def update_many(self, *_args, **_kwargs):
         return None
 
@@ -135,3 +138,11 @@ def test_jobs_list():
     data = response.json()
     assert isinstance(data, dict)
     assert data["items"][0]["job_id"] == "job-1"
+
+
+def test_runtime_metrics():
+    response = client.get("/api/v1/dashboard/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["executors"]) == {"thread", "process"}
+    assert "hits" in data["embedding_cache"]
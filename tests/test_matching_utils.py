@@ -0,0 +1,212 @@
+"""
+Matching utility tests.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import matching_utils
+from app.services.matching_utils import (
+    DOMAIN_SYNONYMS,
+    TECH_SYNONYMS,
+    ProfileFeatures,
+    TenderFeatures,
+    TermFeatures,
+    calculate_enhanced_match_score,
+    expand_with_synonyms,
+    extract_keywords_from_text,
+    get_profile_features,
+    normalize_text,
+    scan_phrases,
+    score_profile_against_tenders,
+    score_tender_against_companies,
+    semantic_overlap_score,
+    term_overlap_score,
+)
+from tests import legacy_matching_utils as legacy
+
+
+@pytest.fixture(autouse=True)
+def shared_synonym_tables(monkeypatch):
+    # The synonym values are set literals whose iteration order is fixed when each module
+    # is compiled; sharing one copy keeps the order of reported match terms comparable.
+    monkeypatch.setattr(legacy, "DOMAIN_SYNONYMS", DOMAIN_SYNONYMS)
+    monkeypatch.setattr(legacy, "TECH_SYNONYMS", TECH_SYNONYMS)
+
+
+SYNONYM_FIXTURE_TERMS = [
+    "Audio-Visual Systems",
+    "AMC for LED Video Walls",
+    "Annual Maintenance Contract of Projectors",
+    "Supply of LCD Projector / Screen",
+    "War Memorial & Heritage Museum upkeep",
+    "Interactive Panels",
+    "Government Infrastructure",
+    "IT Services",
+    "ISO 27001",
+    "",
+    "   ",
+    "Digital Signage and LED Display",
+]
+
+TENDER_FIXTURES = [
+    {
+        "title": "AMC of Audio Visual System at National War Memorial",
+        "summary": "Annual maintenance contract for LED video walls, projectors and audio-visual equipment at the memorial museum.",
+        "sector": "government",
+        "domains": ["Audio Visual", "Museum Maintenance", "National Memorials"],
+        "required_technologies": ["LED Walls", "Projector", "Audio Visual System"],
+        "required_certifications": ["ISO 9001"],
+    },
+    {
+        "title": "Supply of Desktop Computers",
+        "summary": "Procurement of desktop computers and printers for district offices.",
+        "sector": "government",
+        "domains": ["IT Hardware", "Computers"],
+        "required_technologies": ["Desktop", "Printer"],
+        "required_certifications": ["BIS", "ISO 9001"],
+    },
+    {
+        "title": "Digital signage and interactive panels for heritage site",
+        "summary": "Installation of digital signage, interactive displays and content production for a cultural heritage museum.",
+        "domains": ["Digital Signage", "Heritage", "Content Production"],
+        "required_technologies": ["Interactive Panels", "Video Wall"],
+        "required_certifications": [],
+    },
+    {
+        "title": None,
+        "summary": None,
+        "domains": [],
+        "required_technologies": [],
+        "required_certifications": [],
+    },
+    {
+        "title": "Cloud hosting and software services",
+        "summary": "Managed cloud infrastructure, software development and IT services.",
+        "sector": "",
+        "domains": ["IT Services", "Cloud Infrastructure", "Software Development"],
+        "required_technologies": ["Java", "Python", "Kubernetes"],
+        "required_certifications": ["ISO 27001", "CMMI Level 3"],
+    },
+]
+
+PROFILE_FIXTURES = [
+    {
+        "domains": ["Audio Visual", "Museums", "Memorials", "Archaeology"],
+        "technologies": ["LED Wall", "Projection System", "Audio-Visual Systems", "Interactive Panels"],
+        "certifications": ["ISO 9001:2015"],
+        "capabilities": ["AV maintenance", "LED wall installation", "Projector servicing", "Content production"],
+        "government_experience": True,
+    },
+    {
+        "domains": ["IT Services", "Software"],
+        "technologies": ["Java", "Python", "Cloud Infrastructure"],
+        "certifications": ["ISO 27001", "ISO 9001"],
+        "capabilities": ["Software development", "Annual maintenance contracts"],
+        "government_experience": False,
+    },
+    {
+        "domains": [],
+        "technologies": [],
+        "certifications": [],
+        "capabilities": [],
+    },
+]
+
+
+class TestSynonymIndex:
+    def test_expansion_parity(self):
+        terms = list(SYNONYM_FIXTURE_TERMS)
+        for table in (DOMAIN_SYNONYMS, TECH_SYNONYMS):
+            for key, synonyms in table.items():
+                terms.append(key)
+                terms.extend(synonyms)
+                terms.append(f"supply of {key} and services")
+
+        for term in terms:
+            assert expand_with_synonyms([term]) == legacy.expand_with_synonyms([term]), term
+        assert expand_with_synonyms(terms) == legacy.expand_with_synonyms(terms)
+
+
+class TestPhraseScanner:
+    def test_phrase_hits_match_substring_checks(self):
+        texts = [normalize_text(f"{meta.get('title') or ''} {meta.get('summary') or ''}") for meta in TENDER_FIXTURES]
+        texts.append(normalize_text(" ".join(SYNONYM_FIXTURE_TERMS)))
+        scanner = matching_utils._phrase_scanner
+        for text in texts:
+            hits = scan_phrases(text)
+            assert hits.hits == {phrase for phrase in scanner.phrases if phrase in text}
+            assert ("not a dictionary phrase" in hits) == ("not a dictionary phrase" in text)
+            assert extract_keywords_from_text(text) == legacy.extract_keywords_from_text(text)
+
+
+class TestFuzzyOverlap:
+    def test_indexed_fuzzy_pass_matches_legacy(self):
+        corpus = [list(SYNONYM_FIXTURE_TERMS)]
+        for table in (DOMAIN_SYNONYMS, TECH_SYNONYMS):
+            for key, synonyms in list(table.items())[::4]:
+                corpus.append([key, f"{key} installation", *list(synonyms)[:2]])
+        for meta in TENDER_FIXTURES + PROFILE_FIXTURES:
+            for field in ("domains", "required_technologies", "technologies", "certifications"):
+                if meta.get(field):
+                    corpus.append(meta[field])
+
+        pairs = [(a, b) for a in corpus for b in corpus]
+        for a, b in pairs:
+            assert semantic_overlap_score(a, b) == legacy.semantic_overlap_score(a, b), (a, b)
+
+        tender_features = [TermFeatures(values) for values in corpus]
+        profile_features = [TermFeatures(values) for values in corpus]
+        feature_pairs = [(t, p) for t in tender_features for p in profile_features]
+        legacy_scores = [legacy.semantic_overlap_score(a, b) for a, b in pairs]
+        assert [term_overlap_score(t, p) for t, p in feature_pairs] == legacy_scores
+        # Timing lives in scripts/benchmark_fuzzy.py
+
+
+class TestMatchFeatures:
+    def test_precompiled_features_match_legacy_scores(self):
+        for tender_meta in TENDER_FIXTURES:
+            tender_features = TenderFeatures(tender_meta)
+            for profile_meta in PROFILE_FIXTURES:
+                expected = legacy.calculate_enhanced_match_score(tender_meta, profile_meta, 0.42)
+                assert calculate_enhanced_match_score(tender_meta, profile_meta, 0.42) == expected
+                assert calculate_enhanced_match_score(
+                    tender_meta,
+                    profile_meta,
+                    0.42,
+                    tender_features=tender_features,
+                    profile_features=ProfileFeatures(profile_meta),
+                ) == expected
+
+    def test_feature_cache_keys_on_updated_at(self):
+        matching_utils.profile_features_cache.clear()
+        first = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        profile = {"company_id": "c1", "updated_at": first, "metadata": PROFILE_FIXTURES[0]}
+
+        features = get_profile_features(profile)
+        assert get_profile_features(dict(profile)) is features
+
+        changed = dict(profile, updated_at=datetime(2026, 1, 2, tzinfo=timezone.utc), metadata=PROFILE_FIXTURES[1])
+        assert get_profile_features(changed) is not features
+        assert "java" in get_profile_features(changed).technologies.expanded
+
+
+class TestBatchScoring:
+    def test_batch_scores_match_pairwise_scores(self):
+        tenders = [TenderFeatures(meta) for meta in TENDER_FIXTURES]
+        profiles = [ProfileFeatures(meta) for meta in PROFILE_FIXTURES]
+        vectors = [0.1 * i for i in range(len(TENDER_FIXTURES))]
+
+        for profile_meta, profile in zip(PROFILE_FIXTURES, profiles):
+            result = score_profile_against_tenders(profile, tenders, vectors)
+            for i, tender_meta in enumerate(TENDER_FIXTURES):
+                expected = calculate_enhanced_match_score(tender_meta, profile_meta, vectors[i])
+                assert result.scores[i] == expected[0]
+                assert result.reasons(i) == expected[1]
+            assert result.top(2) == sorted(range(len(tenders)), key=lambda i: -result.scores[i])[:2]
+
+        tender_meta = TENDER_FIXTURES[0]
+        result = score_tender_against_companies(tenders[0], profiles, [0.3] * len(profiles))
+        for i, profile_meta in enumerate(PROFILE_FIXTURES):
+            assert result.scores[i] == calculate_enhanced_match_score(tender_meta, profile_meta, 0.3)[0]
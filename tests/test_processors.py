@@ -71,3 +71,312 @@ class TestEmbedder:
 
         assert len(embeddings) == 3
         assert all(len(e) == 384 for e in embeddings)
+
+    def test_cache_and_micro_batching(self, monkeypatch):
+        import asyncio
+
+        from app.processors import embedder as embedder_module
+
+        class CountingModel(DummyModel):
+            def __init__(self):
+                self.calls = []
+
+            def encode(self, texts, normalize_embeddings=True):
+                self.calls.append(texts)
+                return super().encode(texts, normalize_embeddings)
+
+        model = CountingModel()
+        embedder = TextEmbedder(model_name="counting-model")
+        monkeypatch.setattr(embedder, "_load_model", lambda: model)
+        monkeypatch.setattr(embedder_module, "embedding_cache", embedder_module.EmbeddingCache(100))
+
+        async def run():
+            return await asyncio.gather(*(embedder.embed_async(f"query {i % 3}") for i in range(9)))
+
+        results = asyncio.run(run())
+        assert len(results) == 9 and all(len(e) == 384 for e in results)
+        assert model.calls == [["query 0", "query 1", "query 2"]]
+
+        # Repeated queries are served from the cache without touching the model
+        assert embedder.embed("query 1") == results[1]
+        assert asyncio.run(embedder.embed_async("query 2")) == results[2]
+        assert len(model.calls) == 1
+        assert embedder_module.get_embedder() is embedder_module.get_embedder()
+
+
+class TestLLMExtractor:
+    def test_async_extraction_caps_in_flight_requests(self, monkeypatch):
+        import asyncio
+        import json
+
+        import httpx
+
+        from app.processors import llm_extractor
+        from app.processors.llm_extractor import LLMExtractor
+
+        monkeypatch.setattr(llm_extractor.settings, "LLM_PROVIDER", "ollama")
+        monkeypatch.setattr(llm_extractor, "get_extraction_cache", lambda: None)
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return httpx.Response(200, json={"response": json.dumps({"title": "Tender"})})
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            monkeypatch.setattr(
+                llm_extractor, "_async_state", (asyncio.get_running_loop(), client, asyncio.Semaphore(2))
+            )
+            extractor = LLMExtractor()
+            results = await asyncio.gather(*(extractor.extract_tender_async(f"doc {i}") for i in range(6)))
+            await llm_extractor.close_async_client()
+            return results
+
+        results = asyncio.run(run())
+        assert results == [{"title": "Tender"}] * 6
+        assert in_flight["max"] == 2
+
+    def test_chunks_are_extracted_in_parallel_and_merged_by_schema(self, monkeypatch):
+        import json
+        import threading
+        import time
+
+        from app.processors import llm_extractor
+        from app.processors.llm_extractor import LLMExtractor
+
+        for name, value in {
+            "LLM_PROVIDER": "ollama",
+            "LLM_INPUT_MAX_CHARS": 100,
+            "LLM_CHUNK_SIZE": 60,
+            "LLM_CHUNK_OVERLAP": 10,
+            "LLM_CHUNK_CONCURRENCY": 4,
+            "LLM_CHUNK_MERGE": "schema",
+        }.items():
+            monkeypatch.setattr(llm_extractor.settings, name, value)
+        monkeypatch.setattr(llm_extractor, "get_extraction_cache", lambda: None)
+
+        lock = threading.Lock()
+        in_flight = {"now": 0, "max": 0}
+        prompts = []
+
+        def generate(prompt):
+            with lock:
+                prompts.append(prompt)
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.02)
+            with lock:
+                in_flight["now"] -= 1
+            part = len(prompts)
+            return json.dumps(
+                {
+                    "title": "Supply of projectors" if "Part one" in prompt else None,
+                    "domains": ["Audio Visual", "audio visual", f"Domain {part % 2}"],
+                    "required_experience_years": part,
+                    "eligibility_criteria": {"min_turnover": "1 Cr"} if "Part one" in prompt else {"min_experience_years": 3},
+                    "summary": "x" * part,
+                }
+            )
+
+        extractor = LLMExtractor()
+        monkeypatch.setattr(extractor, "_generate", generate)
+        text = "Part one. " + " ".join(f"sentence {i}." for i in range(40))
+        result = extractor.extract_tender(text)
+
+        chunks = len(prompts)
+        assert chunks > 2
+        assert in_flight["max"] > 1
+        assert result["title"] == "Supply of projectors"
+        assert result["domains"][0] == "Audio Visual"
+        assert "audio visual" not in result["domains"]
+        assert result["required_experience_years"] == chunks
+        assert result["eligibility_criteria"] == {"min_turnover": "1 Cr", "min_experience_years": 3}
+        assert result["summary"] == "x" * chunks
+
+    def test_extraction_cache_reuses_unchanged_chunks(self, monkeypatch, tmp_path):
+        import json
+
+        from app.processors import llm_extractor
+        from app.processors.extraction_cache import DiskExtractionCache
+        from app.processors.llm_extractor import LLMExtractor
+
+        for name, value in {
+            "LLM_PROVIDER": "ollama",
+            "LLM_INPUT_MAX_CHARS": 100,
+            "LLM_CHUNK_SIZE": 60,
+            "LLM_CHUNK_OVERLAP": 10,
+        }.items():
+            monkeypatch.setattr(llm_extractor.settings, name, value)
+        cache = DiskExtractionCache(str(tmp_path), max_entries=100, max_age_days=1)
+        monkeypatch.setattr(llm_extractor, "get_extraction_cache", lambda: cache)
+
+        calls = []
+
+        def generate(prompt):
+            calls.append(prompt)
+            return json.dumps({"domains": [f"Domain {len(calls)}"]})
+
+        extractor = LLMExtractor()
+        monkeypatch.setattr(extractor, "_generate", generate)
+        text = " ".join(f"sentence {i}." for i in range(40))
+
+        first = extractor.extract_tender(text)
+        chunk_calls = len(calls)
+        assert extractor.extract_tender(text) == first
+        assert len(calls) == chunk_calls
+        assert cache.stats()["hits"] == chunk_calls
+
+        # Only the changed trailing chunk goes back to the LLM
+        extractor.extract_tender(text + " one more sentence.")
+        assert 0 < len(calls) - chunk_calls < chunk_calls
+
+        cache.max_entries = 1
+        assert cache.evict() > 0
+        assert len(list(tmp_path.glob("*/*.json"))) == 1
+
+    def test_mongo_cache_serves_the_event_loop_through_motor(self, monkeypatch):
+        import asyncio
+
+        from app.processors import extraction_cache
+
+        class FakeCollection:
+            def __init__(self):
+                self.docs = {}
+
+            async def find_one_and_update(self, query, update, projection=None):
+                doc = self.docs.get(query["_id"])
+                if doc is None or doc["last_used_at"] < query["last_used_at"]["$gte"]:
+                    return None
+                doc.update(update["$set"])
+                return doc
+
+            async def replace_one(self, query, doc, upsert=False):
+                self.docs[query["_id"]] = doc
+
+        class FakeDB:
+            def __init__(self):
+                self.collection = FakeCollection()
+
+            def get_collection(self, name):
+                assert name == "llm_cache"
+                return self.collection
+
+        db = FakeDB()
+        monkeypatch.setattr(extraction_cache, "get_database", lambda: db)
+        cache = extraction_cache.MongoExtractionCache(max_entries=10, max_age_days=1)
+
+        async def run():
+            assert await cache.get_async("key") is None
+            await cache.set_async("key", {"domains": ["AV"]})
+            return await cache.get_async("key")
+
+        assert asyncio.run(run()) == {"domains": ["AV"]}
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        # No blocking pymongo client was opened
+        assert cache._sync_collection is None
+
+    def test_cache_ttl_index_follows_max_age_setting(self):
+        import asyncio
+
+        from app.database.mongodb import ensure_ttl_index
+        from app.processors.extraction_cache import ExtractionCache
+
+        with pytest.raises(TypeError):
+            ExtractionCache(10, 1)
+
+        class FakeCollection:
+            def __init__(self):
+                self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+            async def index_information(self):
+                return self.indexes
+
+            async def create_index(self, keys, expireAfterSeconds):
+                self.indexes["last_used_at_1"] = {"key": keys, "expireAfterSeconds": expireAfterSeconds}
+
+        class FakeDB:
+            def __init__(self):
+                self.collection = FakeCollection()
+                self.commands = []
+
+            def get_collection(self, name):
+                return self.collection
+
+            async def command(self, name, collection, index):
+                self.commands.append((name, collection, index))
+                self.collection.indexes["last_used_at_1"]["expireAfterSeconds"] = index["expireAfterSeconds"]
+
+        db = FakeDB()
+        asyncio.run(ensure_ttl_index(db, "llm_cache", "last_used_at", 86400))
+        asyncio.run(ensure_ttl_index(db, "llm_cache", "last_used_at", 86400))
+        assert db.commands == []
+        asyncio.run(ensure_ttl_index(db, "llm_cache", "last_used_at", 7 * 86400))
+        assert db.commands == [
+            ("collMod", "llm_cache", {"keyPattern": {"last_used_at": 1}, "expireAfterSeconds": 7 * 86400})
+        ]
+        assert db.collection.indexes["last_used_at_1"]["expireAfterSeconds"] == 7 * 86400
+
+
+class TestWorkerPool:
+    def test_runs_off_loop_and_records_metrics(self, tmp_path):
+        import asyncio
+
+        from app.processors.document_extractor import DocumentExtractor
+        from app.utils.executors import WorkerPool
+
+        pool = WorkerPool("test", "thread", max_workers=2, max_queue=1)
+
+        async def run():
+            return await asyncio.gather(*(pool.run(sum, [i, i]) for i in range(6)))
+
+        assert asyncio.run(run()) == [0, 2, 4, 6, 8, 10]
+        stats = pool.stats()
+        assert stats["completed"] == 6 and stats["in_flight"] == 0
+        assert stats["run_ms_max"] >= 0
+        pool.shutdown()
+
+        pdf_path = tmp_path / "sample.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Pooled PDF")
+        doc.save(pdf_path)
+        doc.close()
+        assert "Pooled PDF" in asyncio.run(DocumentExtractor().extract_text_async(str(pdf_path)))
+        assert "Pooled PDF" in asyncio.run(PDFExtractor().extract_text_async(str(pdf_path)))
+
+    def test_cancelled_calls_and_broken_process_pools_are_recovered(self):
+        import asyncio
+        import os
+        import time
+        from concurrent.futures.process import BrokenProcessPool
+
+        from app.utils.executors import WorkerPool
+
+        threads = WorkerPool("test", "thread", max_workers=1, max_queue=0)
+
+        async def cancel():
+            task = asyncio.ensure_future(threads.run(time.sleep, 0.2))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+        assert threads.stats()["in_flight"] == 0
+        threads.shutdown()
+
+        processes = WorkerPool("test", "process", max_workers=1, max_queue=0)
+
+        async def crash_then_run():
+            with pytest.raises(BrokenProcessPool):
+                await processes.run(os._exit, 1)
+            return await processes.run(sum, [1, 2])
+
+        try:
+            assert asyncio.run(crash_then_run()) == 3
+        finally:
+            processes.shutdown()
+        stats = processes.stats()
+        assert stats["failed"] == 1 and stats["completed"] == 1 and stats["in_flight"] == 0
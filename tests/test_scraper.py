@@ -2,11 +2,66 @@
 Scraper tests.
 """
 
+import json
+import os
+from contextlib import asynccontextmanager
+
 import pytest
 
 from app.scraper.parser import parse_bid_cards
 from app.scraper.pdf_downloader import PDFDownloader
 
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "gem")
+
+
+@asynccontextmanager
+async def replay_gem(fixture_dir=FIXTURE_DIR, expire_token_on_page=None):
+    """
+    Serve recorded GeM responses (see scripts/record_gem_fixtures.py) on localhost.
+    Data requests must carry the session cookie and the CSRF token from the listing page.
+    """
+    from aiohttp import web
+
+    with open(os.path.join(fixture_dir, "all_bids.html"), encoding="utf-8") as handle:
+        listing = handle.read()
+    token = listing.split('name="csrf_bd_gem_nk" value="')[1].split('"')[0]
+    log = {"listing": 0, "data": [], "sort": set()}
+
+    async def all_bids(request):
+        log["listing"] += 1
+        response = web.Response(text=listing, content_type="text/html")
+        response.set_cookie("csrf_gem_cookie", token)
+        return response
+
+    async def all_bids_data(request):
+        form = await request.post()
+        payload = json.loads(form["payload"])
+        page = payload["page"]
+        log["data"].append(page)
+        log["sort"].add(payload["filter"]["sort"])
+        if form.get("csrf_bd_gem_nk") != token or request.cookies.get("csrf_gem_cookie") != token:
+            return web.Response(status=403)
+        if page == expire_token_on_page and log["data"].count(page) == 1:
+            return web.Response(status=419)
+        path = os.path.join(fixture_dir, f"all_bids_data_page{page}.json")
+        if not os.path.exists(path):
+            return web.json_response({"status": 1, "response": {"response": {"docs": []}}})
+        with open(path, encoding="utf-8") as handle:
+            return web.Response(text=handle.read(), content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/all-bids", all_bids)
+    app.router.add_post("/all-bids-data", all_bids_data)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}", log
+    finally:
+        await runner.cleanup()
+
 
 class TestGemScraper:
     def test_parse_bid_cards(self):
@@ -29,6 +84,33 @@ class TestGemScraper:
         assert bids[0]["bid_id"] == "GEM/2025/B/7028956"
         assert bids[0]["quantity"] == 6
 
+    @pytest.mark.parametrize("fixture", ["listing_page1.html", "listing_page2.html"])
+    def test_lxml_parser_matches_bs4_parser(self, fixture):
+        from app.scraper.parser import parse_bid_cards_bs4, parse_bid_cards_lxml
+
+        with open(os.path.join(FIXTURE_DIR, fixture), encoding="utf-8") as handle:
+            html = handle.read()
+        reference = parse_bid_cards_bs4(html)
+        assert len(reference) > 10
+        assert any(bid["end_date"] and bid["quantity"] for bid in reference)
+        assert parse_bid_cards_lxml(html) == reference
+
+    def test_lxml_parser_edge_cases_match_bs4_parser(self):
+        from app.scraper.parser import parse_bid_cards_bs4, parse_bid_cards_lxml
+
+        pages = [
+            "",
+            "<p>GEM/2025/B/1 Items: Pens</p>",
+            '<div class="card"><a href="/showbidDocument/1"><span>GEM/2025/B/1</span></a>'
+            "<script>Items: hidden</script><p>Items: Pens<!-- x --> Quantity: 1<b>2</b></p>"
+            "<p>Start Date: Start Date: 01-02-2026 10:00 AM End Date: 05-02-2026 6:00 PM</p></div>",
+            '<div class="card"><a href="/b">GEM/2025/B/2</a> RA NO: GEM/2026/R/9 Department Name And Address:'
+            " Ministry\n of Power Bid Type: Open Bid Bid Value: 100</div>",
+            '<div class="bid-card"><a href="x">GEM/2025/B/3</a><a href="y">GEM/2025/B/3</a>Items:</div>',
+        ]
+        for html in pages:
+            assert parse_bid_cards_lxml(html) == parse_bid_cards_bs4(html)
+
     def test_pdf_validation(self, tmp_path):
         downloader = PDFDownloader()
         valid_path = tmp_path / "valid.pdf"
@@ -38,3 +120,339 @@ class TestGemScraper:
 
         assert downloader._is_valid_pdf(str(valid_path)) is True
         assert downloader._is_valid_pdf(str(invalid_path)) is False
+
+    def test_download_many_shares_session_and_retries(self, tmp_path, monkeypatch):
+        import asyncio
+        import hashlib
+
+        from aiohttp import web
+
+        from app.config import settings
+        from app.utils.content_store import ContentStore
+
+        monkeypatch.setattr(settings, "DOWNLOAD_RETRY_BASE_DELAY", 0)
+        attempts = {}
+
+        async def handler(request):
+            name = request.match_info["name"]
+            attempts[name] = attempts.get(name, 0) + 1
+            if name == "flaky" and attempts[name] == 1:
+                return web.Response(status=503)
+            if name == "missing":
+                return web.Response(status=404)
+            return web.Response(body=b"%PDF-1.4 " + name.encode(), content_type="application/pdf")
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/{name}.pdf", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            downloader = PDFDownloader(ContentStore(str(tmp_path)))
+            try:
+                urls = [f"http://127.0.0.1:{port}/{name}.pdf" for name in ("a", "flaky", "missing")]
+                results = await downloader.download_many(urls)
+                session = downloader._get_session()
+                assert await downloader.download_pdf(urls[0]) == results[0]
+                assert downloader._get_session() is session
+                return results
+            finally:
+                await downloader.close()
+                await runner.cleanup()
+
+        results = asyncio.run(run())
+        assert results[0] == ContentStore(str(tmp_path)).path_for(hashlib.sha256(b"%PDF-1.4 a").hexdigest(), ".pdf")
+        assert results[1] and attempts["flaky"] == 2
+        assert results[2] is None and attempts["missing"] == 3
+
+    def test_content_store_dedupes_and_reuses_text(self, tmp_path):
+        import asyncio
+        import hashlib
+
+        from app.utils.content_store import ContentStore
+
+        store = ContentStore(str(tmp_path))
+        extractions = []
+
+        async def chunks(data):
+            for i in range(0, len(data), 4):
+                yield data[i : i + 4]
+
+        async def extract(path):
+            extractions.append(path)
+            return "bid text"
+
+        async def run():
+            first = await store.save_stream(chunks(b"%PDF-1.4 same bid"), ".pdf", 1000)
+            second = await store.save_stream(chunks(b"%PDF-1.4 same bid"), ".pdf", 1000)
+            too_big = await store.save_stream(chunks(b"%PDF-1.4 same bid"), ".pdf", 8)
+            texts = [await store.extract_text(first[1], extract), await store.extract_text(second[1], extract)]
+            return first, second, too_big, texts
+
+        first, second, too_big, texts = asyncio.run(run())
+        digest = hashlib.sha256(b"%PDF-1.4 same bid").hexdigest()
+        assert first == second == (digest, store.path_for(digest, ".pdf"))
+        assert store.digest_of(first[1]) == digest
+        assert too_big is None
+        assert texts == ["bid text", "bid text"]
+        assert extractions == [first[1]]
+        assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == [f"{digest}.pdf", f"{digest}.txt"]
+
+    def test_fetch_resumes_interrupted_download_and_honours_304(self, tmp_path, monkeypatch):
+        import asyncio
+
+        from aiohttp import web
+
+        from app.config import settings
+        from app.utils.content_store import ContentStore
+
+        monkeypatch.setattr(settings, "DOWNLOAD_RETRY_BASE_DELAY", 0)
+        body = b"%PDF-1.4 " + b"x" * 50000
+        requests = []
+
+        async def handler(request):
+            requests.append(dict(request.headers))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+            range_header = request.headers.get("Range")
+            if range_header and request.headers.get("If-Range") == '"v1"':
+                start = int(range_header.split("=")[1].rstrip("-"))
+                headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                return web.Response(status=206, body=body[start:], headers=headers)
+            # First request: send half of the body, then drop the connection
+            response = web.StreamResponse(headers={**headers, "Content-Length": str(len(body))})
+            await response.prepare(request)
+            for start in range(0, 20000, 5000):
+                await response.write(body[start : start + 5000])
+                await asyncio.sleep(0.02)
+            request.transport.close()
+            return response
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/bid.pdf", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            downloader = PDFDownloader(ContentStore(str(tmp_path)))
+            url = f"http://127.0.0.1:{port}/bid.pdf"
+            try:
+                first = await downloader.fetch_with_retry(url)
+                second = await downloader.fetch_with_retry(url, previous=first)
+                return first, second
+            finally:
+                await downloader.close()
+                await runner.cleanup()
+
+        first, second = asyncio.run(run())
+        with open(first["path"], "rb") as handle:
+            assert handle.read() == body
+        assert first["etag"] == '"v1"' and first["content_length"] == len(body)
+        assert requests[1]["Range"].startswith("bytes=") and requests[1]["Range"] != "bytes=0-"
+        assert second["not_modified"] is True and second["path"] == first["path"]
+        assert len(requests) == 3
+        assert not list((tmp_path / "partial").iterdir())
+
+
+    def test_concurrent_fetches_of_one_url_do_not_share_a_partial_file(self, tmp_path):
+        import asyncio
+        import hashlib
+
+        from aiohttp import web
+
+        from app.utils.content_store import ContentStore
+
+        body = b"%PDF-1.4 " + b"y" * 40000
+        active = []
+        overlaps = []
+
+        async def handler(request):
+            active.append(request)
+            overlaps.append(len(active))
+            response = web.StreamResponse(headers={"ETag": '"v1"', "Content-Length": str(len(body))})
+            await response.prepare(request)
+            for start in range(0, len(body), 8000):
+                await response.write(body[start : start + 8000])
+                await asyncio.sleep(0.01)
+            await response.write_eof()
+            active.remove(request)
+            return response
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/bid.pdf", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            downloader = PDFDownloader(ContentStore(str(tmp_path)))
+            url = f"http://127.0.0.1:{port}/bid.pdf"
+            try:
+                return await asyncio.gather(downloader.fetch_pdf(url), downloader.fetch_pdf(url))
+            finally:
+                await downloader.close()
+                await runner.cleanup()
+
+        first, second = asyncio.run(run())
+        digest = hashlib.sha256(body).hexdigest()
+        assert first["path"] == second["path"] == ContentStore(str(tmp_path)).path_for(digest, ".pdf")
+        with open(first["path"], "rb") as handle:
+            assert handle.read() == body
+        assert overlaps == [1, 1]
+        assert not list((tmp_path / "partial").iterdir())
+
+
+class TestParallelScraping:
+    def test_contexts_split_pages_and_results_stay_in_order(self, monkeypatch):
+        import asyncio
+        import time
+
+        from app.config import settings
+        from app.scraper.gem_scraper import GemScraper
+        from app.utils.rate_limit import RateLimiter
+
+        monkeypatch.setattr(settings, "SCRAPER_CONTEXTS", 3)
+        visited = []
+
+        class FakePage:
+            number = 0
+
+            async def content(self):
+                if self.number > 5:
+                    return "<html><body>No bids</body></html>"
+                return f'<div class="card"><a href="/showbidDocument/{self.number}">GEM/2025/B/{self.number}</a></div>'
+
+        async def new_page():
+            page = FakePage()
+            scraper.contexts.append(page)
+            return page
+
+        async def open_listing(page):
+            page.number = 1
+            return True
+
+        async def jump(page, current, target):
+            # Later pages come back first, so the scraper has to reorder them
+            await asyncio.sleep(0.05 / target)
+            visited.append((id(page), target))
+            page.number = target
+            return target
+
+        scraper = GemScraper()
+        scraper.page = FakePage()
+        scraper.contexts.append(scraper.page)
+        scraper.rate_limiter = RateLimiter(0)
+        monkeypatch.setattr(scraper, "_new_page", new_page)
+        monkeypatch.setattr(scraper, "_open_listing", open_listing)
+        monkeypatch.setattr(scraper, "_jump_to_page", jump)
+
+        async def run():
+            return [[bid["bid_id"] for bid in page] async for page in scraper.iter_bid_pages(max_pages=10)]
+
+        pages = asyncio.run(run())
+        assert pages == [[f"GEM/2025/B/{n}"] for n in range(1, 6)]
+        by_context = {}
+        for context, target in visited:
+            by_context.setdefault(context, []).append(target)
+        # Each context walks its own stride of pages; workers still running past the end are cancelled
+        assert len(by_context) == 3
+        assert all(len({target % 3 for target in targets}) == 1 for targets in by_context.values())
+        assert set(range(1, 7)) <= {target for targets in by_context.values() for target in targets}
+        assert scraper.stats()["contexts"] == 3
+
+        limiter = RateLimiter(1200)
+
+        async def burst():
+            started = time.monotonic()
+            await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+            return time.monotonic() - started
+
+        # 1200/min = one call every 50ms, shared by all callers
+        assert asyncio.run(burst()) >= 0.14
+
+    def test_failed_context_raises_after_earlier_pages(self, monkeypatch):
+        import asyncio
+
+        from app.config import settings
+        from app.scraper.gem_scraper import GemScraper
+        from app.utils.rate_limit import RateLimiter
+
+        monkeypatch.setattr(settings, "SCRAPER_CONTEXTS", 3)
+
+        class FakePage:
+            number = 0
+
+            async def content(self):
+                return f'<div class="card"><a href="/showbidDocument/{self.number}">GEM/2025/B/{self.number}</a></div>'
+
+        async def new_page():
+            return FakePage()
+
+        async def open_listing(page):
+            page.number = 1
+            return True
+
+        async def jump(page, current, target):
+            if target == 4:
+                raise RuntimeError("Listing page 4 did not render")
+            await asyncio.sleep(0.01)
+            page.number = target
+            return target
+
+        scraper = GemScraper()
+        scraper.page = FakePage()
+        scraper.rate_limiter = RateLimiter(0)
+        monkeypatch.setattr(scraper, "_new_page", new_page)
+        monkeypatch.setattr(scraper, "_open_listing", open_listing)
+        monkeypatch.setattr(scraper, "_jump_to_page", jump)
+        pages = []
+
+        async def run():
+            async for page in scraper.iter_bid_pages(max_pages=9):
+                pages.append([bid["bid_id"] for bid in page])
+
+        # Pages scraped by the other contexts after the failure are not passed off as the end of the listing
+        with pytest.raises(RuntimeError, match="page 4"):
+            asyncio.run(run())
+        assert pages == [[f"GEM/2025/B/{n}"] for n in range(1, 4)]
+
+
+class TestGemHttpScraper:
+    def test_scrapes_recorded_listing_offline(self):
+        import asyncio
+        from datetime import datetime
+
+        from app.scraper.gem_http_scraper import GemHttpScraper
+        from app.utils.rate_limit import RateLimiter
+
+        async def run():
+            async with replay_gem(expire_token_on_page=2) as (base_url, log):
+                async with GemHttpScraper(base_url) as scraper:
+                    scraper.rate_limiter = RateLimiter(0)
+                    pages = [page async for page in scraper.iter_bid_pages(max_pages=10, max_bids=50)]
+                    return pages, log, scraper.stats()
+
+        pages, log, stats = asyncio.run(run())
+        assert [[bid["bid_id"] for bid in page] for page in pages] == [
+            ["GEM/2025/B/7028956", "GEM/2025/B/7031107"],
+            ["GEM/2025/B/7040210"],
+        ]
+        first = pages[0][0]
+        assert first["quantity"] == 6
+        assert first["items"] == "Desktop Computers"
+        assert first["department_address"] == "Ministry of Defence Department of Military Affairs"
+        assert first["end_date"] == datetime(2026, 1, 19, 15, 53)
+        assert first["pdf_url"] == "https://bidplus.gem.gov.in/showbidDocument/7028956"
+        assert pages[0][1]["ra_no"] == "GEM/2025/R/612044"
+        # The expired token on page 2 is refreshed once; the empty page 3 ends the listing
+        assert log["listing"] == 2
+        assert log["data"] == [1, 2, 2, 3]
+        assert stats["backend"] == "http" and stats["pages_loaded"] == 3
+        # Newest bids first, which the incremental early stop relies on
+        assert log["sort"] == {GemHttpScraper.LISTING_SORT} and GemHttpScraper.newest_first
@@ -2,9 +2,29 @@
 Service tests.
 """
 
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 import pytest
+from bson import ObjectId
 
+from app.config import settings
+from app.database import pagination
+from app.database.pagination import keyset_page, list_total
+from app.database.repositories.company_repo import CompanyRepository
+from app.database.repositories.match_repo import MatchRepository
+from app.database.repositories.tender_repo import TenderRepository
+from app.jobs.known_bids import KnownBids
+from app.jobs.pipeline import Pipeline, Stage
+from app.jobs.scrape_job import _scraped_batches
+from app.services import match_service, search_service, tender_service
+from app.services.embedding_index import EmbeddingMatrix, IVFIndex
+from app.services.match_service import MatchService
+from app.services.matching_utils import ProfileFeatures, TenderFeatures, score_tender_against_companies
 from app.services.search_service import SearchService
+from app.services.tender_service import TenderService, _scrape_document, scrape_fingerprint
+from app.utils.bloom import BloomFilter
 
 
 class DummyDB:
@@ -37,3 +57,593 @@ class TestSearchService:
         score, reasons = service._metadata_score(tender, profile)
         assert score > 0
         assert any("ISO 27001" in reason for reason in reasons)
+
+
+class TestEmbeddingMatrix:
+    def test_scores_track_upserts_and_removals(self):
+        matrix = EmbeddingMatrix("tenders")
+        matrix._loaded = True
+        matrix.upsert("a", [1.0, 0.0, 0.0])
+        matrix.upsert("b", [0.0, 2.0, 0.0])
+        matrix.upsert("c", [1.0, 1.0, 0.0])
+
+        scores = matrix.scores([1.0, 0.0, 0.0])
+        assert scores["a"] == pytest.approx(1.0)
+        assert scores["b"] == pytest.approx(0.0)
+        assert scores["c"] == pytest.approx(2 ** -0.5)
+
+        matrix.remove(["a"])
+        matrix.upsert("b", [1.0, 0.0, 0.0])
+        scores = matrix.scores([1.0, 0.0, 0.0])
+        assert set(scores) == {"b", "c"}
+        assert scores["b"] == pytest.approx(1.0)
+        assert matrix.scores([0.0, 0.0, 0.0]) == {}
+
+    def test_upserts_grow_the_buffer_geometrically(self):
+        matrix = EmbeddingMatrix("tenders")
+        matrix._loaded = True
+        capacities = set()
+        for i in range(1000):
+            matrix.upsert(f"t{i}", [1.0, float(i)])
+            capacities.add(len(matrix._buffer))
+        assert sorted(capacities) == [64, 128, 256, 512, 1024]
+        assert len(matrix) == 1000
+
+        matrix.remove([f"t{i}" for i in range(500)])
+        matrix.upsert("t0", [1.0, 0.0])
+        assert len(matrix._buffer) == 1024
+        scores = matrix.scores([1.0, 0.0])
+        assert len(scores) == 501
+        assert scores["t0"] == pytest.approx(1.0)
+
+    def test_ivf_index_matches_exact_search_when_probing_all_buckets(self, tmp_path):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, 16))
+        ids = [f"t{i}" for i in range(300)]
+        query = rng.normal(size=16).tolist()
+
+        exact = EmbeddingMatrix("tenders")
+        exact.set_vectors(ids, vectors)
+        ivf = IVFIndex("tenders", nlist=10, nprobe=10, min_rows=0, index_dir=str(tmp_path))
+        ivf.set_vectors(ids, vectors)
+
+        assert [doc_id for doc_id, _ in ivf.search(query, 20)] == [doc_id for doc_id, _ in exact.search(query, 20)]
+        assert (tmp_path / "tenders_ivf.npz").exists()
+
+        ivf.remove(["t0", "t1"])
+        ivf.upsert("new", query)
+        assert ivf.search(query, 1)[0][0] == "new"
+
+    def test_ivf_index_builds_off_the_event_loop(self, tmp_path):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, 16))
+        ids = [f"t{i}" for i in range(300)]
+        query = rng.normal(size=16).tolist()
+        exact = EmbeddingMatrix("tenders")
+        exact.set_vectors(ids, vectors)
+        expected = [doc_id for doc_id, _ in exact.search(query, 20)]
+
+        async def run():
+            ivf = IVFIndex("tenders", nlist=10, nprobe=10, min_rows=0, index_dir=str(tmp_path))
+            ivf.set_vectors(ids, vectors)
+            assert ivf.training is not None
+            # Exact search until the centroids are swapped in
+            assert [doc_id for doc_id, _ in ivf.search(query, 20)] == expected
+            ivf.remove(["t5"])
+            ivf.upsert("new", query)
+            await ivf.training
+            return ivf
+
+        ivf = asyncio.run(run())
+        assert ivf.training is None
+        assert ivf._centroids is not None
+        assert len(ivf._assign) == len(ivf)
+        assert ivf.search(query, 1)[0][0] == "new"
+        assert (tmp_path / "tenders_ivf.npz").exists()
+
+
+class TestMatchTable:
+    def test_refresh_and_search_read_materialized_matches(self, monkeypatch, memory_db):
+        av_profile = {
+            "company_id": "av",
+            "name": "AV Co",
+            "status": {"processing_status": "ready"},
+            "metadata": {"domains": ["Audio Visual", "Museums"], "technologies": ["LED Wall", "Projector"]},
+        }
+        it_profile = {
+            "company_id": "it",
+            "status": {"processing_status": "ready"},
+            "metadata": {"domains": ["IT Services"], "technologies": ["Java"], "certifications": ["ISO 27001"]},
+        }
+        tender = {
+            "_id": "t1",
+            "bid_id": "GEM/1",
+            "is_active": True,
+            "expired": False,
+            "metadata": {
+                "title": "AMC of audio visual system at museum",
+                "domains": ["Audio Visual", "Museum Maintenance"],
+                "required_technologies": ["LED Walls", "Projector"],
+            },
+        }
+        db = memory_db(tenders=[tender], company_profiles=[av_profile, it_profile])
+        for name in ("company_matrix", "tender_matrix"):
+            matrix = EmbeddingMatrix(name)
+            matrix._loaded = True
+            monkeypatch.setattr(match_service, name, matrix)
+
+        service = match_service.MatchService(db)
+        asyncio.run(service.refresh_tender(tender))
+        stored = db.get_collection("tender_matches").items
+        assert [match["company_id"] for match in stored] == ["av"]
+        assert db.get_collection("tenders").items[0]["matches_refreshed_at"]
+
+        # Re-scoring the company replaces its rows instead of duplicating them
+        asyncio.run(service.refresh_company(av_profile))
+        assert len(db.get_collection("tender_matches").items) == 1
+
+        search = SearchService(db)
+        av_profile["matches_refreshed_at"] = stored[0]["computed_at"]
+        result = asyncio.run(search._stored_tender_matches(av_profile, {"domains": ["Audio Visual"]}, 10))
+        assert result[0]["tender_id"] == "t1"
+        assert result[0]["match_reasons"]
+        assert asyncio.run(search._stored_tender_matches(av_profile, {"domains": ["IT Services"]}, 10)) == []
+
+    def test_refreshes_rewrite_pairs_in_place_and_drop_stale_rows(self, monkeypatch, memory_db):
+        profile = {
+            "company_id": "av",
+            "status": {"processing_status": "ready"},
+            "metadata": {"domains": ["Audio Visual"], "technologies": ["LED Wall", "Projector"]},
+        }
+        tender = {
+            "_id": "t1",
+            "bid_id": "GEM/1",
+            "is_active": True,
+            "expired": False,
+            "metadata": {
+                "title": "LED wall for museum",
+                "domains": ["Audio Visual"],
+                "required_technologies": ["LED Wall"],
+            },
+        }
+        old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        db = memory_db(
+            tenders=[tender],
+            company_profiles=[profile],
+            tender_matches=[
+                # Written by an overlapping refresh of the same pair, and a pair that no longer matches
+                {"_id": "m1", "tender_id": "t1", "company_id": "av", "score": 0.2, "computed_at": old},
+                {"_id": "m2", "tender_id": "t1", "company_id": "gone", "score": 0.5, "computed_at": old},
+                {"_id": "m3", "tender_id": "t9", "company_id": "av", "score": 0.5, "computed_at": old},
+            ],
+        )
+        for name in ("company_matrix", "tender_matrix"):
+            matrix = EmbeddingMatrix(name)
+            matrix._loaded = True
+            monkeypatch.setattr(match_service, name, matrix)
+        service = match_service.MatchService(db)
+
+        asyncio.run(service.refresh_tender(tender))
+        rows = db.get_collection("tender_matches").items
+        assert sorted((row["tender_id"], row["company_id"]) for row in rows) == [("t1", "av"), ("t9", "av")]
+        assert next(row for row in rows if row["tender_id"] == "t1")["computed_at"] > old
+
+        asyncio.run(service.refresh_company(profile))
+        rows = db.get_collection("tender_matches").items
+        assert [(row["_id"], row["tender_id"]) for row in rows] == [("m1", "t1")]
+
+    def test_first_search_is_scored_live_while_the_backfill_runs(self, monkeypatch, memory_db):
+        profile = {
+            "company_id": "av",
+            "status": {"processing_status": "ready"},
+            "summary_embedding": [1.0, 0.0],
+            "metadata": {"domains": ["Audio Visual"], "technologies": ["LED Wall"]},
+        }
+        tender = {
+            "_id": "t1",
+            "bid_id": "GEM/1",
+            "is_active": True,
+            "expired": False,
+            "metadata": {
+                "title": "LED wall for museum",
+                "domains": ["Audio Visual"],
+                "required_technologies": ["LED Wall"],
+            },
+        }
+        db = memory_db(tenders=[tender], company_profiles=[profile])
+        for name in ("company_matrix", "tender_matrix"):
+            matrix = EmbeddingMatrix(name)
+            matrix.set_vectors(["t1"] if name == "tender_matrix" else ["av"], [[1.0, 0.0]])
+            monkeypatch.setattr(match_service, name, matrix)
+            monkeypatch.setattr(search_service, name, matrix)
+
+        async def run():
+            result = await SearchService(db).search_tenders("av")
+            assert not db.get_collection("tender_matches").items
+            await match_service._company_refreshes["av"]
+            return result
+
+        result = asyncio.run(run())
+        assert [item["tender_id"] for item in result["results"]] == ["t1"]
+        assert [row["tender_id"] for row in db.get_collection("tender_matches").items] == ["t1"]
+        assert db.get_collection("company_profiles").items[0]["matches_refreshed_at"]
+        assert not match_service._company_refreshes
+
+
+class TestFilteredSearch:
+    def test_filters_that_empty_the_shortlist_fall_back_to_an_exact_scan(self, monkeypatch, memory_db):
+        tenders = [
+            {"_id": f"t{i}", "bid_id": f"GEM/{i}", "is_active": True, "expired": False,
+             "metadata": {"title": "Laptops", "domains": ["IT Hardware"]}}
+            for i in range(5)
+        ]
+        tenders.append(
+            {"_id": "av", "bid_id": "GEM/AV", "is_active": True, "expired": False,
+             "metadata": {"title": "LED wall", "domains": ["Audio Visual"]}}
+        )
+        db = memory_db(tenders=tenders, company_profiles=[{"company_id": "c1", "metadata": {}}])
+        matrix = EmbeddingMatrix("tenders")
+        matrix.set_vectors([tender["_id"] for tender in tenders], [[1.0, 0.1 * i] for i in range(5)] + [[0.0, 1.0]])
+        monkeypatch.setattr(search_service, "tender_matrix", matrix)
+        monkeypatch.setattr(settings, "ANN_TOP_K", 3)
+
+        service = SearchService(db)
+
+        async def query_embedding(profile, query):
+            return [1.0, 0.0]
+
+        monkeypatch.setattr(service, "_get_query_embedding", query_embedding)
+        result = asyncio.run(service.search_tenders("c1", query="led wall", filters={"domains": ["Audio Visual"]}))
+        assert [item["tender_id"] for item in result["results"]] == ["av"]
+
+
+class TestIngestPipeline:
+    def test_stages_overlap_with_source_and_respect_limits(self):
+        events = []
+        running = {"slow": 0, "peak": 0}
+        failures = []
+
+        async def source():
+            for i in range(6):
+                events.append(("scraped", i))
+                yield i
+                await asyncio.sleep(0.01)
+
+        async def check(item):
+            if item == 3:
+                raise ValueError("broken bid")
+            return None if item == 4 else item
+
+        async def slow(item):
+            running["slow"] += 1
+            running["peak"] = max(running["peak"], running["slow"])
+            events.append(("processed", item))
+            await asyncio.sleep(0.02)
+            running["slow"] -= 1
+            return item
+
+        async def on_error(stage, item, exc):
+            failures.append((stage, item, str(exc)))
+
+        pipeline = Pipeline([Stage("check", check, 2), Stage("slow", slow, 2)], queue_size=1, on_error=on_error)
+        stats = asyncio.run(pipeline.run(source()))
+
+        # The first bid is processed before the last one is scraped
+        assert events.index(("processed", 0)) < events.index(("scraped", 5))
+        assert running["peak"] <= 2
+        assert failures == [("check", 3, "broken bid")]
+        assert stats["check"]["processed"] == 4
+        assert stats["check"]["dropped"] == 1
+        assert stats["check"]["failed"] == 1
+        assert stats["slow"]["processed"] == 4
+        assert stats["slow"]["items_per_sec"] > 0
+
+
+class TestIncrementalScrape:
+    def test_skips_known_bids_and_stops_at_known_page(self, memory_db):
+        unchanged = {"bid_id": "GEM/A", "items": "Laptops", "quantity": 5}
+        changed = {"bid_id": "GEM/B", "items": "Desks", "quantity": 10}
+        db = memory_db(
+            tenders=[
+                {"bid_id": "GEM/A", "scrape_hash": scrape_fingerprint(unchanged)},
+                {"bid_id": "GEM/B", "scrape_hash": scrape_fingerprint({**changed, "quantity": 8})},
+            ]
+        )
+        pages = [
+            [{"bid_id": "GEM/C", "items": "Chairs"}, unchanged, changed],
+            [unchanged],
+            [{"bid_id": "GEM/D", "items": "never reached"}],
+        ]
+        requested = []
+
+        class FakeScraper:
+            def __init__(self, newest_first):
+                self.newest_first = newest_first
+
+            async def iter_bid_pages(self):
+                for page in pages:
+                    requested.append(page)
+                    yield page
+
+        async def run(scraper):
+            known = await KnownBids.load(TenderRepository(db))
+            stats = {"pages_scraped": 0, "tenders_found": 0, "known_skipped": 0}
+            batches = [[bid["bid_id"] for bid in batch] async for batch in _scraped_batches(scraper, stats, known, 1)]
+            return [bid_id for batch in batches for bid_id in batch], stats
+
+        bids, stats = asyncio.run(run(FakeScraper(newest_first=True)))
+        assert bids == ["GEM/C", "GEM/B"]
+        assert len(requested) == 2
+        assert stats == {"pages_scraped": 2, "tenders_found": 4, "known_skipped": 2}
+
+        # Ordered by end date, the soonest-closing (known) bids come first and new bids follow
+        requested.clear()
+        bids, stats = asyncio.run(run(FakeScraper(newest_first=False)))
+        assert bids == ["GEM/C", "GEM/B", "GEM/D"]
+        assert len(requested) == 3
+        assert stats == {"pages_scraped": 3, "tenders_found": 5, "known_skipped": 2}
+
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"GEM/{i}")
+        assert all(f"GEM/{i}" in bloom for i in range(1000))
+        assert sum(f"OTHER/{i}" in bloom for i in range(10000)) < 300
+
+
+class TestBulkUpsert:
+    def test_bulk_upsert_returns_ids_and_keeps_status_in_changed_only_mode(self, memory_db):
+        processed = {"pdf_downloaded": True, "llm_processed": True, "embedding_generated": True}
+        db = memory_db(
+            tenders=[
+                {
+                    "_id": "old",
+                    "bid_id": "GEM/A",
+                    "status": processed,
+                    "scraped_info": {"items": "Laptops", "extra": "kept"},
+                    "metadata": {"title": "Laptops"},
+                }
+            ]
+        )
+        repo = TenderRepository(db)
+        batch = [_scrape_document({"bid_id": "GEM/A", "items": "Laptops (V2)"}), _scrape_document({"bid_id": "GEM/B"})]
+
+        result = asyncio.run(repo.bulk_upsert(batch, changed_only=True))
+        assert result["matched"] == ["GEM/A"]
+        assert list(result["inserted"]) == ["GEM/B"]
+        assert result["errors"] == {}
+
+        existing, inserted = db.get_collection("tenders").items
+        assert existing["status"] == processed
+        assert existing["scraped_info"] == {**batch[0]["scraped_info"], "extra": "kept"}
+        assert existing["metadata"] == {"title": "Laptops"}
+        assert inserted["status"]["llm_processed"] is False
+        assert inserted["created_at"] == inserted["updated_at"]
+
+        # Default mode resets processing for a rescraped bid
+        asyncio.run(repo.bulk_upsert(batch[:1]))
+        assert existing["status"]["llm_processed"] is False
+
+        tenders = asyncio.run(repo.get_many_by_bid_ids(["GEM/B", "GEM/missing", "GEM/A"]))
+        assert [tender["bid_id"] for tender in tenders] == ["GEM/B", "GEM/A"]
+
+    def test_fan_out_stage_passes_batch_items_downstream(self):
+        seen = []
+
+        async def source():
+            yield [1, 2, 3]
+            yield []
+            yield [4]
+
+        async def expand(batch):
+            return list(batch)
+
+        async def collect(item):
+            seen.append(item)
+            return item
+
+        stats = asyncio.run(Pipeline([Stage("batch", expand, 2, fan_out=True), Stage("item", collect, 1)], 1).run(source()))
+        assert sorted(seen) == [1, 2, 3, 4]
+        assert stats["batch"] == {**stats["batch"], "processed": 2, "dropped": 1}
+        assert stats["item"]["processed"] == 4
+
+
+class TestKeysetPagination:
+    def test_cursor_pages_cover_every_document_once_in_order(self, memory_collection):
+        values = [3, 3, 2, None, None, 1, 3, 2, None, 5]
+        collection = memory_collection([{"_id": i, "created_at": value} for i, value in enumerate(values)])
+
+        async def walk(order, filters):
+            seen, cursor = [], None
+            while True:
+                page, cursor = await keyset_page(collection, filters, "created_at", order, 3, cursor=cursor)
+                seen.extend(item["_id"] for item in page)
+                if cursor is None:
+                    return seen
+
+        for order in (-1, 1):
+            expected = [item["_id"] for item in collection.find().sort([("created_at", order), ("_id", order)]).items]
+            assert asyncio.run(walk(order, {})) == expected
+            subset = [i for i in expected if i % 2 == 0]
+            assert asyncio.run(walk(order, {"$or": [{"_id": i} for i in subset]})) == subset
+
+    def test_cursor_validation_and_cached_totals(self, memory_collection):
+        collection = memory_collection([{"_id": i, "created_at": i, "status": "ready"} for i in range(5)])
+        _, cursor = asyncio.run(keyset_page(collection, {}, "created_at", -1, 2))
+        with pytest.raises(ValueError):
+            asyncio.run(keyset_page(collection, {}, "updated_at", -1, 2, cursor=cursor))
+        with pytest.raises(ValueError):
+            asyncio.run(keyset_page(collection, {}, "created_at", -1, 2, cursor="not-a-cursor"))
+
+        assert asyncio.run(list_total(collection, {})) == 5
+        assert collection.counts == 0
+        assert asyncio.run(list_total(collection, {"status": "ready"})) == 5
+        assert asyncio.run(list_total(collection, {"status": "ready"})) == 5
+        assert collection.counts == 1
+
+
+def _project(document, projection):
+    """Apply an inclusion projection (dotted keys, `_id` kept) the way Mongo does."""
+    projected = {"_id": document["_id"]}
+    for path in projection:
+        source, target = document, projected
+        parts = path.split(".")
+        for part in parts[:-1]:
+            if not isinstance(source.get(part), dict):
+                break
+            source = source[part]
+            target = target.setdefault(part, {})
+        else:
+            if parts[-1] in source:
+                target[parts[-1]] = source[parts[-1]]
+    return projected
+
+
+class TestReadViews:
+    def test_scoring_views_keep_every_matching_input(self, memory_db):
+        tender = {
+            "_id": "t1",
+            "bid_id": "GEM/1",
+            "is_active": True,
+            "expired": False,
+            "summary_embedding": [0.1] * 8,
+            "raw_text": "x" * 1000,
+            "scraped_info": {"end_date": "2026-01-01", "items": "AV AMC"},
+            "metadata": {
+                "title": "AMC of audio visual system at museum",
+                "summary": "Maintenance of LED walls and projectors for a government museum",
+                "domains": ["Audio Visual", "Museum Maintenance"],
+                "required_technologies": ["LED Walls", "Projector"],
+                "required_certifications": ["ISO 9001"],
+                "sector": "Culture",
+                "contact": "officer@example.gov",
+            },
+        }
+        profile = {
+            "_id": "p1",
+            "company_id": "av",
+            "name": "AV Co",
+            "summary_embedding": [0.2] * 8,
+            "status": {"processing_status": "ready"},
+            "uploaded_files": [{"local_path": "/tmp/profile.pdf"}],
+            "metadata": {
+                "company_name": "AV Co Pvt Ltd",
+                "domains": ["Audio Visual", "Museums"],
+                "technologies": ["LED Wall", "Projector"],
+                "certifications": ["ISO 9001"],
+                "capabilities": ["Installation and maintenance of AV systems"],
+                "government_experience": True,
+                "summary": "AV integrator",
+            },
+        }
+        slim_tender = _project(tender, TenderRepository.VIEWS["scoring"])
+        slim_profile = _project(profile, CompanyRepository.VIEWS["scoring"])
+        assert "summary_embedding" not in slim_tender and "raw_text" not in slim_tender
+        assert "summary_embedding" not in slim_profile and "uploaded_files" not in slim_profile
+
+        def score(tender_doc, profile_doc):
+            batch = score_tender_against_companies(
+                TenderFeatures(tender_doc["metadata"]), [ProfileFeatures(profile_doc["metadata"])], [0.5]
+            )
+            return float(batch.scores[0]), batch.reasons(0)
+
+        assert score(slim_tender, slim_profile) == score(tender, profile)
+        service = MatchService(memory_db())
+        assert service._match_doc(slim_tender, slim_profile, 0.5, [], "now") == service._match_doc(
+            tender, profile, 0.5, [], "now"
+        )
+
+    def test_list_view_keeps_sort_keys_and_drops_embeddings(self):
+        tender_list = TenderRepository.VIEWS["list"]
+        for sort_by in ("created_at", "updated_at", "scraped_at", "end_date"):
+            sort_field = TenderService._sort_field(None, sort_by)
+            assert sort_field in tender_list or sort_field.split(".")[0] in tender_list
+        assert "created_at" in CompanyRepository.VIEWS["list"]
+        for repo in (TenderRepository, CompanyRepository):
+            assert "summary_embedding" not in repo.VIEWS["list"]
+            assert repo.VIEWS["detail"] == {"summary_embedding": 0}
+
+
+class TestExpirySweep:
+    def test_sweep_flags_past_tenders_and_lists_filter_by_end_date(self, monkeypatch, memory_db):
+        pagination._count_cache.clear()
+        now = datetime.now(timezone.utc)
+        tenders = [
+            {"_id": "past", "created_at": 3, "expired": False, "scraped_info": {"end_date": now - timedelta(days=1)}},
+            {"_id": "future", "created_at": 2, "expired": False, "scraped_info": {"end_date": now + timedelta(days=1)}},
+            {"_id": "undated", "created_at": 1, "expired": False, "scraped_info": {}},
+        ]
+        db = memory_db(tenders=tenders, tender_matches=[{"tender_id": "past", "expired": False}])
+        matrix = EmbeddingMatrix("tenders")
+        removed = []
+        monkeypatch.setattr(matrix, "remove", removed.extend)
+        monkeypatch.setattr(tender_service, "tender_matrix", matrix)
+        service = tender_service.TenderService(db)
+
+        # Lists compute expiry from end_date before any sweep has run
+        def listed(expired):
+            page = asyncio.run(service.list_tenders(expired=expired, include_total=False))
+            return [item["_id"] for item in page["items"]]
+
+        assert listed(True) == ["past"]
+        assert listed(False) == ["future", "undated"]
+        # The expiry filter is stable between requests, so its total comes from the count cache
+        counts = db.get_collection("tenders").counts
+        totals = [asyncio.run(service.list_tenders(expired=True))["total"] for _ in range(3)]
+        assert totals == [1, 1, 1] and db.get_collection("tenders").counts == counts + 1
+        assert all(not tender["expired"] for tender in db.get_collection("tenders").items)
+
+        assert asyncio.run(service.expire_tenders()) == 1
+        assert [tender["_id"] for tender in db.get_collection("tenders").items if tender["expired"]] == ["past"]
+        assert removed == ["past"]
+        assert db.get_collection("tender_matches").items[0]["expired"] is True
+        assert asyncio.run(service.expire_tenders()) == 0
+
+    def test_stored_matches_skip_past_due_tenders_before_the_sweep(self, memory_db):
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"tender_id": "past", "company_id": "av", "score": 0.9, "end_date": now - timedelta(hours=1)},
+            {"tender_id": "open", "company_id": "av", "score": 0.5, "end_date": now + timedelta(days=1)},
+            {"tender_id": "undated", "company_id": "av", "score": 0.4, "end_date": None},
+        ]
+        db = memory_db(tender_matches=[{**row, "is_active": True, "expired": False} for row in rows])
+        top = asyncio.run(MatchRepository(db).top_for_company("av"))
+        assert [row["tender_id"] for row in top] == ["open", "undated"]
+
+
+class TestDuplicatePdfReuse:
+    def test_reuse_needs_the_current_extraction_version_and_is_skipped_on_reprocess(self, monkeypatch, memory_db):
+        new_id, old_id = ObjectId(), ObjectId()
+        processed = {"llm_processed": True, "embedding_generated": True}
+        db = memory_db(
+            tenders=[
+                {"_id": new_id, "bid_id": "GEM/NEW", "pdf_hash": "h1", "status": {}},
+                {"_id": old_id, "bid_id": "GEM/OLD", "pdf_hash": "h1", "status": processed,
+                 "extraction_version": "stale"},
+            ]
+        )
+        service = TenderService(db)
+        current = service._get_llm().tender_extraction_version()
+        tender = db.get_collection("tenders").items[0]
+
+        assert asyncio.run(service.find_processed_duplicate(tender)) is None
+        db.get_collection("tenders").items[1]["extraction_version"] = current
+        assert asyncio.run(service.find_processed_duplicate(tender))["_id"] == old_id
+
+        calls = []
+
+        async def step(name, result):
+            calls.append(name)
+            return result
+
+        monkeypatch.setattr(service, "download_pdf", lambda tender: step("download", True))
+        monkeypatch.setattr(service, "extract_text", lambda tender: step("text", "body"))
+        monkeypatch.setattr(service, "extract_metadata", lambda tender, text: step("llm", {}))
+        monkeypatch.setattr(service, "embed_summary", lambda tender, metadata: step("embed", []))
+        monkeypatch.setattr(service, "save_processed", lambda tender, metadata, embedding: step("save", None))
+        monkeypatch.setattr(service, "reuse_processed", lambda tender, duplicate: step("reuse", None))
+
+        assert asyncio.run(service.reprocess_tender(str(new_id)))
+        assert calls == ["download", "text", "llm", "embed", "save"]
+        calls.clear()
+        assert asyncio.run(service.process_tender("GEM/NEW"))
+        assert calls == ["download", "reuse"]